@@ -0,0 +1,81 @@
+"""
+Compare detection record serialization against the original `json.dump(..., indent=2)` format.
+
+    uv run python benchmarks/bench_serializers.py
+"""
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from ai_cam.data_loggers import DetectionEncoder
+from ai_cam.serializers import get_serializer, msgpack, orjson, serializer_for_path
+from ai_cam.utils import DetectionBatch, read_class_list
+
+N_RECORDS = 2000
+
+
+def make_batches(class_names, n_records, rng):
+    batches = []
+    for _ in range(n_records):
+        n = int(rng.integers(1, 8))
+        xy = rng.random((n, 2)) * 0.7
+        boxes = np.concatenate([xy, xy + rng.random((n, 2)) * 0.3], axis=1)
+        batches.append(DetectionBatch(boxes, np.round(rng.random(n), 4), rng.integers(0, len(class_names), n),
+                                      class_names))
+    return batches
+
+
+def bench_baseline(batches, out_dir):
+    sizes = 0
+    start = time.perf_counter()
+    for i, batch in enumerate(batches):
+        path = os.path.join(out_dir, f"baseline_{i}.json")
+        with open(path, "w") as f:
+            json.dump([d.to_dict() for d in batch], f, indent=2)
+        sizes += os.path.getsize(path)
+    return time.perf_counter() - start, sizes
+
+
+def bench_encoder(name, batches, out_dir):
+    serializer = get_serializer(name)
+    encoder = DetectionEncoder(serializer)
+    sizes = 0
+    start = time.perf_counter()
+    for i, batch in enumerate(batches):
+        path = os.path.join(out_dir, f"{name}_{i}{serializer.extension}")
+        data = encoder.encode(batch)
+        with open(path, "wb") as f:
+            f.write(data)
+        sizes += len(data)
+    elapsed = time.perf_counter() - start
+
+    # Round trip check against the original dict format
+    for i, batch in enumerate(batches[:100]):
+        path = os.path.join(out_dir, f"{name}_{i}{serializer.extension}")
+        with open(path, "rb") as f:
+            assert serializer_for_path(path).loads(f.read()) == [d.to_dict() for d in batch]
+
+    return elapsed, sizes
+
+
+def main():
+    class_names = read_class_list(os.path.join(os.path.dirname(__file__), "..", "models", "coco_labels.txt"))
+    batches = make_batches(class_names, N_RECORDS, np.random.default_rng(0))
+
+    names = ["json"] + (["orjson"] if orjson is not None else []) + (["msgpack"] if msgpack is not None else [])
+    with tempfile.TemporaryDirectory() as out_dir:
+        base_time, base_size = bench_baseline(batches, out_dir)
+        print(f"{'format':<18}{'records/s':>12}{'avg bytes':>12}{'speedup':>10}{'size':>8}")
+        print(f"{'json indent=2':<18}{N_RECORDS / base_time:>12.0f}{base_size / N_RECORDS:>12.0f}"
+              f"{1:>10.2f}{1:>8.2f}")
+        for name in names:
+            elapsed, size = bench_encoder(name, batches, out_dir)
+            print(f"{name:<18}{N_RECORDS / elapsed:>12.0f}{size / N_RECORDS:>12.0f}"
+                  f"{base_time / elapsed:>10.2f}{size / base_size:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import logging
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from ai_cam.utils import read_class_list
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    """Softmax over the last axis, leaving outputs that already look like probabilities alone."""
+    if logits.min() >= 0 and np.allclose(logits.sum(axis=-1), 1, atol=1e-3):
+        return logits
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class ClassifierBackend(ABC):
+    """Host side image classifier. `classify` takes RGB crops and returns (N, n_labels) probabilities."""
+    input_wh = (224, 224)
+
+    def preprocess(self, crops: list[np.ndarray]) -> np.ndarray:
+        """Resize crops into an NCHW float32 batch scaled to 0-1."""
+        return cv2.dnn.blobFromImages(crops, scalefactor=1 / 255, size=self.input_wh, swapRB=False, crop=False)
+
+    @abstractmethod
+    def classify(self, crops: list[np.ndarray]) -> np.ndarray:
+        ...
+
+
+class OnnxBackend(ClassifierBackend):
+    """Run an ONNX classifier on the CPU with ONNX Runtime (requires onnxruntime)."""
+    def __init__(self, model_path: str, threads: int = 1):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input = self.session.get_inputs()[0]
+
+        # NCHW, dynamic dimensions come through as strings or None
+        height, width = self.input.shape[2:4]
+        if isinstance(width, int) and isinstance(height, int):
+            self.input_wh = (width, height)
+
+    def classify(self, crops: list[np.ndarray]) -> np.ndarray:
+        batch = self.preprocess(crops)
+        if isinstance(self.input.shape[0], int) and self.input.shape[0] == 1:
+            # Fixed batch size of one
+            outputs = [self.session.run(None, {self.input.name: batch[i:i + 1]})[0] for i in range(len(batch))]
+            logits = np.concatenate(outputs)
+        else:
+            logits = self.session.run(None, {self.input.name: batch})[0]
+        return _softmax(logits.reshape(len(crops), -1))
+
+
+class OpenCVBackend(ClassifierBackend):
+    """Run a classifier with OpenCV's DNN module on the CPU (ONNX, Caffe, TensorFlow... models)."""
+    def __init__(self, model_path: str, input_wh: tuple[int, int] = (224, 224)):
+        self.net = cv2.dnn.readNet(model_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.input_wh = input_wh
+        self._lock = threading.Lock()
+
+    def classify(self, crops: list[np.ndarray]) -> np.ndarray:
+        batch = self.preprocess(crops)
+        # cv2.dnn.Net is not safe to share between threads
+        with self._lock:
+            self.net.setInput(batch)
+            logits = self.net.forward()
+        return _softmax(logits.reshape(len(crops), -1))
+
+
+class StubBackend(ClassifierBackend):
+    """Deterministic fake classifier for testing: the same crop always gets the same label."""
+    def __init__(self, n_labels: int):
+        self.n_labels = n_labels
+
+    def classify(self, crops: list[np.ndarray]) -> np.ndarray:
+        probabilities = np.full((len(crops), self.n_labels), 0.1 / max(self.n_labels - 1, 1))
+        for i, crop in enumerate(crops):
+            probabilities[i, zlib.crc32(np.ascontiguousarray(crop).tobytes()) % self.n_labels] = 0.9
+        return probabilities
+
+
+def create_backend(name: str, model_path: str | None, n_labels: int, threads: int = 1) -> ClassifierBackend:
+    if name == "stub":
+        return StubBackend(n_labels)
+    if model_path is None:
+        raise ValueError(f"the {name} classifier backend needs a model path")
+    if name == "onnx":
+        return OnnxBackend(model_path, threads=threads)
+    if name == "opencv":
+        return OpenCVBackend(model_path)
+    raise ValueError(f"unknown classifier backend: {name}")
+
+
+def crop_box(frame: np.ndarray, box, padding: float = 0.1) -> np.ndarray | None:
+    """Crop a relative xyxy box out of a frame, grown by `padding` of its size on each side.
+
+    Picamera2's XBGR8888 frames have a fourth padding channel, which is dropped so the crop is plain RGB.
+    """
+    height, width = frame.shape[:2]
+    x0, y0, x1, y1 = box
+    pad_x, pad_y = (x1 - x0) * padding, (y1 - y0) * padding
+    left, right = int(max(x0 - pad_x, 0) * width), int(min(x1 + pad_x, 1) * width)
+    top, bottom = int(max(y0 - pad_y, 0) * height), int(min(y1 + pad_y, 1) * height)
+    if right - left < 2 or bottom - top < 2:
+        return None
+    return frame[top:bottom, left:right, :3]
+
+
+class SpeciesClassifier:
+    """Second stage classifier run on the peak frame crops of an event, off the capture loop.
+
+    Results are cached per event and class, so a peak saved more than once (or a retried record) is only
+    classified once.
+    """
+    def __init__(self, backend: ClassifierBackend, labels_path: str, trigger_classes: list[str],
+                 min_score: float = 0.3, crop_padding: float = 0.1, workers: int = 1, cache_size: int = 256):
+        self.logger = logging.getLogger(__name__)
+
+        self.backend = backend
+        self.labels = read_class_list(labels_path)
+        self.trigger_classes = set(trigger_classes)
+        self.min_score = min_score
+        self.crop_padding = crop_padding
+
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="classifier")
+        self._cache: OrderedDict[tuple[str, str], Future] = OrderedDict()
+        self.cache_size = cache_size
+
+    def _classify(self, crops: list[np.ndarray]) -> dict | None:
+        probabilities = self.backend.classify(crops)
+        # Average over the boxes in the peak frame, weighting them equally
+        mean = probabilities.mean(axis=0)
+        top = np.argsort(-mean, kind="stable")[:3]
+        best = int(top[0])
+        score = float(mean[best])
+        return {
+            "label": self.labels[best] if score >= self.min_score and best < len(self.labels) else None,
+            "score": round(score, 4),
+            "top": [[self.labels[i] if i < len(self.labels) else str(i), round(float(mean[i]), 4)] for i in top],
+            "boxes": len(crops),
+        }
+
+    def submit(self, event_id: str, class_name: str, frame: np.ndarray, detections) -> Future | None:
+        """Queue classification of the `class_name` boxes in a peak frame. Returns None if there is nothing to do."""
+        if class_name not in self.trigger_classes or frame is None:
+            return None
+
+        key = (event_id, class_name)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        # Crop in the caller so the worker never touches a frame buffer the camera may reuse
+        crops = [crop_box(frame, d.bbox.xyxy, self.crop_padding) for d in detections if d.class_name == class_name]
+        crops = [crop.copy() for crop in crops if crop is not None]
+        if not crops:
+            return None
+
+        future = self._pool.submit(self._classify, crops)
+        self._cache[key] = future
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return future
+
+    def classify_event(self, event_id: str, peaks: dict[str, dict]) -> Future:
+        """Classify every peak frame of an event. The future resolves to {class_name: result}."""
+        futures = {}
+        for class_name, peak in peaks.items():
+            future = self.submit(event_id, class_name, peak["frame"], peak["detections"])
+            if future is not None:
+                futures[class_name] = future
+
+        combined: Future = Future()
+        lock = threading.Lock()
+
+        def _collect(_=None):
+            with lock:
+                if not all(f.done() for f in futures.values()) or combined.done():
+                    return
+                combined.set_running_or_notify_cancel()
+            results = {}
+            for class_name, future in futures.items():
+                try:
+                    results[class_name] = future.result()
+                except Exception as e:
+                    self.logger.warning("Classifying %s for %s failed: %s", class_name, event_id, e, exc_info=True)
+            combined.set_result(results)
+
+        if not futures:
+            combined.set_result({})
+        for future in futures.values():
+            future.add_done_callback(_collect)
+        return combined
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=False)
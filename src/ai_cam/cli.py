@@ -6,25 +6,32 @@ from pathlib import Path
 import click
 
 from ai_cam.config import CamConfig
-from ai_cam.detector_data_logger import DetectorLogger
 
 from ai_cam.logging_ import init_logging
-from ai_cam.systemd import install_systemd, uninstall_systemd, restart_systemd
+from ai_cam.systemd import install_systemd, reload_systemd, restart_systemd, uninstall_systemd
 
 logger = logging.getLogger("ai_cam")
 
 
 @click.group()
 @click.option("--verbose", is_flag=True, help="Enable debug logging.")
-def cli(verbose: bool = False):
+@click.option("--log-format", type=click.Choice(["text", "kv", "json"]), default="text",
+              help="Plain text, key=value or JSON log records.")
+@click.option("--journald/--no-journald", default=None,
+              help="Log straight to the systemd journal (default: when running under systemd).")
+@click.option("--log-rate-limit", type=float, default=5,
+              help="Max records per second from any one log call (0 = unlimited).")
+def cli(verbose: bool = False, log_format: str = "text", journald: bool | None = None, log_rate_limit: float = 5):
     level = logging.DEBUG if verbose else logging.INFO
-    init_logging(logger=logger, level=level)
+    init_logging(logger=logger, level=level, fmt=log_format, journald=journald, rate_limit=log_rate_limit)
 
 @cli.command()
 @click.option("--config", type=click.Path(file_okay=True, dir_okay=False))
 def ai_detector(config: str | None = None):
+    from ai_cam.detector_data_logger import DetectorLogger
+
     _config = CamConfig.from_file(path=config)
-    ai_detector = DetectorLogger(_config)
+    ai_detector = DetectorLogger(_config, config_path=config)
 
     ai_detector.run()
 
@@ -43,5 +50,172 @@ def uninstall():
 def restart():
     restart_systemd()
 
+@cli.command(short_help="Reload AI Detector config without restarting the camera")
+def reload():
+    reload_systemd()
+
+@cli.command(short_help="Replay recorded detections with new settings")
+@click.argument("inputs", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--config", type=click.Path(exists=True, file_okay=True, dir_okay=False),
+              help="Config with the new settings to apply.")
+@click.option("--original-config", type=click.Path(exists=True, file_okay=True, dir_okay=False),
+              help="Config the recordings were made with, used for the diff.")
+@click.option("--output", required=True, type=click.Path(file_okay=False), help="Directory for the new results.")
+@click.option("--workers", type=int, default=None, help="Number of worker processes.")
+def reprocess(inputs: tuple[str, ...], output: str, config: str | None = None, original_config: str | None = None,
+              workers: int | None = None):
+    from ai_cam.reprocess import reprocess as run_reprocess
+
+    diff = run_reprocess(inputs, config=CamConfig.from_file(path=config),
+                         original_config=CamConfig.from_file(path=original_config),
+                         output_dir=output, workers=workers)
+
+    click.echo(f"Frames: {diff['frames']} ({diff['frames_changed']} changed)")
+    click.echo(f"{'class':<20}{'detections':>22}{'events':>16}")
+    for class_name in sorted(set(diff["detections"]) | set(diff["events"])):
+        dets = diff["detections"].get(class_name, {"original": 0, "new": 0})
+        events = diff["events"].get(class_name, {"original": 0, "new": 0})
+        click.echo(f"{class_name:<20}{dets['original']:>10} -> {dets['new']:<8}{events['original']:>6} -> {events['new']:<6}")
+    click.echo(f"Events added: {len(diff['events_added'])}, removed: {len(diff['events_removed'])}")
+    click.echo(f"Results written to {output}")
+
+@cli.command(short_help="Show or export hourly/daily activity per class")
+@click.option("--config", type=click.Path(exists=True, file_okay=True, dir_okay=False),
+              help="Read stats from this config's output directory.")
+@click.option("--stats-dir", type=click.Path(exists=True, file_okay=False),
+              help="Stats directory to read instead of <output_dir>/stats.")
+@click.option("--from", "start", type=click.DateTime(formats=["%Y-%m-%d"]), help="First day to include.")
+@click.option("--to", "end", type=click.DateTime(formats=["%Y-%m-%d"]), help="Last day to include.")
+@click.option("--hourly", is_flag=True, help="One row per hour instead of per day.")
+@click.option("--format", "fmt", type=click.Choice(["table", "csv", "json"]), default="table")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write to a file instead of stdout.")
+def stats(config: str | None = None, stats_dir: str | None = None, start: datetime | None = None,
+          end: datetime | None = None, hourly: bool = False, fmt: str = "table", output: str | None = None):
+    import csv
+    import io
+    import json
+
+    from ai_cam.rollups import iter_rollups
+
+    if stats_dir is None:
+        stats_dir = str(Path(CamConfig.from_file(path=config).output_dir) / "stats")
+    rows = list(iter_rollups(stats_dir, start=start.date() if start else None, end=end.date() if end else None,
+                             hourly=hourly))
+
+    buffer = io.StringIO()
+    if fmt == "json":
+        json.dump(rows, buffer, indent=2)
+        buffer.write("\n")
+    elif fmt == "csv":
+        fields = ["device", "date"] + (["hour"] if hourly else []) + ["class_name", "events", "detections",
+                                                                     "dwell_secs"]
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        buffer.write(f"{'device':<12}{'date':<12}{'hour':>5}  {'class':<20}{'events':>8}{'detections':>12}"
+                     f"{'dwell (s)':>12}\n")
+        for row in rows:
+            buffer.write(f"{row['device']:<12}{row['date']:<12}{row.get('hour', ''):>5}  {row['class_name']:<20}"
+                         f"{row['events']:>8}{row['detections']:>12}{row['dwell_secs']:>12}\n")
+
+    if output:
+        Path(output).write_text(buffer.getvalue())
+        click.echo(f"Wrote {len(rows)} rows to {output}")
+    else:
+        click.echo(buffer.getvalue(), nl=False)
+
+@cli.group(short_help="Install, configure and check many cameras at once")
+@click.option("--inventory", required=True, type=click.Path(exists=True, dir_okay=False),
+              help="JSON inventory, or a text file with one host per line.")
+@click.option("--hosts", "only", help="Comma separated host names to limit to.")
+@click.option("--parallel", type=click.IntRange(min=1), default=10, show_default=True,
+              help="Hosts to work on at once.")
+@click.option("--timeout", type=click.FloatRange(min=0, min_open=True), default=300, show_default=True,
+              help="Seconds allowed per host.")
+@click.option("--transport", type=click.Choice(["ssh", "local"]), default="ssh", show_default=True,
+              help="'local' runs commands in ./fleet/<host> for testing.")
+@click.pass_context
+def fleet(ctx: click.Context, inventory: str, only: str | None = None, parallel: int = 10, timeout: float = 300,
+          transport: str = "ssh"):
+    from ai_cam.fleet import Inventory, LocalTransport, SshTransport
+
+    inv = Inventory.from_file(inventory)
+    if only:
+        names = set(only.split(","))
+        inv.hosts = [host for host in inv.hosts if host.name in names]
+    ctx.obj = {
+        "inventory": inv,
+        "transport": LocalTransport() if transport == "local" else SshTransport(),
+        "parallel": parallel,
+        "timeout": timeout,
+    }
+
+
+def _fleet_results(ctx: click.Context, action) -> list:
+    from ai_cam.fleet import run_fleet
+
+    obj = ctx.obj
+    return asyncio.run(run_fleet(obj["inventory"].hosts, action, parallel=obj["parallel"],
+                                 timeout_secs=obj["timeout"]))
+
+
+def _run_fleet(ctx: click.Context, action):
+    from ai_cam.fleet import format_summary
+
+    results = _fleet_results(ctx, action)
+    click.echo(format_summary(results))
+    if not all(r.ok for r in results):
+        ctx.exit(1)
+
+
+@fleet.command("install", short_help="Install the service on every host")
+@click.pass_context
+def fleet_install(ctx: click.Context):
+    from ai_cam.fleet import install
+
+    _run_fleet(ctx, lambda host: install(ctx.obj["transport"], host))
+
+
+@fleet.command("push-config", short_help="Validate and push configs, then reload or restart")
+@click.option("--config", type=click.Path(exists=True, dir_okay=False),
+              help="Base config for all hosts. Applied over each host's current config, with inventory config "
+                   "files and overrides on top.")
+@click.option("--then", "then", type=click.Choice(["reload", "restart", "none"]), default="reload",
+              show_default=True)
+@click.pass_context
+def fleet_push_config(ctx: click.Context, config: str | None = None, then: str = "reload"):
+    from ai_cam.fleet import build_configs, fetch_config, push_config
+
+    # Start from each host's current config so anything not being changed is kept
+    fetched = _fleet_results(ctx, lambda host: fetch_config(ctx.obj["transport"], host))
+    errors = {r.name: r.summary for r in fetched if not r.ok}
+    remote_configs = {r.name: r.details.get("config") for r in fetched if r.ok}
+    configs, invalid = build_configs(ctx.obj["inventory"], config, remote_configs)
+    errors.update(invalid)
+    if errors:
+        for name, error in errors.items():
+            click.echo(f"{name}: {error}", err=True)
+        click.echo("Nothing pushed.", err=True)
+        ctx.exit(1)
+
+    _run_fleet(ctx, lambda host: push_config(ctx.obj["transport"], host, configs[host.name], then=then))
+
+
+@fleet.command("restart", short_help="Restart the service on every host")
+@click.pass_context
+def fleet_restart(ctx: click.Context):
+    from ai_cam.fleet import restart
+
+    _run_fleet(ctx, lambda host: restart(ctx.obj["transport"], host))
+
+
+@fleet.command("status", short_help="Show service state, temperature and free disk of every host")
+@click.pass_context
+def fleet_status(ctx: click.Context):
+    from ai_cam.fleet import status
+
+    _run_fleet(ctx, lambda host: status(ctx.obj["transport"], host))
+
 if __name__ == "__main__":
     cli()
\ No newline at end of file
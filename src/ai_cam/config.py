@@ -1,13 +1,97 @@
-
 import json
 import pathlib
+import re
 from datetime import time
 from pathlib import Path
+from typing import Any, Literal
 
-from pydantic import Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from pydantic_settings import BaseSettings
 from platformdirs import user_data_dir
 
+from ai_cam.serializers import load_file
+
+# Fields applied between frames without touching the camera
+LIVE_FIELDS = {"device_name", "labels", "valid_classes", "confidence", "iou_threshold", "ips", "ema_alpha",
+               "event_activate", "event_deactivate", "save_images", "save_data", "draw_bbox", "config_watch_secs",
+               "class_confidence", "zones"}
+# Fields that can only change by rebuilding part of the capture pipeline at runtime
+CAMERA_FIELDS = {"video_size", "buffer_secs", "save_video"}
+DETECTOR_FIELDS = {"model"}
+# Fields applied by swapping the scheduler once the rest of a reloaded config has been applied
+SCHEDULE_FIELDS = {"schedule", "latitude", "longitude", "schedule_check_secs"}
+
+
+class GovernorTier(BaseModel, extra="forbid"):
+    name: str = Field(description="Name used in logs")
+    temp_c: float | None = Field(default=None, description="Enter this tier at or above this SoC temperature")
+    min_battery_v: float | None = Field(default=None, description="Enter this tier below this battery voltage")
+    ips_scale: float = Field(default=1.0, gt=0, le=1, description="Multiplier applied to ips")
+    save_video: bool = Field(default=True, description="Allow video encoding in this tier")
+    save_images: bool = Field(default=True, description="Allow image saving in this tier")
+
+
+class DetectionZone(BaseModel, extra="forbid"):
+    name: str = Field(description="Name used in logs")
+    mode: Literal["include", "exclude"] = Field(default="exclude", description="Only allow or ignore detections centred here")
+    polygon: list[tuple[float, float]] = Field(min_length=3, description="Vertices as [x, y] relative to the image (0-1)")
+
+    @field_validator("polygon")
+    @classmethod
+    def _check_polygon(cls, value: list[tuple[float, float]]) -> list[tuple[float, float]]:
+        if not all(0 <= x <= 1 and 0 <= y <= 1 for x, y in value):
+            raise ValueError("zone vertices must be relative coordinates between 0 and 1")
+        return value
+
+
+class SimulatedFaults(BaseModel, extra="forbid"):
+    capture_error: float = Field(default=0, ge=0, le=1, description="Chance a capture raises an error")
+    none_frame: float = Field(default=0, ge=0, le=1, description="Chance a capture returns no frame")
+    stall: float = Field(default=0, ge=0, le=1, description="Chance a capture stalls")
+    stall_secs: float = Field(default=10, ge=0, description="Length of an injected stall")
+    detector_error: float = Field(default=0, ge=0, le=1, description="Chance reading the tensors raises an error")
+    missing_tensor: float = Field(default=0, ge=0, le=1, description="Chance a frame has no inference result")
+    seed: int | None = Field(default=None, description="Random seed for reproducible fault sequences")
+    tensor_lag_frames: int = Field(default=0, ge=0, description="Frames the simulated tensor trails its frame")
+
+
+SUN_TIME_SPEC = re.compile(r"^(sunrise|sunset)([+-]\d+)?$")
+
+
+class ScheduleProfile(BaseModel, extra="forbid"):
+    name: str = Field(description="Name used in logs")
+    start: str = Field(description="Start as HH:MM, sunrise or sunset with optional +/- minutes (e.g. sunrise-30)")
+    end: str = Field(description="End as HH:MM, sunrise or sunset with optional +/- minutes")
+    sleep: bool = Field(default=False, description="Stop the camera during this window")
+    overrides: dict[str, Any] = Field(default_factory=dict, description="Config fields to override in this window")
+
+    @field_validator("start", "end")
+    @classmethod
+    def _check_time_spec(cls, value: str) -> str:
+        if SUN_TIME_SPEC.match(value):
+            return value
+        try:
+            time.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"invalid schedule time '{value}'") from None
+        return value
+
+    @field_validator("overrides")
+    @classmethod
+    def _check_overrides(cls, value: dict[str, Any]) -> dict[str, Any]:
+        not_live = set(value) - LIVE_FIELDS
+        if not_live:
+            raise ValueError(f"schedule profiles can only override live fields, not {sorted(not_live)}")
+        return value
+
+
+def _default_governor_tiers() -> list[GovernorTier]:
+    return [
+        GovernorTier(name="warm", temp_c=70, ips_scale=0.5),
+        GovernorTier(name="hot", temp_c=77, ips_scale=0.25, save_video=False),
+        GovernorTier(name="critical", temp_c=82, ips_scale=0.1, save_video=False, save_images=False),
+    ]
+
 
 class CamConfig(BaseSettings, extra="forbid"):
     output_dir: str = Field(default="output", description="Directory name to save detection results")
@@ -19,6 +103,8 @@ class CamConfig(BaseSettings, extra="forbid"):
 
     confidence: float = Field(default=0.5, ge=0, le=1, description="Confidence threshold")
     iou_threshold: float = Field(default=0.5, ge=0, le=1, description="IOU threshold")
+    class_confidence: dict[str, float] = Field(default_factory=dict, description="Per-class confidence thresholds overriding confidence")
+    zones: list[DetectionZone] = Field(default_factory=list, description="Include/exclude zones tested against box centres")
 
     ips: int = Field(default=5, gt=0, description="Inferences per second")
 
@@ -35,6 +121,101 @@ class CamConfig(BaseSettings, extra="forbid"):
     save_data: bool = Field(default=True, description="Save detection data json")
     auto_select_media: bool = Field(default=False, description="Auto select mounted /media storage device")
     draw_bbox: bool = Field(default=False, description="Draw bounding boxes on saved images")
+    save_journal: bool = Field(default=False, description="Save every inference result to hourly journals for reprocessing")
+    save_stats: bool = Field(default=True, description="Keep hourly per-class activity rollups in the stats directory")
+
+    tensor_capture: Literal["off", "ring", "events"] = Field(default="off", description="Capture raw output tensors for replay")
+    tensor_retention_mins: float = Field(default=10, gt=0, description="Minutes of captured tensors to keep")
+    tensor_segment_secs: float = Field(default=60, gt=0, description="Seconds of tensors per capture segment file")
+    tensor_event_padding_secs: float = Field(default=5, ge=0, description="Seconds of tensors kept around events in events mode")
+
+    classifier_enabled: bool = Field(default=False, description="Classify peak frame crops with a second, host side model")
+    classifier_backend: Literal["onnx", "opencv", "stub"] = Field(default="onnx", description="Runtime for the second stage classifier")
+    classifier_model: str | None = Field(default=None, description="Path to the second stage classifier model (e.g. .onnx)")
+    classifier_labels: str = Field(default="models/common_bird_names.txt", description="Path to the classifier labels")
+    classifier_classes: list[str] = Field(default_factory=lambda: ["bird"], description="Detector classes passed to the classifier")
+    classifier_min_score: float = Field(default=0.3, ge=0, le=1, description="Minimum classifier score to report a label")
+    classifier_workers: int = Field(default=1, gt=0, description="Classifier worker threads")
+
+    preview_enabled: bool = Field(default=False, description="Serve a local MJPEG preview and detection event stream")
+    preview_host: str = Field(default="127.0.0.1", description="Address the preview server binds to (0.0.0.0 for the whole network)")
+    preview_port: int = Field(default=8000, gt=0, lt=65536, description="Port the preview server listens on")
+    preview_size: str = Field(default="640,360", description="Preview size as width,height")
+    preview_fps: float = Field(default=2, gt=0, description="Max preview frames per second")
+    preview_quality: int = Field(default=70, ge=1, le=100, description="Preview JPEG quality")
+
+    sync_enabled: bool = Field(default=False, description="Upload saved outputs in compressed bundles")
+    sync_sink: Literal["local", "http", "s3"] = Field(default="local", description="Where bundles are uploaded to")
+    sync_target: str = Field(default="sync", description="Target directory, HTTP URL or s3://bucket/prefix")
+    sync_token: str | None = Field(default=None, description="Bearer token for the HTTP sink")
+    sync_s3_endpoint: str | None = Field(default=None, description="Endpoint URL of an S3 compatible store")
+    sync_interval_secs: float = Field(default=300, gt=0, description="Seconds between sync passes")
+    sync_batch_files: int = Field(default=200, gt=0, description="Max files per uploaded bundle")
+    sync_bandwidth_kbps: float = Field(default=0, ge=0, description="Upload bandwidth cap in kbit/s (0 = unlimited)")
+    sync_delete_after_upload: bool = Field(default=False, description="Delete outputs once their upload is confirmed")
+    storage_quota_mb: float = Field(default=0, ge=0, description="Delete oldest synced outputs above this size (0 = off)")
+
+    governor_enabled: bool = Field(default=False, description="Throttle on high temperature or low battery")
+    governor_tiers: list[GovernorTier] = Field(default_factory=_default_governor_tiers, description="Throttling tiers, least to most restrictive")
+    governor_sample_secs: float = Field(default=10, gt=0, description="Seconds between telemetry samples")
+    governor_hysteresis_c: float = Field(default=5, ge=0, description="Degrees below a tier's temp_c before it is left")
+    governor_battery_hysteresis_v: float = Field(default=0.2, ge=0, description="Volts above a tier's min_battery_v before it is left")
+    governor_power_supply: str | None = Field(default=None, description="Battery name under /sys/class/power_supply")
+
+    latitude: float | None = Field(default=None, ge=-90, le=90, description="Site latitude for sunrise/sunset schedules")
+    longitude: float | None = Field(default=None, ge=-180, le=180, description="Site longitude for sunrise/sunset schedules")
+    schedule: list[ScheduleProfile] = Field(default_factory=list, description="Time of day profiles, first match wins")
+    schedule_check_secs: float = Field(default=30, gt=0, description="Seconds between schedule checks")
+
+    capture_backend: Literal["picamera2", "simulated"] = Field(default="picamera2", description="Camera and detector backend")
+    simulated_faults: SimulatedFaults = Field(default_factory=SimulatedFaults, description="Faults injected by the simulated backend")
+    frame_deadline_secs: float = Field(default=5, gt=0, description="Reinitialise the camera after this long without a frame")
+    tensor_deadline_secs: float = Field(default=10, gt=0, description="Reinitialise the detector after this long without an inference result")
+    recovery_backoff_secs: float = Field(default=1, ge=0, description="Initial delay before reinitialising after a fault")
+    recovery_backoff_max_secs: float = Field(default=20, ge=0, description="Maximum delay between recovery attempts")
+    recovery_max_attempts: int = Field(default=10, gt=0, description="Consecutive failed recoveries before exiting for systemd to restart")
+
+    tensor_lag_frames: int = Field(default=0, ge=0, description="Frames the output tensor trails the frame it arrives with")
+    trace_enabled: bool = Field(default=False, description="Trace per-frame latency from sensor timestamp to disk")
+    trace_sample_every: int = Field(default=100, gt=0, description="Export every Nth frame trace (plus every frame that saved output)")
+    trace_summary_secs: float = Field(default=300, gt=0, description="Seconds between latency percentile summaries")
+
+    serializer: Literal["json", "orjson", "msgpack", "auto"] = Field(default="json", description="Format for detection data files")
+
+    config_watch_secs: float = Field(default=2, ge=0, description="Seconds between config file change checks (0 = SIGHUP only)")
+
+    @field_validator("video_size", "preview_size")
+    @classmethod
+    def _check_size(cls, value: str) -> str:
+        try:
+            width, height = map(int, value.split(","))
+        except ValueError:
+            raise ValueError("size must be width,height, e.g. 1920,1080") from None
+        if width <= 0 or height <= 0:
+            raise ValueError("width and height must be positive")
+        return value
+
+    @field_validator("class_confidence")
+    @classmethod
+    def _check_class_confidence(cls, value: dict[str, float]) -> dict[str, float]:
+        if not all(0 <= v <= 1 for v in value.values()):
+            raise ValueError("class confidences must be between 0 and 1")
+        return value
+
+    @model_validator(mode="after")
+    def _check_schedule(self) -> "CamConfig":
+        uses_sun = any(SUN_TIME_SPEC.match(p.start) or SUN_TIME_SPEC.match(p.end) for p in self.schedule)
+        if uses_sun and (self.latitude is None or self.longitude is None):
+            raise ValueError("latitude and longitude are required for sunrise/sunset schedules")
+        for profile in self.schedule:
+            type(self).model_validate({**self.model_dump(exclude={"schedule"}), **profile.overrides})
+        return self
+
+    def with_overrides(self, overrides: dict[str, Any]) -> "CamConfig":
+        """Return a validated copy of this config with some fields replaced."""
+        if not overrides:
+            return self
+        return type(self).model_validate({**self.model_dump(), **overrides})
 
     @classmethod
     def from_file(cls, path: str | None = None):
@@ -44,8 +225,7 @@ class CamConfig(BaseSettings, extra="forbid"):
         if ext == ".json":
             config_path = Path(path)
             if config_path.exists():
-                with open(path) as f:
-                    return cls.model_validate(json.load(f))
+                return cls.model_validate(load_file(path))
             else:
                 config_path.parent.mkdir(parents=True, exist_ok=True)
                 cfg = cls()
@@ -53,6 +233,7 @@ class CamConfig(BaseSettings, extra="forbid"):
                 # Update paths relative to config file folder
                 cfg.model = str(config_path.parent / cfg.model)
                 cfg.labels = str(config_path.parent / cfg.labels)
+                cfg.classifier_labels = str(config_path.parent / cfg.classifier_labels)
                 cfg.output_dir = str(config_path.parent / cfg.output_dir)
 
                 data = cfg.model_dump(mode='json')
@@ -61,3 +242,7 @@ class CamConfig(BaseSettings, extra="forbid"):
                 return cfg
 
         raise ValueError(f"unsupported file type '{ext}'")
+
+
+# Fields that only take effect after the service is restarted
+RESTART_FIELDS = set(CamConfig.model_fields) - LIVE_FIELDS - CAMERA_FIELDS - DETECTOR_FIELDS - SCHEDULE_FIELDS
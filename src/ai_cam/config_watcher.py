@@ -0,0 +1,78 @@
+import logging
+import os
+import threading
+
+from pydantic import ValidationError
+
+from ai_cam.config import CamConfig
+
+
+class ConfigWatcher:
+    """Reload the config file when it changes on disk or when `request_reload` is called (on SIGHUP).
+
+    Parsing and validation happen on a background thread; the capture loop only picks up the latest valid
+    config through `poll` between frames. Invalid files are logged and ignored.
+    """
+    def __init__(self, path: str, poll_secs: float = 2):
+        self.logger = logging.getLogger(__name__)
+
+        self.path = path
+        self.poll_secs = poll_secs
+
+        self._stat = self._file_stat()
+        self._pending: CamConfig | None = None
+        self._lock = threading.Lock()
+        self._reload = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self.logger.info("Watching %s for config changes", self.path)
+
+    def stop(self):
+        self._stop.set()
+        self._reload.set()
+
+    def poll(self) -> CamConfig | None:
+        """Return a newly loaded config once, or None if nothing changed."""
+        with self._lock:
+            config, self._pending = self._pending, None
+        return config
+
+    def request_reload(self):
+        """Reload the file even if it looks unchanged. Safe to call before `start`, the reload then runs first."""
+        self._reload.set()
+
+    def _file_stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _run(self):
+        while not self._stop.is_set():
+            forced = self._reload.wait(self.poll_secs if self.poll_secs > 0 else None)
+            self._reload.clear()
+            if self._stop.is_set():
+                break
+
+            stat = self._file_stat()
+            if stat is None:
+                # CamConfig.from_file would write out a default config in its place
+                if forced:
+                    self.logger.warning("Not reloading, %s does not exist", self.path)
+                continue
+            if not forced and stat == self._stat:
+                continue
+            self._stat = stat
+
+            try:
+                config = CamConfig.from_file(path=self.path)
+            except (OSError, ValueError, ValidationError) as e:
+                self.logger.warning("Ignoring invalid config %s: %s", self.path, e)
+                continue
+
+            with self._lock:
+                self._pending = config
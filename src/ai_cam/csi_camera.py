@@ -10,7 +10,7 @@ import logging
 from typing import List
 
 from datetime import datetime
-from ai_cam.utils import DetectionResultYOLO, draw_detections
+from ai_cam.utils import DetectionBatch, DetectionResultYOLO, draw_detections
 
 class CameraCSI():
     def __init__(self, device_name: str, video_wh: Tuple[int, int] = (1920,1080),
@@ -53,14 +53,19 @@ class CameraCSI():
             self.output = CircularOutput(buffersize=self.buffer_secs * fps)
             self.picam2.start_recording(self.encoder, self.output, quality=Quality.HIGH)
             self.logger.info(f"Saving Video")
+        self.encoder_running = self.save_video
 
-    def get_frames(self) -> Optional[Tuple[np.ndarray, np.ndarray, Metadata]]:
-        # Capture and process frame
-        (frame, ), metadata = self.picam2.capture_arrays(["main"])
+    def get_frames(self, timeout: Optional[float] = None) -> Optional[Tuple[np.ndarray, np.ndarray, Metadata]]:
+        # Capture and process frame. A numeric wait is used as a timeout and raises TimeoutError when exceeded
+        (frame, ), metadata = self.picam2.capture_arrays(["main"], wait=timeout)
 
         return frame, metadata
 
-    def update_detections(self, detections: List[DetectionResultYOLO]):
+    def set_draw_bbox(self, draw_bbox: bool):
+        self.draw_bbox = draw_bbox
+        self.picam2.post_callback = self.video_bbox if self.draw_bbox else None
+
+    def update_detections(self, detections: List[DetectionResultYOLO] | DetectionBatch):
         self.latest_detections = detections
 
     def video_bbox(self, request):
@@ -85,6 +90,29 @@ class CameraCSI():
         else:
             self.logger.info("Save video is not running!")
 
+    def pause_video_encoder(self):
+        """Stop H.264 encoding entirely to save CPU, e.g. when throttling."""
+        if self.save_video and self.encoder_running:
+            self.logger.info("Pausing video encoder")
+            self.picam2.stop_encoder(self.encoder)
+            self.encoder_running = False
+
+    def resume_video_encoder(self):
+        if self.save_video and not self.encoder_running:
+            self.logger.info("Resuming video encoder")
+            self.picam2.start_encoder(self.encoder, self.output, quality=Quality.HIGH)
+            self.encoder_running = True
+
+    def sleep(self):
+        """Stop streaming (and with it the IMX500) while keeping the configuration and firmware loaded."""
+        self.pause_video_encoder()
+        self.picam2.stop()
+        self.logger.info("Camera sleeping")
+
+    def wake(self):
+        self.picam2.start()
+        self.logger.info("Camera awake")
+
     def stop_camera(self):
         self.picam2.stop()
         self.picam2.close()
\ No newline at end of file
@@ -7,10 +7,41 @@ import json
 import cv2
 
 import ai_cam.utils as utils
+from ai_cam.serializers import Serializer, get_serializer
+
+class DetectionEncoder:
+    """Encode detection lists into a single blob per record.
+
+    With the stdlib json backend, DetectionBatch records are assembled from cached per-class fragments
+    instead of going through intermediate dicts, and the output is identical to `json.dumps(to_dicts())`.
+    """
+    def __init__(self, serializer: Serializer):
+        self.serializer = serializer
+        self._class_fragments: dict[str, str] = {}
+
+    def _class_fragment(self, class_name: str) -> str:
+        fragment = self._class_fragments.get(class_name)
+        if fragment is None:
+            fragment = f'"class_name":{json.dumps(class_name)},'
+            self._class_fragments[class_name] = fragment
+        return fragment
+
+    def encode(self, detections) -> bytes:
+        if type(self.serializer) is not Serializer or not isinstance(detections, utils.DetectionBatch):
+            return self.serializer.dumps(utils.detections_to_dicts(detections))
+
+        scores = detections.scores.round(4).tolist()
+        parts = [
+            f'{{"score":{score!r},{self._class_fragment(class_name)}'
+            f'"bbox":{{"xmin":{box[0]!r},"ymin":{box[1]!r},"xmax":{box[2]!r},"ymax":{box[3]!r}}}}}'
+            for score, class_name, box in zip(scores, detections.names, detections.boxes.tolist(), strict=True)
+        ]
+        return f"[{','.join(parts)}]".encode()
+
 
 class DataLogger:
     def __init__(self, device_name: str, output_dir: str, save_data: bool,
-                 save_images: bool, draw_bbox: bool, auto_select_media: bool):
+                 save_images: bool, draw_bbox: bool, auto_select_media: bool, serializer: str = "json"):
 
         self.logger = logging.getLogger(__name__)
         self.logger.info(f"Data Logger Created")
@@ -20,6 +51,9 @@ class DataLogger:
         self.draw_bbox = draw_bbox
         self.save_data = save_data
 
+        self.serializer = get_serializer(serializer)
+        self.encoder = DetectionEncoder(self.serializer)
+
         self.logger.info(f"Saving Images: {str(self.save_images)}")
         self.logger.info(f"Saving detection data: {str(self.save_data)}")
 
@@ -43,10 +77,21 @@ class DataLogger:
         self.json_detections_path = os.path.join(self.data_output, "detections")
         os.makedirs(self.json_detections_path, exist_ok=True)
 
+        self.events_path = os.path.join(self.data_output, "events")
+        os.makedirs(self.events_path, exist_ok=True)
+
+        # Optional ai_cam.sync.SyncTracker notified of every written file
+        self.sync_tracker = None
+
+    def _track(self, path):
+        if self.sync_tracker is not None:
+            self.sync_tracker.track(path)
+
     def _save_img(self, detection_list, frame, timestamp, frame_type):
         if self.draw_bbox:
             try:
-                frame = utils.draw_detections(detection_list, frame)
+                # Draw on a copy, event peak frames are cropped for the classifier after they are saved
+                frame = utils.draw_detections(detection_list, frame.copy())
             except Exception as e:
                 self.logger.info(f"Failed Drawing detections!: {e}")
 
@@ -57,19 +102,25 @@ class DataLogger:
         image_path = os.path.join(self.image_detections_path, filename)
         try:
             image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            cv2.imwrite(image_path, image_rgb)
+            if cv2.imwrite(image_path, image_rgb):
+                self._track(image_path)
+                return image_path
         except Exception as e:
             self.logger.info(f"Image saving failed: {e}")
+        return None
 
-    def _to_json(self, detection_list, filename):
+    def _write_data(self, data: bytes, filename, directory=None):
         try:
-            # Log detections locally
-            json_path = os.path.join(self.json_detections_path, f"{filename}.json")
-            with open(json_path, 'w') as f:
-                json.dump(detection_list, f, indent=2)
+            # Log detections locally as a single buffered write
+            data_path = os.path.join(directory or self.json_detections_path, f"{filename}{self.serializer.extension}")
+            with open(data_path, 'wb') as f:
+                f.write(data)
+            self._track(data_path)
+            return data_path
 
         except Exception as e:
             self.logger.info(f"Local detection logging failed: {e}")
+        return None
 
     def log_data(self, detection_list, timestamp, log_type):
 
@@ -77,14 +128,18 @@ class DataLogger:
         # filename with timestamp with only the first 3 digits of the microseconds (milliseconds)
         filename = f"{self.device_name}_{log_type}_{timestamp_str}"
 
-        # Convert detection objects to dict
-        detection_dict_list = [detection.to_dict() for detection in detection_list]
-
-        self._to_json(detection_dict_list, filename)
+        return self._write_data(self.encoder.encode(detection_list), filename)
 
-    def log_results(self, detection_list, frame, timestamp, frame_type: str = "detection"):
+    def log_results(self, detection_list, frame, timestamp, frame_type: str = "detection") -> dict:
+        """Save the image and/or detection data for a frame, returning the paths written."""
+        paths = {}
         if self.save_images:
-            self._save_img(detection_list, frame, timestamp, frame_type=frame_type)
-            
+            paths["image"] = self._save_img(detection_list, frame, timestamp, frame_type=frame_type)
+
         if self.save_data:
-            self.log_data(detection_list, timestamp, log_type=frame_type)
+            paths["data"] = self.log_data(detection_list, timestamp, log_type=frame_type)
+        return {kind: path for kind, path in paths.items() if path}
+
+    def log_event(self, record: dict):
+        """Save an event summary record (see ai_cam.event_summary)."""
+        return self._write_data(self.serializer.dumps(record), record["event_id"], directory=self.events_path)
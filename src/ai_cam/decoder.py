@@ -0,0 +1,129 @@
+import logging
+
+import numpy as np
+
+from ai_cam.config import DetectionZone
+from ai_cam.filters import DetectionFilter
+from ai_cam.utils import DetectionBatch, apply_nms, read_class_list
+
+
+class YoloDecoder:
+    """Hardware independent YOLO output decoding, shared by the live IMX500 detector and offline replay."""
+    def __init__(self, labels_path: str, valid_classes_path: str | None, confidence: float,
+                 iou_threshold: float, model_wh: tuple[int, int] = (640, 640),
+                 sensor_resolution: tuple[int, int] = (4056, 3040),
+                 class_confidence: dict[str, float] | None = None, zones: list[DetectionZone] | None = None,
+                 tensor_lag_frames: int = 0):
+        self.logger = logging.getLogger(__name__)
+
+        self.confidence = confidence
+        self.iou_threshold = iou_threshold
+        self.class_confidence = class_confidence or {}
+        self.zones = zones or []
+        self.model_wh = model_wh
+        self.sensor_resolution = sensor_resolution
+        self.tensor_lag_frames = tensor_lag_frames
+
+        self.load_classes(labels_path, valid_classes_path)
+
+    def load_classes(self, labels_path: str, valid_classes_path: str | None):
+        """Load class names and valid classes."""
+        self.class_names = read_class_list(labels_path)
+        self.valid_classes_path = valid_classes_path
+        if self.valid_classes_path:
+            self.valid_classes = read_class_list(self.valid_classes_path)
+            self.logger.info("Monitoring for classes: %s", ', '.join(sorted(self.valid_classes)))
+        else:
+            self.valid_classes = None
+            self.logger.info("Monitoring all classes")
+        self._build_filter()
+
+    def set_thresholds(self, confidence: float, iou_threshold: float,
+                       class_confidence: dict[str, float] | None = None):
+        self.confidence = confidence
+        self.iou_threshold = iou_threshold
+        self.class_confidence = class_confidence or {}
+        self._build_filter()
+
+    def set_zones(self, zones: list[DetectionZone] | None):
+        self.zones = zones or []
+        self._build_filter()
+
+    def _build_filter(self):
+        self.filter = DetectionFilter(self.class_names, self.confidence, self.valid_classes,
+                                      self.class_confidence, self.zones)
+
+    def tensor_timestamp(self, metadata: dict) -> int | None:
+        """SensorTimestamp (ns) of the frame the output tensor was computed from.
+
+        The tensor in a request can trail that request's own frame by a fixed number of frames, set by
+        `tensor_lag_frames` and measured with FrameDuration (us).
+        """
+        sensor_ns = metadata.get("SensorTimestamp")
+        if sensor_ns is None or not self.tensor_lag_frames:
+            return sensor_ns
+        return sensor_ns - int(self.tensor_lag_frames * metadata.get("FrameDuration", 0) * 1000)
+
+    def convert_inference_boxes(self, boxes: np.ndarray, metadata: dict) -> np.ndarray:
+        """Vectorised IMX500Yolo.convert_inference_coords for an (N, 4) array of relative xyxy boxes.
+        Returns relative xyxy boxes in the output image space, using the same integer maths as libcamera's
+        Rectangle bounded_to / translated_by / scaled_by.
+        """
+        sensor_w, sensor_h = self.sensor_resolution
+        crop_x, crop_y, crop_w, crop_h = metadata['ScalerCrop']
+        model_w, model_h = self.model_wh
+
+        obj = np.maximum(
+            np.stack([boxes[:, 0] * sensor_w, boxes[:, 1] * sensor_h,
+                      (boxes[:, 2] - boxes[:, 0]) * sensor_w, (boxes[:, 3] - boxes[:, 1]) * sensor_h], axis=1),
+            0
+        ).astype(np.int32).astype(np.int64)
+
+        # bounded_to(scaler_crop) then translated_by(-scaler_crop.topLeft)
+        x0 = np.maximum(obj[:, 0], crop_x)
+        y0 = np.maximum(obj[:, 1], crop_y)
+        width = np.maximum(np.minimum(obj[:, 0] + obj[:, 2], crop_x + crop_w) - x0, 0)
+        height = np.maximum(np.minimum(obj[:, 1] + obj[:, 3], crop_y + crop_h) - y0, 0)
+        x0 -= crop_x
+        y0 -= crop_y
+
+        # scaled_by(isp_output_size, scaler_crop.size)
+        x0 = x0 * model_w // crop_w
+        y0 = y0 * model_h // crop_h
+        width = width * model_w // crop_w
+        height = height * model_h // crop_h
+
+        return np.stack([x0 / model_w, y0 / model_h, (x0 + width) / model_w, (y0 + height) / model_h], axis=1)
+
+    def extract_detections(self, np_outputs: np.ndarray, metadata: dict) -> DetectionBatch | None:
+        """Extract detections from the IMX500 output. Only the 'ScalerCrop' entry of metadata is used."""
+        if np_outputs:
+            boxes, scores, classes = np_outputs[0][0], np_outputs[1][0], np_outputs[2][0]
+            scores = np.asarray(scores, dtype=np.float64)
+            class_ids = np.asarray(classes).astype(np.int64)
+
+            keep = self.filter.score_mask(scores, class_ids)
+            if not keep.any():
+                return DetectionBatch.empty(self.class_names)
+
+            model_wh = np.array(self.model_wh * 2, dtype=np.float64)
+            relative_boxes = np.asarray(boxes, dtype=np.float64)[keep] / model_wh
+            self.logger.debug("%d raw boxes above confidence", int(keep.sum()), extra={"sample": 10})
+
+            results = DetectionBatch(
+                boxes=self.convert_inference_boxes(relative_boxes, metadata),
+                scores=np.round(scores[keep], 4),
+                class_ids=class_ids[keep],
+                class_names=self.class_names
+            )
+            # Zones are tested before NMS so excluded boxes cannot suppress overlapping valid ones
+            if self.filter.zone_grid is not None:
+                results = results.select(self.filter.zone_mask(results.boxes))
+            return apply_nms(results, nms_threshold=self.iou_threshold)
+        else:
+            return None
+
+    def postprocess(self, detections: DetectionBatch) -> DetectionBatch:
+        """Re-apply the confidence, class, zone and NMS filters to already decoded detections."""
+        keep = self.filter.mask(detections.boxes, detections.scores, detections.class_ids)
+        return apply_nms(detections.select(keep), nms_threshold=self.iou_threshold)
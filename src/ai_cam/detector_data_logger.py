@@ -1,40 +1,72 @@
 import time
 import signal
 import logging
-import sys
 from datetime import datetime
+from pathlib import Path
 
 import sdnotify
 
 from ai_cam.data_loggers import DataLogger
-from ai_cam.config import CamConfig
-from ai_cam.imx500_detector import IMX500Yolo
-from ai_cam.csi_camera import CameraCSI
+from ai_cam.config import CAMERA_FIELDS, DETECTOR_FIELDS, RESTART_FIELDS, CamConfig
+from ai_cam.config_watcher import ConfigWatcher
+from ai_cam.preview_server import PreviewServer
+from ai_cam.sync import SyncAgent, SyncTracker, create_sink
+from ai_cam.events import EVENT_END, EVENT_START, EVENT_UPDATE, EventStateMachine
+from ai_cam.journal import DetectionJournal
+from ai_cam.rollups import RollupStore
+from ai_cam.classifier import SpeciesClassifier, create_backend
+from ai_cam.tensor_capture import TensorRecorder
+from ai_cam.governor import Governor, SysfsTelemetry
+from ai_cam.logging_ import RotatingCSVLogger
+from ai_cam.schedule import Scheduler
+from ai_cam.event_summary import EventAggregator
+from ai_cam.tracing import FrameMatcher, FrameTrace, LatencyTracer, sensor_datetime
+from ai_cam.utils import read_class_list
+from ai_cam.supervisor import (ACTION_REINIT_DETECTOR, ACTION_RETRY, COMPONENT_CAMERA, COMPONENT_DETECTOR,
+                               CaptureSupervisor, Fault)
 
 
 class DetectorLogger:
-    def __init__(self, config):
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            stream=sys.stdout
-        )
-        logging.info("Capture Box Awake!")
+    def __init__(self, config, config_path: str | None = None):
+        self.logger = logging.getLogger(__name__)
+        self.logger.info("Capture Box Awake!")
         self.n = sdnotify.SystemdNotifier()
         self._running = False
 
         signal.signal(signal.SIGTERM, self._handle_shutdown)
         signal.signal(signal.SIGINT, self._handle_shutdown)
+        # Installed before the model loads, so a reload sent during startup is queued instead of ending the service
+        self.config_watcher = None
+        self._reload_requested = False
+        signal.signal(signal.SIGHUP, self._handle_reload)
 
+        # Config as loaded from file; self.config is this plus any active schedule profile overrides
+        self.base_config = config
         self.config = config
 
-        self.detector = IMX500Yolo(
-            model_path=self.config.model,
-            labels_path=self.config.labels,
-            valid_classes_path=self.config.valid_classes,
-            confidence=self.config.confidence,
-            iou_threshold=self.config.iou_threshold
+        self.scheduler = None
+        self.profile = None
+        self.sleeping = False
+        self.wake_requested_at = None
+        self.wake_latencies: list[float] = []
+        self._next_schedule_check = 0.0
+        if self.config.schedule:
+            self.scheduler = Scheduler(self.config.schedule, self.config.latitude, self.config.longitude)
+
+        self.supervisor = CaptureSupervisor(
+            frame_deadline_secs=self.config.frame_deadline_secs,
+            tensor_deadline_secs=self.config.tensor_deadline_secs,
+            backoff_secs=self.config.recovery_backoff_secs,
+            backoff_max_secs=self.config.recovery_backoff_max_secs,
+            max_attempts=self.config.recovery_max_attempts
         )
+        self._last_heartbeat = time.time()
+
+        # Recent frames by sensor timestamp, for pairing each inference result with the frame it came from
+        self.frame_matcher = FrameMatcher(size=self.config.tensor_lag_frames + 2)
+        self.frame_sensor_ns = None
+
+        self.detector = self._create_detector()
 
         self.data_logger = DataLogger(
             device_name=self.config.device_name,
@@ -42,15 +74,168 @@ class DetectorLogger:
             save_data=self.config.save_data,
             save_images=self.config.save_images,
             draw_bbox=self.config.draw_bbox,
-            auto_select_media=self.config.auto_select_media
+            auto_select_media=self.config.auto_select_media,
+            serializer=self.config.serializer
         )
 
+        self.camera = self._create_camera()
+
+        self.journal = None
+        if self.config.save_journal:
+            self.journal = DetectionJournal(self.data_logger.data_output, self.config.device_name)
+
+        self.classifier = None
+        if self.config.classifier_enabled:
+            self.classifier = self._create_classifier()
+
+        self.rollups = None
+        if self.config.save_stats:
+            self.rollups = RollupStore(self.data_logger.data_output, self.config.device_name)
+
+        self.tensor_recorder = None
+        if self.config.tensor_capture != "off":
+            self.tensor_recorder = TensorRecorder(
+                data_output=self.data_logger.data_output,
+                device_name=self.config.device_name,
+                model_wh=self.detector.model_wh,
+                mode=self.config.tensor_capture,
+                retention_mins=self.config.tensor_retention_mins,
+                segment_secs=self.config.tensor_segment_secs,
+                event_padding_secs=self.config.tensor_event_padding_secs,
+            )
+
+        self.tracer = None
+        if self.config.trace_enabled:
+            self.tracer = LatencyTracer(
+                data_output=self.data_logger.data_output,
+                device_name=self.config.device_name,
+                sample_every=self.config.trace_sample_every,
+                summary_secs=self.config.trace_summary_secs,
+            )
+
+        self.governor = None
+        if self.config.governor_enabled:
+            self.governor = Governor(
+                source=SysfsTelemetry(power_supply=self.config.governor_power_supply),
+                tiers=self.config.governor_tiers,
+                sample_secs=self.config.governor_sample_secs,
+                hysteresis_c=self.config.governor_hysteresis_c,
+                battery_hysteresis_v=self.config.governor_battery_hysteresis_v,
+                csv_logger=RotatingCSVLogger(Path(self.data_logger.data_output) / "telemetry"),
+            )
+
+        if config_path is not None:
+            self.config_watcher = ConfigWatcher(config_path, poll_secs=self.config.config_watch_secs)
+            if self._reload_requested:
+                self.config_watcher.request_reload()
+
+        self.sync_agent = None
+        if self.config.sync_enabled:
+            tracker = SyncTracker(self.data_logger.data_output)
+            self.data_logger.sync_tracker = tracker
+            if self.journal is not None:
+                self.journal.sync_tracker = tracker
+            if self.rollups is not None:
+                self.rollups.sync_tracker = tracker
+                self.rollups.track_completed_days()
+            self.sync_agent = SyncAgent(
+                tracker=tracker,
+                sink=create_sink(self.config.sync_sink, self.config.sync_target,
+                                 token=self.config.sync_token, endpoint_url=self.config.sync_s3_endpoint),
+                device_name=self.config.device_name,
+                interval_secs=self.config.sync_interval_secs,
+                batch_files=self.config.sync_batch_files,
+                bandwidth_kbps=self.config.sync_bandwidth_kbps,
+                delete_after_upload=self.config.sync_delete_after_upload,
+                storage_quota_mb=self.config.storage_quota_mb,
+            )
+
+        self.preview = None
+        if self.config.preview_enabled:
+            preview_w, preview_h = map(int, self.config.preview_size.split(','))
+            self.preview = PreviewServer(
+                device_name=self.config.device_name,
+                host=self.config.preview_host,
+                port=self.config.preview_port,
+                preview_wh=(preview_w, preview_h),
+                fps=self.config.preview_fps,
+                quality=self.config.preview_quality,
+            )
+
+        # EMA and event state
+        self.events = EventStateMachine(
+            ema_alpha=self.config.ema_alpha,
+            event_activate=self.config.event_activate,
+            event_deactivate=self.config.event_deactivate
+        )
+        self.encoding = False
+        self.peak_per_class: dict[str, dict] = {}
+        self.event_summary = EventAggregator(self.config.device_name)
+
+        self.video_allowed = True
+        self._apply_runtime_limits()
+
+    def _create_detector(self):
+        if self.config.capture_backend == "simulated":
+            from ai_cam.simulated import SimulatedDetector
+            return SimulatedDetector(
+                labels_path=self.config.labels,
+                valid_classes_path=self.config.valid_classes,
+                confidence=self.config.confidence,
+                iou_threshold=self.config.iou_threshold,
+                class_confidence=self.config.class_confidence,
+                zones=self.config.zones,
+                faults=self.config.simulated_faults
+            )
+
+        from ai_cam.imx500_detector import IMX500Yolo
+        return IMX500Yolo(
+            model_path=self.config.model,
+            labels_path=self.config.labels,
+            valid_classes_path=self.config.valid_classes,
+            confidence=self.config.confidence,
+            iou_threshold=self.config.iou_threshold,
+            class_confidence=self.config.class_confidence,
+            zones=self.config.zones,
+            tensor_lag_frames=self.config.tensor_lag_frames
+        )
+
+    def _create_classifier(self) -> SpeciesClassifier | None:
+        try:
+            backend = create_backend(self.config.classifier_backend, self.config.classifier_model,
+                                     n_labels=len(read_class_list(self.config.classifier_labels)),
+                                     threads=self.config.classifier_workers)
+        except Exception:
+            self.logger.exception("Could not load the %s classifier, disabling it", self.config.classifier_backend)
+            return None
+
+        self.logger.info("Classifying %s with %s model %s", self.config.classifier_classes,
+                         self.config.classifier_backend, self.config.classifier_model)
+        return SpeciesClassifier(backend, self.config.classifier_labels, self.config.classifier_classes,
+                                 min_score=self.config.classifier_min_score, workers=self.config.classifier_workers)
+
+    def _create_camera(self):
         if isinstance(self.config.video_size, str):
             self.video_w, self.video_h = map(int, self.config.video_size.split(','))
         else:
             self.video_w, self.video_h = self.config.video_size
 
-        self.camera = CameraCSI(
+        if self.config.capture_backend == "simulated":
+            from ai_cam.simulated import SimulatedCamera
+            return SimulatedCamera(
+                device_name=self.config.device_name,
+                video_wh=(self.video_w, self.video_h),
+                save_video=self.config.save_video,
+                data_output=self.data_logger.data_output,
+                buffer_secs=self.config.buffer_secs,
+                fps=self.detector.network_ips,
+                draw_bbox=self.config.draw_bbox,
+                faults=self.config.simulated_faults
+            )
+
+        from ai_cam.csi_camera import CameraCSI
+
+        return CameraCSI(
             device_name=self.config.device_name,
             video_wh=(self.video_w, self.video_h),
             save_video=self.config.save_video,
@@ -61,162 +246,446 @@ class DetectorLogger:
             draw_bbox=self.config.draw_bbox,
         )
 
-        # EMA state
-        self.ema_per_class: dict[str, float] = {}
-        self.ema_alpha = self.config.ema_alpha
-        self.event_activate = self.config.event_activate
-        self.event_deactivate = self.config.event_deactivate
-
-        # Event state
-        self.in_event = False
-        self.peak_per_class: dict[str, dict] = {}
+    def apply_config(self, new_config: CamConfig) -> bool:
+        """Apply a new config between frames, rebuilding only the components whose fields changed.
+
+        If the components cannot be rebuilt with the new config (e.g. a model file that doesn't exist), the previous
+        config and pipeline are restored and False is returned.
+        """
+        changed = {name for name in CamConfig.model_fields
+                   if getattr(new_config, name) != getattr(self.config, name)}
+        if not changed:
+            return True
+
+        restart_changed = changed & RESTART_FIELDS
+        if restart_changed:
+            self.logger.warning("Config fields need a service restart to take effect: %s", sorted(restart_changed))
+            new_config = new_config.model_copy(update={name: getattr(self.config, name) for name in restart_changed})
+            changed -= restart_changed
+
+        self.logger.info("Applying config changes: %s", sorted(changed))
+        rebuild_detector = bool(changed & DETECTOR_FIELDS)
+        rebuild_camera = rebuild_detector or bool(changed & CAMERA_FIELDS)
+
+        previous_config, previous_detector = self.config, self.detector
+        self.config = new_config
+        try:
+            self._apply_pipeline_config(changed, rebuild_camera, rebuild_detector)
+        except Exception:
+            self.logger.exception("Could not apply config changes, keeping the previous config")
+            self.config = previous_config
+            # The old detector is still usable unless a new one was already loaded in its place
+            self._apply_pipeline_config(changed, rebuild_camera, self.detector is not previous_detector)
+            return False
+
+        self.data_logger.device_name = self.config.device_name
+        self.event_summary.device_name = self.config.device_name
+        self.data_logger.save_data = self.config.save_data
+        self.data_logger.draw_bbox = self.config.draw_bbox
+
+        self.events.set_params(self.config.ema_alpha, self.config.event_activate, self.config.event_deactivate)
+
+        if self.config_watcher is not None:
+            self.config_watcher.poll_secs = self.config.config_watch_secs
+
+        self._apply_runtime_limits()
+        return True
+
+    def _apply_pipeline_config(self, changed: set[str], rebuild_camera: bool, rebuild_detector: bool):
+        if rebuild_camera:
+            self._rebuild_pipeline(rebuild_detector)
+            return
+
+        if changed & {"labels", "valid_classes"}:
+            self.detector.load_classes(self.config.labels, self.config.valid_classes)
+        self.detector.set_thresholds(self.config.confidence, self.config.iou_threshold,
+                                     self.config.class_confidence)
+        if "zones" in changed:
+            self.detector.set_zones(self.config.zones)
+        self.camera.device_name = self.config.device_name
+        self.camera.set_draw_bbox(self.config.draw_bbox)
+
+    def _rebuild_pipeline(self, rebuild_detector: bool):
+        """Recreate the camera, and optionally the detector, keeping the event, EMA and output state."""
+        try:
+            if self.encoding:
+                self._stop_video_recording()
+            self.camera.stop_camera()
+        except Exception as e:
+            # The camera may be what failed, carry on with a fresh one
+            self.logger.warning("Stopping camera failed: %s", e, exc_info=True)
+        self.encoding = False
+
+        if rebuild_detector:
+            self.detector = self._create_detector()
+        self.camera = self._create_camera()
+        self.frame_matcher.clear()
+
+        if self.events.in_event and self.config.save_video and self.video_allowed:
+            self.camera.start_video_recording("_".join(self.peak_per_class))
+            self.encoding = True
+        self.supervisor.reset_deadlines()
+
+    def _handle_fault(self, fault: Fault):
+        """Recover from a capture fault in-process. Raises SupervisorGaveUp once recovery keeps failing."""
+        if fault.action == ACTION_RETRY:
+            return
+
+        self._sleep_with_heartbeat(fault.delay_secs)
+        try:
+            self._rebuild_pipeline(rebuild_detector=fault.action == ACTION_REINIT_DETECTOR)
+            self._apply_runtime_limits()
+        except Exception as e:
+            self.logger.exception("Reinitialising after %s fault failed", fault.component)
+            self._handle_fault(self.supervisor.classify(fault.component, e))
+
+    def _heartbeat(self):
+        if time.time() - self._last_heartbeat >= 10:
+            self._last_heartbeat = time.time()
+            self.n.notify("WATCHDOG=1")
+
+    def _sleep_with_heartbeat(self, secs: float):
+        end = time.monotonic() + secs
+        while self._running and time.monotonic() < end:
+            time.sleep(min(1.0, end - time.monotonic()))
+            self._heartbeat()
+
+    def _apply_runtime_limits(self):
+        """Combine the configured rate and saving options with any throttling from the governor."""
+        ips_scale = self.governor.ips_scale if self.governor is not None else 1.0
+        self.seconds_per_frame = 1 / (self.config.ips * ips_scale)
+        self.supervisor.min_interval_secs = self.seconds_per_frame
+
+        allow_images = self.governor.allow_images if self.governor is not None else True
+        self.data_logger.save_images = self.config.save_images and allow_images
+
+        self.video_allowed = self.governor.allow_video if self.governor is not None else True
+        if self.video_allowed:
+            self.camera.resume_video_encoder()
+        else:
+            if self.encoding:
+                self._stop_video_recording()
+                self.encoding = False
+            self.camera.pause_video_encoder()
+
+    def _check_schedule(self):
+        """Switch schedule profiles, applying their overrides or putting the camera to sleep."""
+        self._next_schedule_check = time.monotonic() + self.config.schedule_check_secs
+        profile = self.scheduler.active_profile()
+        if profile == self.profile:
+            return
+
+        self.logger.info("Schedule profile: %s", profile.name if profile else 'default')
+        self.profile = profile
+
+        if profile is not None and profile.sleep:
+            self._sleep()
+            return
+
+        if self.sleeping:
+            self._wake()
+        self.apply_config(self.base_config.with_overrides(profile.overrides if profile else {}))
+
+    def _sleep(self):
+        if self.sleeping:
+            return
+        self._end_active_event()
+        self.camera.sleep()
+        self.sleeping = True
+
+    def _end_active_event(self):
+        """Close an event that is still running, so the next detection starts a new one."""
+        if self.events.in_event:
+            self._on_event_end(None, None, datetime.now().astimezone())
+        self.events.reset()
+
+    def _wake(self):
+        self.wake_requested_at = time.monotonic()
+        self.camera.wake()
+        self.sleeping = False
+        self._apply_runtime_limits()
+        self.supervisor.reset_deadlines()
+
+    def _on_config_reload(self, new_config: CamConfig):
+        rebuild_scheduler = (new_config.schedule, new_config.latitude, new_config.longitude) != \
+            (self.config.schedule, self.config.latitude, self.config.longitude)
+        # A new schedule starts from the plain config, the next check picks its profile
+        profile = None if rebuild_scheduler else self.profile
+        overrides = profile.overrides if profile else {}
+
+        previous_config = self.base_config
+        self.base_config = new_config
+        if not self.apply_config(new_config.with_overrides(overrides)):
+            self.base_config = previous_config
+            return
+
+        if rebuild_scheduler:
+            self.scheduler = (Scheduler(new_config.schedule, new_config.latitude, new_config.longitude)
+                              if new_config.schedule else None)
+            self.profile = None
+            self._next_schedule_check = 0.0
+            if self.scheduler is None and self.sleeping:
+                self._wake()
+
+    def _handle_reload(self, signum, frame):
+        self.logger.info("SIGHUP received, reloading config")
+        if self.config_watcher is not None:
+            self.config_watcher.request_reload()
+        else:
+            self._reload_requested = True
 
     def _handle_shutdown(self, signum, frame):
-        logging.info(f"Shutdown signal received ({signum}), cleaning up...")
+        self.logger.info("Shutdown signal received (%s), cleaning up...", signum)
         self._running = False
 
-    def _update_ema(self, detections) -> None:
-        """Update per-class EMA. Classes with no detection this frame decay toward 0."""
-        scores_this_frame: dict[str, float] = {}
-        if detections:
-            for d in detections:
-                if d.class_name not in scores_this_frame or d.score > scores_this_frame[d.class_name]:
-                    scores_this_frame[d.class_name] = d.score
-
-        all_classes = set(self.ema_per_class) | set(scores_this_frame)
-        for cls_name in all_classes:
-            current_score = scores_this_frame.get(cls_name, 0.0)
-            prev_ema = self.ema_per_class.get(cls_name, 0.0)
-
-            self.ema_per_class[cls_name] = (
-                self.ema_alpha * current_score
-                + (1 - self.ema_alpha) * prev_ema
-            )
-
-    def _classes_above_threshold(self) -> list[str]:
-        return [
-            cls_name for cls_name, ema in self.ema_per_class.items()
-            if ema >= self.event_activate
-        ]
-
-    def _all_classes_deactive(self) -> list[str]:
-        deactive = True
-        for cls_name, ema in self.ema_per_class.items():
-            if ema >= self.event_deactivate:
-                deactive = False
-                
-        return deactive
-
-    def _on_event_start(self, detections, frame, timestamp, active_classes):
-        logging.info(f"Event started — active classes: {active_classes}")
-        self.in_event = True
+    def _store_peaks(self, detections, frame, timestamp):
+        if not self.events.new_peaks:
+            return
 
-        # Initialise peak tracking for each active class
-        all_classes = []
-        for cls_name in active_classes:
+        peak_frame = frame.copy()
+        for cls_name in self.events.new_peaks:
             self.peak_per_class[cls_name] = {
-                "ema": self.ema_per_class[cls_name],
-                "frame": frame.copy(),
+                "ema": self.events.peak_ema[cls_name],
+                "frame": peak_frame,
                 "timestamp": timestamp,
+                "sensor_ns": self.frame_sensor_ns,
                 "detections": detections
             }
-            all_classes.append(cls_name)
 
-        all_classes = "_".join(set(all_classes))
-        self.data_logger.log_results(detections, frame, timestamp, frame_type=f"event_start{all_classes}")
+    def _on_event_start(self, detections, frame, timestamp, active_classes):
+        self.logger.info("Event started — active classes: %s", active_classes)
+
+        # Initialise peak tracking for each active class
+        self._store_peaks(detections, frame, timestamp)
+
+        all_classes = "_".join(set(active_classes))
+        self.event_summary.begin(timestamp, active_classes)
+        self.event_summary.update(detections, timestamp)
+        paths = self.data_logger.log_results(detections, frame, timestamp, frame_type=f"event_start{all_classes}")
+        self.event_summary.add_start_media(paths)
 
-        if self.config.save_video:
+        if self.config.save_video and self.video_allowed:
             self.camera.start_video_recording(all_classes)
+            self.encoding = True
 
     def _on_event_update(self, detections, frame, timestamp):
-        for cls_name, ema in self.ema_per_class.items():
-            if ema < self.event_deactivate:
-                continue
-            if cls_name not in self.peak_per_class or ema > self.peak_per_class[cls_name]["ema"]:
-                self.peak_per_class[cls_name] = {
-                    "ema": ema,
-                    "frame": frame.copy(),
-                    "timestamp": timestamp,
-                    "detections": detections
-                }
+        self.event_summary.update(detections, timestamp)
+        self._store_peaks(detections, frame, timestamp)
 
     def _on_event_end(self, detections, frame, timestamp):
-        logging.info(f"Event ended — saving peaks for: {list(self.peak_per_class.keys())}")
+        self.logger.info("Event ended — saving peaks for: %s", list(self.peak_per_class))
+
+        if detections is not None:
+            self.event_summary.update(detections, timestamp)
 
         # Save best frame per species
         for cls_name, peak in self.peak_per_class.items():
-            self.data_logger.log_results(
+            paths = self.data_logger.log_results(
                 peak["detections"], peak["frame"],
                 peak["timestamp"], frame_type=f"event_peak_{cls_name}"
             )
-
-        if self.config.save_video:
-            self.camera.stop_video_recording()
+            self.event_summary.add_peak_media(cls_name, paths)
+            if self.tracer is not None:
+                self.tracer.record_peak_age(peak["sensor_ns"])
+
+        if self.encoding:
+            self._stop_video_recording()
+            self.encoding = False
+
+        if self.event_summary.active:
+            record = self.event_summary.finish(timestamp, self.events.peak_ema)
+            if self.rollups is not None:
+                self.rollups.record_event(record)
+            if self.classifier is not None:
+                # The record is written once the peak crops have been classified on the worker pool
+                species = self.classifier.classify_event(record["event_id"], self.peak_per_class)
+                species.add_done_callback(lambda future, record=record: self._write_event(record, future.result()))
+            else:
+                self._write_event(record)
 
         # Reset event state
-        self.in_event = False
+        self.events.reset_event()
         self.peak_per_class = {}
 
+    def _write_event(self, record: dict, species: dict | None = None):
+        if species:
+            record["species"] = species
+        self.data_logger.log_event(record)
+        self.logger.info("Event %s: %ss, %s frames, classes %s%s", record["event_id"], record["duration_secs"],
+                         record["frames"], list(record["classes"]),
+                         f", species { {c: s['label'] for c, s in species.items()} }" if species else "",
+                         extra={"event_id": record["event_id"], "duration_secs": record["duration_secs"],
+                                "classes": ",".join(record["classes"])})
+
+    def _stop_video_recording(self):
+        self.camera.stop_video_recording()
+        self.event_summary.add_video(self.camera.video_file_name)
+        if self.data_logger.sync_tracker is not None and self.camera.video_file_name:
+            self.data_logger.sync_tracker.track(self.camera.video_file_name)
+
     def run(self):
         self._running = True
 
-        seconds_per_frame = 1 / self.config.ips
         last_frame_time = time.time()
-        last_heartbeat_time = time.time()
 
-        logging.info("Waiting for startup...")
+        self.logger.info("Waiting for startup...")
         time.sleep(2)
-        logging.info("Starting!")
+        self.logger.info("Starting!")
         self.n.notify("READY=1")
 
-        encoding = False
+        if self.preview is not None:
+            self.preview.start()
+        if self.sync_agent is not None:
+            self.sync_agent.start()
+        if self.config_watcher is not None:
+            self.config_watcher.start()
+        if self.tensor_recorder is not None:
+            self.tensor_recorder.start()
 
+        self.supervisor.reset_deadlines()
         try:
             while self._running:
-                timestamp = datetime.now().astimezone()
+                # Systemd watchdog
+                self._heartbeat()
+
+                if self.config_watcher is not None:
+                    new_config = self.config_watcher.poll()
+                    if new_config is not None:
+                        self._on_config_reload(new_config)
+
+                if self.scheduler is not None and time.monotonic() >= self._next_schedule_check:
+                    self._check_schedule()
+
+                if self.sleeping:
+                    time.sleep(1)
+                    continue
+
+                if self.governor is not None and self.governor.update():
+                    self._apply_runtime_limits()
+
+                try:
+                    frame, metadata = self.camera.get_frames(timeout=self.config.frame_deadline_secs)
+                except Exception as e:  # noqa: BLE001 - the supervisor re-raises what it cannot recover
+                    self._handle_fault(self.supervisor.classify(COMPONENT_CAMERA, e))
+                    continue
+                capture_ns = time.monotonic_ns()
 
-                frame, metadata = self.camera.get_frames()
                 if frame is None:
+                    # Don't spin on a camera returning nothing, and let the stall check catch it if it persists
+                    stall = self.supervisor.check_stall()
+                    if stall is not None:
+                        self._handle_fault(stall)
+                    else:
+                        time.sleep(min(self.seconds_per_frame, 0.1))
                     continue
+                self.supervisor.frame_ok()
+                sensor_ns = metadata.get("SensorTimestamp")
+                self.frame_matcher.add(sensor_ns, frame)
 
-                detection_results = self.detector.get_detections(metadata)
+                if self.preview is not None:
+                    self.preview.submit_frame(frame)
+
+                try:
+                    detection_results = self.detector.get_detections(metadata)
+                except Exception as e:  # noqa: BLE001 - the supervisor re-raises what it cannot recover
+                    self._handle_fault(self.supervisor.classify(COMPONENT_DETECTOR, e))
+                    continue
+                decode_ns = time.monotonic_ns()
 
                 # if detection_results is none, then NO inference results is provided
                 # "no detections" will result in an empty list
-                if detection_results is not None:
+                if detection_results is None:
+                    stall = self.supervisor.check_stall()
+                    if stall is not None:
+                        self._handle_fault(stall)
+                else:
+                    self.supervisor.tensor_ok()
+                    if self.wake_requested_at is not None:
+                        self.wake_latencies.append(time.monotonic() - self.wake_requested_at)
+                        self.logger.info("Awake and detecting after %.2fs", self.wake_latencies[-1])
+                        self.wake_requested_at = None
+
+                    # Use the frame the tensor was computed from (and its sensor time), falling back to this one
+                    tensor_ns = self.detector.tensor_timestamp(metadata)
+                    frame_duration_ns = metadata.get("FrameDuration", 0) * 1000 or self.seconds_per_frame * 1e9
+                    matched = self.frame_matcher.match(tensor_ns, tolerance_ns=frame_duration_ns / 2)
+                    if matched is not None:
+                        self.frame_sensor_ns, frame = matched
+                    else:
+                        self.frame_sensor_ns = sensor_ns
+                    timestamp = sensor_datetime(self.frame_sensor_ns)
+
+                    trace = None
+                    if self.tracer is not None:
+                        trace = FrameTrace(sensor_ns, capture_ns, tensor_ns, matched is not None, decode_ns)
+
                     if self.config.draw_bbox:
                         self.camera.update_detections(detection_results)
 
-                    self._update_ema(detection_results)
-                    logging.debug(f"EMA per class: { {c: f'{v:.3f}' for c, v in self.ema_per_class.items()} }")
+                    if self.journal is not None:
+                        self.journal.log(detection_results, timestamp)
 
                     # Event state machine
-                    if not self.in_event:
-                        active_classes = self._classes_above_threshold()
-                        if active_classes:
-                            self._on_event_start(detection_results, frame, timestamp, active_classes)
-                            encoding = True
-                    else:
-                        if self._all_classes_deactive():
-                            self._on_event_end(detection_results, frame, timestamp)
-                            encoding = False
-                        else:
-                            self._on_event_update(detection_results, frame, timestamp)
+                    transition = self.events.step(detection_results)
+                    if trace is not None:
+                        trace.event_ns = time.monotonic_ns()
+                        trace.transition = transition
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("EMA per class", extra={
+                            "ema": {c: round(v, 3) for c, v in self.events.ema_per_class.items()}})
+
+                    if self.preview is not None:
+                        self.preview.submit_detections(detection_results, self.events.ema_per_class, timestamp)
+                    if self.tensor_recorder is not None:
+                        self.tensor_recorder.submit(self.detector.last_outputs, metadata, timestamp,
+                                                    in_event=self.events.in_event)
+
+                    if transition == EVENT_START:
+                        self._on_event_start(detection_results, frame, timestamp, self.events.active_classes)
+                    elif transition == EVENT_END:
+                        self._on_event_end(detection_results, frame, timestamp)
+                    elif transition == EVENT_UPDATE:
+                        self._on_event_update(detection_results, frame, timestamp)
+
+                    if trace is not None:
+                        if transition in (EVENT_START, EVENT_END):
+                            trace.persist_ns = time.monotonic_ns()
+                        self.tracer.finish(trace)
 
                     # Frame timing
                     time_diff = time.time() - last_frame_time
-                    wait_time = max(0, seconds_per_frame - time_diff)
+                    wait_time = max(0, self.seconds_per_frame - time_diff)
                     time.sleep(wait_time)
                     last_frame_time = time.time()
 
-                # Systemd watchdog
-                if time.time() - last_heartbeat_time >= 10:
-                    last_heartbeat_time = time.time()
-                    self.n.notify("WATCHDOG=1")
-
         finally:
-            logging.info("Shutting down...")
-            if self.config.save_video and encoding:
-                self.camera.stop_video_recording()
-            self.camera.stop_camera()
-            logging.info("Camera closed cleanly.")
\ No newline at end of file
+            self.logger.info("Shutting down...")
+            # Close a running event first, so it still gets its peaks, summary record and rollup
+            try:
+                self._end_active_event()
+            except Exception as e:
+                self.logger.warning("Ending the active event failed: %s", e, exc_info=True)
+            try:
+                if self.encoding:
+                    self._stop_video_recording()
+                self.camera.stop_camera()
+            except Exception as e:
+                self.logger.warning("Stopping camera failed: %s", e, exc_info=True)
+            self.logger.info("Capture faults: %s", self.supervisor.stats())
+            if self.journal is not None:
+                self.journal.close()
+            if self.rollups is not None:
+                self.rollups.close()
+            if self.classifier is not None:
+                self.classifier.close()
+            if self.tracer is not None:
+                self.tracer.close()
+            if self.tensor_recorder is not None:
+                self.tensor_recorder.stop()
+            if self.preview is not None:
+                self.preview.stop()
+            if self.sync_agent is not None:
+                self.sync_agent.stop()
+            if self.config_watcher is not None:
+                self.config_watcher.stop()
+            self.logger.info("Camera closed cleanly.")
\ No newline at end of file
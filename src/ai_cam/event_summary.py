@@ -0,0 +1,166 @@
+import logging
+from datetime import datetime
+
+import numpy as np
+
+from ai_cam.utils import DetectionBatch
+
+HISTOGRAM_BINS = 10
+TRAJECTORY_POINTS = 32
+
+
+class ClassStats:
+    """Running statistics for one class within an event, constant memory whatever the event length."""
+    __slots__ = (
+        "_frame_index",
+        "_stride",
+        "detections",
+        "first_seen",
+        "frames",
+        "histogram",
+        "last_seen",
+        "max_score",
+        "min_score",
+        "score_sum",
+        "trajectory",
+    )
+
+    def __init__(self, timestamp: datetime):
+        self.detections = 0
+        self.frames = 0
+        self.min_score = 1.0
+        self.max_score = 0.0
+        self.score_sum = 0.0
+        self.histogram = np.zeros(HISTOGRAM_BINS, dtype=np.int64)
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        # Best box per frame, decimated by doubling the stride whenever it fills up
+        self.trajectory: list[list[float]] = []
+        self._stride = 1
+        self._frame_index = 0
+
+    def update(self, scores: np.ndarray, best_box: np.ndarray, offset_secs: float, timestamp: datetime):
+        self.detections += len(scores)
+        self.frames += 1
+        self.min_score = min(self.min_score, float(scores.min()))
+        self.max_score = max(self.max_score, float(scores.max()))
+        self.score_sum += float(scores.sum())
+        bins = np.minimum((scores * HISTOGRAM_BINS).astype(np.int64), HISTOGRAM_BINS - 1)
+        self.histogram += np.bincount(bins, minlength=HISTOGRAM_BINS)
+        self.last_seen = timestamp
+
+        if self._frame_index % self._stride == 0:
+            self.trajectory.append([round(offset_secs, 2), *np.round(best_box, 4).tolist()])
+            if len(self.trajectory) >= TRAJECTORY_POINTS:
+                self.trajectory = self.trajectory[::2]
+                self._stride *= 2
+        self._frame_index += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "detections": self.detections,
+            "frames": self.frames,
+            "min_score": round(self.min_score, 4),
+            "max_score": round(self.max_score, 4),
+            "mean_score": round(self.score_sum / self.detections, 4) if self.detections else 0.0,
+            "score_histogram": self.histogram.tolist(),
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat(),
+            "trajectory": self.trajectory,
+        }
+
+
+class EventAggregator:
+    """Accumulate one event's detections into a compact summary record.
+
+    `update` is called once per inference while the event is active and only touches the classes in that frame,
+    so its cost does not grow with the length of the event.
+    """
+    def __init__(self, device_name: str):
+        self.logger = logging.getLogger(__name__)
+        self.device_name = device_name
+        self.reset()
+
+    def reset(self):
+        self.start: datetime | None = None
+        self.trigger_classes: list[str] = []
+        self.frames = 0
+        self.classes: dict[str, ClassStats] = {}
+        self.start_media: dict[str, str] = {}
+        self.peak_media: dict[str, dict[str, str]] = {}
+        self.videos: list[str] = []
+
+    @property
+    def active(self) -> bool:
+        return self.start is not None
+
+    @property
+    def event_id(self) -> str:
+        return f"{self.device_name}_{self.start.strftime('%Y%m%d-%H%M%S-%f')[:-3]}"
+
+    def begin(self, timestamp: datetime, trigger_classes: list[str]):
+        self.reset()
+        self.start = timestamp
+        self.trigger_classes = list(trigger_classes)
+
+    def update(self, detections, timestamp: datetime):
+        if not self.active:
+            return
+        self.frames += 1
+        if not len(detections):
+            return
+
+        if not isinstance(detections, DetectionBatch):
+            class_names = list(dict.fromkeys(d.class_name for d in detections))
+            detections = DetectionBatch.from_results(detections, class_names)
+
+        offset_secs = (timestamp - self.start).total_seconds()
+        unique_ids, inverse = np.unique(detections.class_ids, return_inverse=True)
+        for i, class_id in enumerate(unique_ids.tolist()):
+            in_class = inverse == i
+            scores = detections.scores[in_class]
+            best_box = detections.boxes[in_class][np.argmax(scores)]
+
+            class_name = detections.class_names[class_id]
+            stats = self.classes.get(class_name)
+            if stats is None:
+                stats = self.classes[class_name] = ClassStats(timestamp)
+            stats.update(scores, best_box, offset_secs, timestamp)
+
+    def add_start_media(self, paths: dict[str, str]):
+        """Link the files saved for the frame that started the event (e.g. {"image": ..., "data": ...})."""
+        self.start_media = paths
+
+    def add_peak_media(self, class_name: str, paths: dict[str, str]):
+        """Link the files saved for a class's peak frame."""
+        if paths:
+            self.peak_media[class_name] = paths
+
+    def add_video(self, path: str | None):
+        if path:
+            self.videos.append(path)
+
+    def finish(self, timestamp: datetime, peak_ema: dict[str, float] | None = None) -> dict:
+        """Return the summary record for the event and reset."""
+        peak_ema = peak_ema or {}
+        classes = {}
+        for class_name, stats in self.classes.items():
+            classes[class_name] = stats.to_dict()
+            if class_name in peak_ema:
+                classes[class_name]["peak_ema"] = round(peak_ema[class_name], 4)
+
+        record = {
+            "event_id": self.event_id,
+            "device_name": self.device_name,
+            "start": self.start.isoformat(),
+            "end": timestamp.isoformat(),
+            "duration_secs": round((timestamp - self.start).total_seconds(), 3),
+            "frames": self.frames,
+            "trigger_classes": self.trigger_classes,
+            "classes": classes,
+            "start_media": self.start_media,
+            "peaks": self.peak_media,
+            "videos": self.videos,
+        }
+        self.reset()
+        return record
@@ -0,0 +1,95 @@
+from ai_cam.utils import DetectionBatch
+
+EVENT_START = "start"
+EVENT_UPDATE = "update"
+EVENT_END = "end"
+
+
+class EventStateMachine:
+    """Per-class EMA of detection confidence driving event start/update/end transitions.
+
+    Hardware independent so the live detector and offline reprocessing share the same logic.
+    """
+    def __init__(self, ema_alpha: float, event_activate: float, event_deactivate: float):
+        self.ema_per_class: dict[str, float] = {}
+        self.set_params(ema_alpha, event_activate, event_deactivate)
+
+        self.in_event = False
+        self.active_classes: list[str] = []
+        self.peak_ema: dict[str, float] = {}
+        # Classes whose peak EMA was set or improved by the last step
+        self.new_peaks: list[str] = []
+
+    def set_params(self, ema_alpha: float, event_activate: float, event_deactivate: float):
+        self.ema_alpha = ema_alpha
+        self.event_activate = event_activate
+        self.event_deactivate = event_deactivate
+
+    def update_ema(self, detections) -> None:
+        """Update per-class EMA. Classes with no detection this frame decay toward 0."""
+        scores_this_frame: dict[str, float] = {}
+        if isinstance(detections, DetectionBatch):
+            scores_this_frame = detections.max_score_per_class()
+        elif detections:
+            for d in detections:
+                if d.class_name not in scores_this_frame or d.score > scores_this_frame[d.class_name]:
+                    scores_this_frame[d.class_name] = d.score
+
+        all_classes = set(self.ema_per_class) | set(scores_this_frame)
+        for cls_name in all_classes:
+            current_score = scores_this_frame.get(cls_name, 0.0)
+            prev_ema = self.ema_per_class.get(cls_name, 0.0)
+
+            self.ema_per_class[cls_name] = (
+                self.ema_alpha * current_score
+                + (1 - self.ema_alpha) * prev_ema
+            )
+
+    def classes_above_threshold(self) -> list[str]:
+        return [
+            cls_name for cls_name, ema in self.ema_per_class.items()
+            if ema >= self.event_activate
+        ]
+
+    def all_classes_deactive(self) -> bool:
+        return all(ema < self.event_deactivate for ema in self.ema_per_class.values())
+
+    def step(self, detections) -> str | None:
+        """Feed one inference result, returning EVENT_START, EVENT_UPDATE, EVENT_END or None."""
+        self.update_ema(detections)
+        self.new_peaks = []
+
+        if not self.in_event:
+            active_classes = self.classes_above_threshold()
+            if not active_classes:
+                return None
+
+            self.in_event = True
+            self.active_classes = active_classes
+            for cls_name in active_classes:
+                self.peak_ema[cls_name] = self.ema_per_class[cls_name]
+            self.new_peaks = list(active_classes)
+            return EVENT_START
+
+        if self.all_classes_deactive():
+            self.in_event = False
+            return EVENT_END
+
+        for cls_name, ema in self.ema_per_class.items():
+            if ema < self.event_deactivate:
+                continue
+            if cls_name not in self.peak_ema or ema > self.peak_ema[cls_name]:
+                self.peak_ema[cls_name] = ema
+                self.new_peaks.append(cls_name)
+        return EVENT_UPDATE
+
+    def reset_event(self):
+        self.active_classes = []
+        self.peak_ema = {}
+        self.new_peaks = []
+
+    def reset(self):
+        """Forget the current event and all EMA history, e.g. after ending an event early."""
+        self.reset_event()
+        self.in_event = False
+        self.ema_per_class = {}
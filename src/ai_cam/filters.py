@@ -0,0 +1,87 @@
+import logging
+from collections.abc import Sequence
+
+import numpy as np
+
+from ai_cam.config import DetectionZone
+
+# Zones are rasterised at this resolution, roughly 0.6% of the frame per cell
+ZONE_GRID_WH = (160, 120)
+
+
+def points_in_polygon(x: np.ndarray, y: np.ndarray, polygon: Sequence[tuple[float, float]]) -> np.ndarray:
+    """Even-odd rule point in polygon test, vectorised over the points."""
+    poly = np.asarray(polygon, dtype=np.float64)
+    x0, y0 = poly[:, 0], poly[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+
+    inside = np.zeros(np.broadcast(x, y).shape, dtype=bool)
+    for ax, ay, bx, by in zip(x0, y0, x1, y1, strict=True):
+        crosses = (ay > y) != (by > y)
+        # Horizontal edges never cross, so their division by zero is masked out
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = ax + (y - ay) * (bx - ax) / (by - ay)
+        inside ^= crosses & (x < x_cross)
+    return inside
+
+
+def rasterise_zones(zones: Sequence[DetectionZone], grid_wh: tuple[int, int] = ZONE_GRID_WH) -> np.ndarray:
+    """Build a (h, w) boolean grid of where detections are allowed.
+
+    With any include zones only cells inside them are allowed, otherwise the whole frame is. Exclude zones are then
+    removed from that.
+    """
+    grid_w, grid_h = grid_wh
+    x, y = np.meshgrid((np.arange(grid_w) + 0.5) / grid_w, (np.arange(grid_h) + 0.5) / grid_h)
+
+    includes = [zone for zone in zones if zone.mode == "include"]
+    grid = np.zeros((grid_h, grid_w), dtype=bool) if includes else np.ones((grid_h, grid_w), dtype=bool)
+    for zone in includes:
+        grid |= points_in_polygon(x, y, zone.polygon)
+    for zone in zones:
+        if zone.mode == "exclude":
+            grid &= ~points_in_polygon(x, y, zone.polygon)
+    return grid
+
+
+class DetectionFilter:
+    """Precomputed class, confidence and zone filters applied to whole arrays of detections.
+
+    Valid classes and per-class confidences are folded into one threshold per class id (infinite for classes that
+    are not monitored), and zones into a low resolution grid looked up with each box centre.
+    """
+    def __init__(self, class_names: list[str], confidence: float, valid_classes: list[str] | None = None,
+                 class_confidence: dict[str, float] | None = None, zones: list[DetectionZone] | None = None,
+                 grid_wh: tuple[int, int] = ZONE_GRID_WH):
+        self.logger = logging.getLogger(__name__)
+
+        class_confidence = class_confidence or {}
+        unknown = set(class_confidence) - set(class_names)
+        if unknown:
+            self.logger.warning("class_confidence has unknown classes: %s", sorted(unknown))
+
+        self.thresholds = np.array([class_confidence.get(name, confidence) for name in class_names],
+                                   dtype=np.float64)
+        if valid_classes is not None:
+            valid = set(valid_classes)
+            self.thresholds[[name not in valid for name in class_names]] = np.inf
+
+        self.zone_grid = rasterise_zones(zones, grid_wh) if zones else None
+        if self.zone_grid is not None:
+            self.logger.info("Detection zones cover %.0f%% of the frame: %s", self.zone_grid.mean() * 100,
+                             ", ".join(f"{zone.name} ({zone.mode})" for zone in zones))
+
+    def score_mask(self, scores: np.ndarray, class_ids: np.ndarray) -> np.ndarray:
+        return scores >= self.thresholds[class_ids]
+
+    def zone_mask(self, boxes: np.ndarray) -> np.ndarray:
+        """Test the centres of relative xyxy boxes against the zone grid."""
+        if self.zone_grid is None:
+            return np.ones(len(boxes), dtype=bool)
+        grid_h, grid_w = self.zone_grid.shape
+        cx = ((boxes[:, 0] + boxes[:, 2]) * (grid_w / 2)).astype(np.int64).clip(0, grid_w - 1)
+        cy = ((boxes[:, 1] + boxes[:, 3]) * (grid_h / 2)).astype(np.int64).clip(0, grid_h - 1)
+        return self.zone_grid[cy, cx]
+
+    def mask(self, boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray) -> np.ndarray:
+        return self.score_mask(scores, class_ids) & self.zone_mask(boxes)
@@ -0,0 +1,270 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import shlex
+import signal
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field, ValidationError
+
+from ai_cam.config import CamConfig
+from ai_cam.serializers import get_serializer, load_file
+
+SERVICE = "ai_data_logger.service"
+
+_logger = logging.getLogger(__name__)
+
+
+class FleetHost(BaseModel, extra="forbid"):
+    name: str = Field(description="Name used in the summary, also the default device_name")
+    host: str = Field(description="Hostname or address to connect to")
+    user: str | None = Field(default=None, description="SSH user")
+    port: int | None = Field(default=None, description="SSH port")
+    project_dir: str | None = Field(default=None, description="mini_ai_camera checkout on the host")
+    config_path: str | None = Field(default=None, description="Config file path on the host")
+    config: str | None = Field(default=None, description="Local config file to push to this host")
+    overrides: dict[str, Any] = Field(default_factory=dict, description="Config fields to set for this host")
+
+
+class Inventory(BaseModel, extra="forbid"):
+    defaults: dict[str, Any] = Field(default_factory=dict, description="Values used for any host field not set")
+    hosts: list[FleetHost]
+
+    @classmethod
+    def from_file(cls, path: str) -> "Inventory":
+        """Load a JSON inventory, or a plain text file with one host per line."""
+        if Path(path).suffix == ".json":
+            data = load_file(path)
+            defaults = data.get("defaults", {})
+            data["hosts"] = [{**defaults, **host} for host in data.get("hosts", [])]
+            return cls.model_validate(data)
+
+        hosts = []
+        for line in Path(path).read_text().splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                hosts.append(FleetHost(name=line, host=line))
+        return cls(hosts=hosts)
+
+
+@dataclass
+class CommandResult:
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+@dataclass
+class HostResult:
+    name: str
+    ok: bool
+    summary: str
+    elapsed_secs: float = 0.0
+    details: dict = field(default_factory=dict)
+
+
+class Transport(ABC):
+    """Runs shell commands on a fleet host."""
+    @abstractmethod
+    async def run(self, host: FleetHost, command: str, stdin: bytes | None = None) -> CommandResult:
+        ...
+
+    @staticmethod
+    async def _communicate(process: asyncio.subprocess.Process, stdin: bytes | None) -> CommandResult:
+        try:
+            stdout, stderr = await process.communicate(stdin)
+        except asyncio.CancelledError:
+            # Timed out: don't leave the connection (or anything it started) behind
+            if process.returncode is None:
+                # It may have exited in the meantime
+                with contextlib.suppress(ProcessLookupError):
+                    os.killpg(process.pid, signal.SIGKILL)
+                await process.wait()
+            raise
+        return CommandResult(process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace"))
+
+
+class SshTransport(Transport):
+    """Run commands over the system ssh client, using the user's keys and ~/.ssh/config."""
+    def __init__(self, ssh: str = "ssh", connect_timeout: int = 10, options: list[str] | None = None):
+        self.ssh = ssh
+        self.options = ["-o", "BatchMode=yes", "-o", f"ConnectTimeout={connect_timeout}"] + (options or [])
+
+    async def run(self, host: FleetHost, command: str, stdin: bytes | None = None) -> CommandResult:
+        target = f"{host.user}@{host.host}" if host.user else host.host
+        args = [self.ssh, *self.options]
+        if host.port:
+            args += ["-p", str(host.port)]
+        process = await asyncio.create_subprocess_exec(
+            *args, target, command, start_new_session=True,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        return await self._communicate(process, stdin)
+
+
+class LocalTransport(Transport):
+    """Run commands in a local shell, each host in its own directory under `root`. For testing the fleet
+    commands without any Pis; `AI_CAM_FLEET_HOST` is set to the host name."""
+    def __init__(self, root: str = "fleet"):
+        self.root = Path(root)
+
+    async def run(self, host: FleetHost, command: str, stdin: bytes | None = None) -> CommandResult:
+        host_dir = self.root / host.name
+        host_dir.mkdir(parents=True, exist_ok=True)
+        process = await asyncio.create_subprocess_exec(
+            "/bin/sh", "-c", command, cwd=host_dir,
+            env={**os.environ, "HOME": str(host_dir.resolve()), "AI_CAM_FLEET_HOST": host.name},
+            start_new_session=True,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        return await self._communicate(process, stdin)
+
+
+def remote_path(path: str) -> str:
+    """Quote a path for the remote shell, keeping a leading ~/ so it expands to the remote home."""
+    if path.startswith("~/"):
+        return "~/" + shlex.quote(path[2:])
+    return shlex.quote(path)
+
+
+def _project_dir(host: FleetHost) -> str:
+    return host.project_dir or "~/mini_ai_camera"
+
+
+def _config_path(host: FleetHost) -> str:
+    return host.config_path or f"{_project_dir(host)}/config.json"
+
+
+def _ai_cam(host: FleetHost, subcommand: str) -> str:
+    project_dir = remote_path(_project_dir(host))
+    return f"cd {project_dir} && uv run --project {project_dir} ai_cam {subcommand}"
+
+
+def _check(result: CommandResult, what: str):
+    if result.returncode != 0:
+        error = (result.stderr or result.stdout).strip().splitlines()
+        raise RuntimeError(f"{what} failed ({result.returncode}): {error[-1] if error else 'no output'}")
+
+
+async def fetch_config(transport: Transport, host: FleetHost) -> HostResult:
+    """Read the host's current config. `details["config"]` is None if it has none."""
+    quoted = remote_path(_config_path(host))
+    result = await transport.run(host, f"if [ -f {quoted} ]; then cat {quoted}; fi")
+    _check(result, "config fetch")
+    text = result.stdout.strip()
+    config = json.loads(text) if text else None
+    return HostResult(host.name, True, "fetched" if text else "no config", details={"config": config})
+
+
+def build_configs(inventory: Inventory, base_config: str | None,
+                  remote_configs: dict[str, dict | None]) -> tuple[dict[str, bytes], dict[str, str]]:
+    """Validate every host's config against CamConfig locally, before anything is pushed.
+
+    Each host's config is its current config (`remote_configs`) updated with the base config, the host's own
+    config file and its overrides, so settings not mentioned (such as absolute model or output paths) are kept.
+    Returns the serialized configs by host name and any errors by host name.
+    """
+    base = load_file(base_config) if base_config else {}
+    serializer = get_serializer("json")
+    configs, errors = {}, {}
+    for host in inventory.hosts:
+        remote = remote_configs.get(host.name)
+        if remote is None and not base_config and not host.config:
+            errors[host.name] = "no config on the host to update, give a base --config or a config file for it"
+            continue
+        try:
+            data = {**(remote or {}), **base, **(load_file(host.config) if host.config else {}), **host.overrides}
+            data.setdefault("device_name", host.name)
+            config = CamConfig.model_validate(data)
+        except (OSError, ValueError, ValidationError) as e:
+            errors[host.name] = str(e)
+            continue
+        configs[host.name] = serializer.dumps(config.model_dump(mode="json", exclude_unset=True))
+    return configs, errors
+
+
+async def install(transport: Transport, host: FleetHost) -> HostResult:
+    config_path = remote_path(_config_path(host))
+    result = await transport.run(host, _ai_cam(host, f"install --config {config_path}"))
+    _check(result, "install")
+    return HostResult(host.name, True, "installed")
+
+
+async def push_config(transport: Transport, host: FleetHost, config: bytes, then: str = "reload") -> HostResult:
+    config_path = _config_path(host)
+    quoted = remote_path(config_path)
+    tmp = remote_path(config_path + ".tmp")
+    # Write to a temporary file and rename, so the config watcher never sees a partial file
+    result = await transport.run(host, f"mkdir -p $(dirname {quoted}) && cat > {tmp} && mv {tmp} {quoted}",
+                                 stdin=config)
+    _check(result, "config push")
+
+    summary = f"config pushed ({len(config)} bytes)"
+    if then != "none":
+        _check(await transport.run(host, _ai_cam(host, then)), then)
+        summary += f", {then}ed"
+    return HostResult(host.name, True, summary)
+
+
+async def restart(transport: Transport, host: FleetHost) -> HostResult:
+    _check(await transport.run(host, _ai_cam(host, "restart")), "restart")
+    return HostResult(host.name, True, "restarted")
+
+
+async def status(transport: Transport, host: FleetHost) -> HostResult:
+    command = (f"systemctl show {SERVICE} -p ActiveState -p SubState -p NRestarts -p ActiveEnterTimestamp; "
+               "echo Temperature=$(cat /sys/class/thermal/thermal_zone0/temp 2>/dev/null); "
+               f"echo DiskFree=$(df -Pk {remote_path(_project_dir(host))} 2>/dev/null | awk 'NR==2 {{print $4}}')")
+    result = await transport.run(host, command)
+    _check(result, "status")
+
+    details = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+    state = details.get("ActiveState", "unknown")
+    summary = f"{state}/{details.get('SubState', '?')}"
+    if details.get("NRestarts"):
+        summary += f", {details['NRestarts']} restarts"
+    if details.get("Temperature"):
+        summary += f", {int(details['Temperature']) / 1000:.0f}C"
+    if details.get("DiskFree"):
+        summary += f", {int(details['DiskFree']) / 1024 ** 2:.1f} GB free"
+    return HostResult(host.name, state == "active", summary, details=details)
+
+
+async def run_fleet(hosts: list[FleetHost], action: Callable[[FleetHost], Awaitable[HostResult]],
+                    parallel: int = 10, timeout_secs: float = 120) -> list[HostResult]:
+    """Run `action` on every host, at most `parallel` at a time, each limited to `timeout_secs`."""
+    if parallel < 1:
+        raise ValueError("parallel must be at least 1")
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def _run(host: FleetHost) -> HostResult:
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                result = await asyncio.wait_for(action(host), timeout_secs)
+            except TimeoutError:
+                result = HostResult(host.name, False, f"timed out after {timeout_secs:.0f}s")
+            except (OSError, RuntimeError, ValueError) as e:
+                result = HostResult(host.name, False, str(e))
+            result.elapsed_secs = time.monotonic() - start
+            _logger.debug("%s: %s", host.name, result.summary)
+            return result
+
+    return await asyncio.gather(*(_run(host) for host in hosts))
+
+
+def format_summary(results: list[HostResult]) -> str:
+    width = max([len(r.name) for r in results] + [4])
+    lines = [f"{'host':<{width}}  {'result':<6}  {'time':>6}  details"]
+    for r in results:
+        lines.append(f"{r.name:<{width}}  {'ok' if r.ok else 'FAILED':<6}  {r.elapsed_secs:>5.1f}s  {r.summary}")
+    failed = sum(1 for r in results if not r.ok)
+    lines.append(f"{len(results) - failed}/{len(results)} hosts ok")
+    return "\n".join(lines)
@@ -0,0 +1,156 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+
+from ai_cam.config import GovernorTier
+from ai_cam.logging_ import RotatingCSVLogger
+
+
+@dataclass
+class Telemetry:
+    temperature: float | None = None
+    battery_voltage: float | None = None
+    battery_current: float | None = None
+    pv_voltage: float | None = None
+    pv_current: float | None = None
+
+
+class TelemetrySource(ABC):
+    @abstractmethod
+    def read(self) -> Telemetry:
+        ...
+
+
+class SysfsTelemetry(TelemetrySource):
+    """Read SoC temperature from /sys/class/thermal and optionally a battery from /sys/class/power_supply."""
+    def __init__(self, thermal_root: str = "/sys/class/thermal", power_supply: str | None = None,
+                 power_root: str = "/sys/class/power_supply"):
+        self.logger = logging.getLogger(__name__)
+        self.thermal_zones = sorted(Path(thermal_root).glob("thermal_zone*/temp"))
+        self.power_path = Path(power_root) / power_supply if power_supply else None
+
+        if not self.thermal_zones:
+            self.logger.warning("No thermal zones found in %s", thermal_root)
+
+    @staticmethod
+    def _read_int(path: Path) -> int | None:
+        try:
+            return int(path.read_text().strip())
+        except (OSError, ValueError):
+            return None
+
+    def read(self) -> Telemetry:
+        temps = [t for t in (self._read_int(zone) for zone in self.thermal_zones) if t is not None]
+        telemetry = Telemetry(temperature=max(temps) / 1000 if temps else None)
+
+        if self.power_path is not None:
+            # Values are reported in micro volts / micro amps
+            voltage = self._read_int(self.power_path / "voltage_now")
+            current = self._read_int(self.power_path / "current_now")
+            telemetry.battery_voltage = voltage / 1e6 if voltage is not None else None
+            telemetry.battery_current = current / 1e6 if current is not None else None
+
+        return telemetry
+
+
+class StaticTelemetry(TelemetrySource):
+    """Telemetry source returning whatever values it is given, for testing or external feeds."""
+    def __init__(self, telemetry: Telemetry | None = None):
+        self.telemetry = telemetry or Telemetry()
+
+    def read(self) -> Telemetry:
+        return self.telemetry
+
+
+class Governor:
+    """Pick a throttling tier from temperature and battery telemetry.
+
+    Tiers are ordered from least to most restrictive. A tier is entered when the temperature reaches its `temp_c`
+    or the battery voltage drops below its `min_battery_v`, and only left once conditions have recovered past the
+    hysteresis margins.
+    """
+    def __init__(self, source: TelemetrySource, tiers: list[GovernorTier], sample_secs: float = 10,
+                 hysteresis_c: float = 5, battery_hysteresis_v: float = 0.2,
+                 csv_logger: RotatingCSVLogger | None = None):
+
+        self.logger = logging.getLogger(__name__)
+
+        self.source = source
+        self.tiers = tiers
+        self.sample_secs = sample_secs
+        self.hysteresis_c = hysteresis_c
+        self.battery_hysteresis_v = battery_hysteresis_v
+        self.csv_logger = csv_logger
+
+        self.level = 0  # 0 = no throttling, n = tiers[n - 1]
+        self.telemetry = Telemetry()
+        self._last_sample = float("-inf")
+
+    @property
+    def tier(self) -> GovernorTier | None:
+        return self.tiers[self.level - 1] if self.level else None
+
+    @property
+    def ips_scale(self) -> float:
+        return self.tier.ips_scale if self.tier else 1.0
+
+    @property
+    def allow_video(self) -> bool:
+        return self.tier.save_video if self.tier else True
+
+    @property
+    def allow_images(self) -> bool:
+        return self.tier.save_images if self.tier else True
+
+    def _triggered(self, tier: GovernorTier, margin: float = 0, battery_margin: float = 0) -> bool:
+        temp = self.telemetry.temperature
+        if tier.temp_c is not None and temp is not None and temp >= tier.temp_c - margin:
+            return True
+
+        battery = self.telemetry.battery_voltage
+        return tier.min_battery_v is not None and battery is not None and battery < tier.min_battery_v + battery_margin
+
+    def _target_level(self) -> int:
+        level = 0
+        for i, tier in enumerate(self.tiers, start=1):
+            # Stay in tiers at or below the current level until they have clearly recovered
+            if i <= self.level:
+                active = self._triggered(tier, self.hysteresis_c, self.battery_hysteresis_v)
+            else:
+                active = self._triggered(tier)
+            if active:
+                level = i
+        return level
+
+    def update(self) -> bool:
+        """Sample telemetry if due. Returns True when the active tier changed."""
+        now = time.monotonic()
+        if now - self._last_sample < self.sample_secs:
+            return False
+        self._last_sample = now
+
+        try:
+            self.telemetry = self.source.read()
+        except (OSError, ValueError) as e:
+            self.logger.warning("Reading telemetry failed: %s", e)
+            return False
+
+        level = self._target_level()
+        changed = level != self.level
+        action = ""
+        if changed:
+            action = "throttle" if level > self.level else "restore"
+            self.level = level
+            tier_name = self.tier.name if self.tier else "normal"
+            self.logger.warning("Governor %s to '%s' (temp %s C, battery %s V)", action, tier_name,
+                                self.telemetry.temperature, self.telemetry.battery_voltage)
+
+        if self.csv_logger is not None:
+            t = self.telemetry
+            self.csv_logger.log_stats(t.battery_voltage, t.battery_current, t.pv_voltage, t.pv_current,
+                                      t.temperature, tier=self.tier.name if self.tier else "normal",
+                                      action=action)
+
+        return changed
@@ -4,20 +4,17 @@ from picamera2.devices.imx500 import (NetworkIntrinsics,
 from picamera2 import Metadata
 
 import logging
-from typing import Optional, List
 import numpy as np
 from libcamera import Rectangle, Size
 
-from ai_cam.utils import DetectionResultYOLO, apply_nms, read_class_list
+from ai_cam.decoder import YoloDecoder
+from ai_cam.utils import DetectionBatch
 
 
-class IMX500Yolo:
+class IMX500Yolo(YoloDecoder):
     def __init__(self, model_path: str, labels_path: str, valid_classes_path: str, confidence: float,
-                 iou_threshold: float):
-        self.valid_classes_path = valid_classes_path
-        self.confidence = confidence
-        self.iou_threshold = iou_threshold
-
+                 iou_threshold: float, class_confidence: dict[str, float] | None = None,
+                 zones: list | None = None, tensor_lag_frames: int = 0):
         self.logger = logging.getLogger(__name__)
 
         self.yolo_model = IMX500(model_path)
@@ -30,28 +27,20 @@ class IMX500Yolo:
         self.intrinsics.update_with_defaults()
 
         self.network_ips = int(self.intrinsics.inference_rate)
-        logging.info(f"inference_rate: {self.network_ips}")
+        self.logger.info("inference_rate: %s", self.network_ips)
 
-        logging.info(f"postprocess: {self.intrinsics.postprocess}")
+        self.logger.info("postprocess: %s", self.intrinsics.postprocess)
 
         self.yolo_model.show_network_fw_progress_bar()
         model_w, model_h = self.yolo_model.get_input_size()
-
-        self.model_wh = (model_w, model_h)
-        self.sensor_resolution = (4056, 3040)
         self.raw_resolution = (4056 // 2, 3040 // 2)
 
-        # Load class names and valid classes
-        self.class_names = read_class_list(labels_path)
-        if self.valid_classes_path:
-            self.valid_classes = read_class_list(self.valid_classes_path)
-            logging.info(f"Monitoring for classes: {', '.join(sorted(self.valid_classes))}")
-        else:
-            self.valid_classes = None
-            logging.info(f"Monitoring all classes")
+        super().__init__(labels_path=labels_path, valid_classes_path=valid_classes_path, confidence=confidence,
+                         iou_threshold=iou_threshold, model_wh=(model_w, model_h),
+                         class_confidence=class_confidence, zones=zones, tensor_lag_frames=tensor_lag_frames)
 
         self.logger.info("Model initialized!")
-        self.logger.info(f"Model input shape HxW: {model_h}, {model_w}")
+        self.logger.info("Model input shape HxW: %s, %s", model_h, model_w)
 
     def get_scaled_obj(self, obj, isp_output_size, scaler_crop) -> Rectangle:
         """Scale the object coordinates based on the camera configuration and sensor properties."""
@@ -85,66 +74,24 @@ class IMX500Yolo:
         out = self.get_scaled_obj(obj, isp_output_size, scaler_crop)
         return out.to_tuple()
 
-    def extract_detections(self, np_outputs: np.ndarray, metadata: dict) -> Optional[List[DetectionResultYOLO]]:
-        """Extract detections from the IMX500 output."""
-        if np_outputs:
-            boxes, scores, classes = np_outputs[0][0], np_outputs[1][0], np_outputs[2][0]
-
-            results = []
-            for box, score, category in zip(boxes, scores, classes):
-                score = float(score)
-                if score >= self.confidence:
-
-                    class_name = self.class_names[int(category)]
-                    if self.valid_classes and class_name not in self.valid_classes:
-                        continue
-
-                    x0, y0, x1, y1 = box
-
-                    bbox = (float(x0) / self.model_wh[0], float(y0) / self.model_wh[1],
-                            float(x1) / self.model_wh[0], float(y1) / self.model_wh[1])
-
-                    bbox_xy_wh = self.convert_inference_coords(bbox, metadata)
-
-                    box = {"xmin": bbox_xy_wh[0] / self.model_wh[0],
-                           "ymin": bbox_xy_wh[1] / self.model_wh[1],
-                           "xmax": (bbox_xy_wh[0] + bbox_xy_wh[2]) / self.model_wh[0],
-                           "ymax": (bbox_xy_wh[1] + bbox_xy_wh[3]) / self.model_wh[1]}
-
-                    detection = {"score": round(score, 4),
-                                 "class_name": class_name,
-                                 "bbox": box}
-
-                    results.append(DetectionResultYOLO.from_dict(detection))
-                    logging.info(f"- {x0}, {y0}, {x1} {y1}: score {score}")
-
-            if len(results) > 0:
-                unique_results = apply_nms(results, nms_threshold=self.iou_threshold)
-                return unique_results
-            else:
-                return []
-        else:
-            return None
-
-    def get_detections(self, metadata: Metadata) -> Optional[List[DetectionResultYOLO]]:
+    def get_detections(self, metadata: Metadata) -> DetectionBatch | None:
         results = self.yolo_model.get_outputs(metadata, add_batch=True)
-        if results:
-            logging.debug(f"raw outputs shapes: {[r.shape for r in results]}")
-            logging.debug(f"scores sample: {results[1][0][:5]}")  # first 5 score values
-        else:
-            logging.debug(f"No results!")
+        # Kept for optional raw tensor capture
+        self.last_outputs = results
+        # Runs every frame: only build debug messages when they will be logged
+        if self.logger.isEnabledFor(logging.DEBUG):
+            if results:
+                self.logger.debug("raw outputs shapes: %s", [r.shape for r in results])
+                self.logger.debug("scores sample: %s", results[1][0][:5])  # first 5 score values
+            else:
+                self.logger.debug("No results!")
 
         # Extract and process detections
         detections = self.extract_detections(results, metadata)
 
-        if detections:
-            logging.info(f"Detected {len(detections)}")
-            for detection in detections:
-                class_name = detection.class_name
-                score = detection.score
-                logging.info(f"- {class_name} with confidence {score:.2f}")
+        if detections and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Detected", extra={
+                "detections": ",".join(f"{name}:{score:.2f}" for name, score
+                                       in zip(detections.names, detections.scores.tolist(), strict=True))})
 
         return detections
-
-
-
@@ -0,0 +1,70 @@
+import logging
+import os
+from collections.abc import Iterator
+from datetime import datetime
+
+from ai_cam.serializers import Serializer, get_serializer
+from ai_cam.utils import detections_to_dicts
+
+
+class DetectionJournal:
+    """Append every inference result to hourly JSON-lines files for offline reprocessing.
+
+    Each line is `{"timestamp": <iso>, "detections": [...]}`; frames without detections are kept so the
+    EMA decays the same way when replayed.
+    """
+    def __init__(self, data_output: str, device_name: str, flush_secs: float = 5):
+        self.logger = logging.getLogger(__name__)
+
+        self.journal_path = os.path.join(data_output, "journal")
+        os.makedirs(self.journal_path, exist_ok=True)
+        self.device_name = device_name
+        self.flush_secs = flush_secs
+        self.serializer = get_serializer("auto")
+
+        # Optional ai_cam.sync.SyncTracker notified of every completed journal file
+        self.sync_tracker = None
+
+        self._file = None
+        self._file_hour: str | None = None
+        self._last_flush: datetime | None = None
+
+    def _open(self, timestamp: datetime):
+        self.close()
+        self._file_hour = timestamp.strftime("%Y%m%d_%H")
+        path = os.path.join(self.journal_path, f"{self.device_name}_{self._file_hour}.jsonl")
+        self._file = open(path, "ab")  # noqa: SIM115
+        self._last_flush = timestamp
+
+    def log(self, detections, timestamp: datetime):
+        if self._file is None or timestamp.strftime("%Y%m%d_%H") != self._file_hour:
+            self._open(timestamp)
+
+        record = {"timestamp": timestamp.isoformat(), "detections": detections_to_dicts(detections)}
+        self._file.write(self.serializer.dumps(record) + b"\n")
+
+        if (timestamp - self._last_flush).total_seconds() >= self.flush_secs:
+            self._file.flush()
+            self._last_flush = timestamp
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        if self.sync_tracker is not None:
+            self.sync_tracker.track(self._file.name)
+        self._file = None
+
+
+def read_journal(path: str, serializer: Serializer | None = None) -> Iterator[tuple[datetime, list[dict]]]:
+    serializer = serializer or get_serializer("auto")
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = serializer.loads(line)
+            except ValueError:
+                # A torn final line from an unclean shutdown
+                continue
+            yield datetime.fromisoformat(record["timestamp"]), record["detections"]
@@ -1,28 +1,255 @@
+import atexit
 import csv
+import errno
+import fcntl
+import json
 import logging
+import os
+import queue
+import re
+import socket
+import struct
+import threading
 from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Any, ClassVar
 
+# LogRecord attributes; anything else on a record came from `extra` and is logged as a structured field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName",
+                                                                             "sample"}
+
+JOURNAL_SOCKET = "/run/systemd/journal/socket"
+
+
+def record_fields(record: logging.LogRecord) -> dict[str, Any]:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+def _quote(value: Any) -> str:
+    text = str(value)
+    if not text or any(c in text for c in ' "=\n'):
+        return json.dumps(text)
+    return text
+
+
+class TextFormatter(logging.Formatter):
+    """Plain log lines, with any `extra` fields appended as `key=value` after the message."""
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        text = super().formatMessage(record)
+        fields = record_fields(record)
+        if fields:
+            text += " " + " ".join(f"{key}={_quote(value)}" for key, value in fields.items())
+        return text
+
+
+class KeyValueFormatter(logging.Formatter):
+    """`ts=... level=... logger=... msg="..." key=value` lines, with any `extra` fields appended."""
+    def format(self, record: logging.LogRecord) -> str:
+        parts = {"ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"), "level": record.levelname,
+                 "logger": record.name, "msg": record.getMessage(), **record_fields(record)}
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            parts["exc"] = record.exc_text
+        return " ".join(f"{key}={_quote(value)}" for key, value in parts.items())
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with any `extra` fields as keys."""
+    def format(self, record: logging.LogRecord) -> str:
+        data = {"ts": record.created, "level": record.levelname, "logger": record.name, "msg": record.getMessage(),
+                **record_fields(record)}
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Per call site token bucket, so a log line in a hot loop cannot flood the output.
+
+    Records passing `extra={"sample": n}` are additionally sampled, keeping one in every n from that call site.
+    The first record let through after some were dropped carries a `suppressed` field with the count.
+    """
+    def __init__(self, rate: float = 5, burst: int = 20):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._sites: dict[tuple[str, int], list] = {}  # site -> [tokens, last time, seen, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                site = self._sites[key] = [float(self.burst), record.created, 0, 0]
+
+            site[2] += 1
+            sample = getattr(record, "sample", 1)
+            if sample > 1 and (site[2] - 1) % sample:
+                return False
+
+            if self.rate > 0:
+                site[0] = min(self.burst, site[0] + (record.created - site[1]) * self.rate)
+                site[1] = record.created
+                if site[0] < 1:
+                    site[3] += 1
+                    return False
+                site[0] -= 1
+
+            if site[3]:
+                record.suppressed = site[3]
+                site[3] = 0
+        return True
+
+
+class JournaldHandler(logging.Handler):
+    """Send records straight to journald's native socket, with `extra` fields as journal fields.
+
+    Avoids the stdout pipe and the journal's line parsing, and keeps priority and code location.
+    """
+    PRIORITIES: ClassVar[dict[int, int]] = {logging.CRITICAL: 2, logging.ERROR: 3, logging.WARNING: 4,
+                                            logging.INFO: 6, logging.DEBUG: 7}
+
+    def __init__(self, identifier: str = "ai_cam", socket_path: str = JOURNAL_SOCKET):
+        super().__init__()
+        self.identifier = identifier
+        self.socket_path = socket_path
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.connect(socket_path)
+
+    @staticmethod
+    def available(socket_path: str = JOURNAL_SOCKET) -> bool:
+        return os.path.exists(socket_path)
+
+    @staticmethod
+    def _field(name: str, value: Any) -> bytes:
+        name = re.sub(r"[^A-Z0-9_]", "_", name.upper()).lstrip("_") or "FIELD"
+        data = str(value).encode("utf-8", "replace")
+        if b"\n" in data:
+            # Binary safe form: name, newline, little endian 64 bit length, data
+            return name.encode() + b"\n" + struct.pack("<Q", len(data)) + data + b"\n"
+        return name.encode() + b"=" + data + b"\n"
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            message = self.format(record)
+            fields = {
+                "MESSAGE": message,
+                "PRIORITY": self.PRIORITIES.get(record.levelno, 6),
+                "SYSLOG_IDENTIFIER": self.identifier,
+                "LOGGER": record.name,
+                "CODE_FILE": record.pathname,
+                "CODE_LINE": record.lineno,
+                "CODE_FUNC": record.funcName,
+                **{f"AI_CAM_{key}": value for key, value in record_fields(record).items()},
+            }
+            payload = b"".join(self._field(name, value) for name, value in fields.items())
+            self._send(payload)
+        except Exception:  # noqa: BLE001
+            self.handleError(record)
+
+    def _send(self, payload: bytes):
+        try:
+            self.socket.send(payload)
+        except OSError as e:
+            if e.errno not in (errno.EMSGSIZE, errno.ENOBUFS):
+                raise
+            # Too big for a datagram: pass the payload in a sealed memfd instead
+            fd = os.memfd_create("journal", os.MFD_ALLOW_SEALING)
+            try:
+                os.write(fd, payload)
+                fcntl.fcntl(fd, fcntl.F_ADD_SEALS, fcntl.F_SEAL_SHRINK | fcntl.F_SEAL_GROW | fcntl.F_SEAL_WRITE
+                            | fcntl.F_SEAL_SEAL)
+                self.socket.sendmsg([], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, struct.pack("i", fd))])
+            finally:
+                os.close(fd)
+
+    def close(self):
+        self.socket.close()
+        super().close()
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking or raising when the writer falls behind."""
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: QueueListener | None = None
+
+
+def init_logging(logger: logging.Logger, level: int = logging.INFO, fmt: str = "text",
+                 journald: bool | None = None, rate_limit: float = 5, max_queue: int = 10000):
+    """Route all logging through a queue to a background writer thread.
+
+    The `ai_cam` logger and the root logger (for third party warnings) share one QueueHandler. The caller only
+    merges the message arguments when a record is queued (`QueueHandler.prepare`); the configured formatter and
+    the output run on the listener thread, so the capture loop never waits on stdout or the journal. With
+    `journald` unset, records go straight to the journal socket when running under systemd.
+    """
+    global _listener
+    shutdown_logging()
+
+    if fmt == "json":
+        formatter = JsonFormatter()
+    elif fmt == "kv":
+        formatter = KeyValueFormatter()
+    else:
+        formatter = TextFormatter(fmt="%(asctime)s [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+    if journald is None:
+        # systemd sets JOURNAL_STREAM when stdout/stderr are connected to the journal
+        journald = "JOURNAL_STREAM" in os.environ and JournaldHandler.available()
+
+    if journald:
+        handler = JournaldHandler()
+        # The journal keeps the time and level itself
+        handler.setFormatter(formatter if fmt != "text" else TextFormatter("%(message)s"))
+    else:
+        handler = logging.StreamHandler()
+        handler.setFormatter(formatter)
+
+    queue_handler = _DroppingQueueHandler(queue.Queue(maxsize=max_queue))
+    if rate_limit > 0:
+        queue_handler.addFilter(RateLimitFilter(rate=rate_limit))
 
-def init_logging(logger: logging.Logger, level: int = logging.INFO):
     # Clamp root logger
-    logging.getLogger().setLevel(logging.WARNING)
+    root = logging.getLogger()
+    root.setLevel(logging.WARNING)
+    root.handlers[:] = [queue_handler]
 
-    logger.setLevel(logging.DEBUG)
-    logger.propagate = False
+    logger.setLevel(level)
+    logger.propagate = True
     logger.handlers[:] = []  # idempotent re-init
 
-    # Handler for terminal output
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    console_formatter = logging.Formatter(
-        fmt="%(asctime)s [%(levelname)s] %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    console_handler.setFormatter(console_formatter)
+    _listener = QueueListener(queue_handler.queue, handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
 
-    # Attach handlers to logger
-    logger.addHandler(console_handler)
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
 
 
 class RotatingCSVLogger:
@@ -35,7 +262,7 @@ class RotatingCSVLogger:
             retention_days: Number of days to keep old logs
         """
         self.log_dir = log_dir
-        self.log_dir.mkdir(exist_ok=True)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
         self.retention_days = retention_days
         self.headers = [
             "Timestamp",
@@ -44,12 +271,14 @@ class RotatingCSVLogger:
             "PV Voltage",
             "PV Current",
             "PV PI Temperature",
+            "Governor Tier",
+            "Governor Action",
         ]
         self.cleanup_old_logs()
 
-    def log_stats(self, bat_v: float, bat_c: float, pv_v: float, pv_c: float, temp):
+    def log_stats(self, bat_v: float, bat_c: float, pv_v: float, pv_c: float, temp, tier: str = "", action: str = ""):
         datetime_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        row = [datetime_str, bat_v, bat_c, pv_v, pv_c, temp]
+        row = [datetime_str, bat_v, bat_c, pv_v, pv_c, temp, tier, action]
         self._log_row(row)
 
     def _get_today_file(self) -> Path:
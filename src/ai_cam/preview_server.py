@@ -0,0 +1,251 @@
+import contextlib
+import json
+import logging
+import queue
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+from ai_cam.utils import detections_to_dicts
+
+_BOUNDARY = "frame"
+
+_INDEX_HTML = """<html>
+<head><title>{device_name}</title></head>
+<body>
+<h3>{device_name}</h3>
+<img src="/stream.mjpg" />
+<pre id="events"></pre>
+<script>
+const source = new EventSource("/events");
+source.onmessage = (e) => {{ document.getElementById("events").textContent = e.data; }};
+</script>
+</body>
+</html>
+"""
+
+
+class _Broadcaster:
+    """Fan a single encoded payload out to many clients through small bounded queues.
+
+    Publishing never blocks: a client whose queue is full is considered too slow and is dropped.
+    """
+    def __init__(self, name: str, max_queue: int = 2):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._clients: set[queue.Queue] = set()
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def subscribe(self) -> queue.Queue:
+        client = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client: queue.Queue):
+        with self._lock:
+            self._clients.discard(client)
+
+    def publish(self, payload: bytes):
+        with self._lock:
+            clients = list(self._clients)
+
+        for client in clients:
+            try:
+                client.put_nowait(payload)
+            except queue.Full:
+                self.logger.info("Dropping slow %s client", self.name)
+                self.unsubscribe(client)
+                # Wake the handler so it notices it has been dropped
+                try:
+                    client.get_nowait()
+                    client.put_nowait(None)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients)
+            self._clients.clear()
+        for client in clients:
+            with contextlib.suppress(queue.Full):
+                client.put_nowait(None)
+
+
+class _PreviewHandler(BaseHTTPRequestHandler):
+    server: "_PreviewHTTPServer"
+
+    def log_message(self, fmt, *args):
+        self.server.preview.logger.debug("%s - %s", self.address_string(), fmt % args)
+
+    def do_GET(self):
+        if self.path in ("/", "/index.html"):
+            self._send_index()
+        elif self.path == "/stream.mjpg":
+            self._send_mjpeg()
+        elif self.path == "/events":
+            self._send_events()
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def _send_index(self):
+        content = _INDEX_HTML.format(device_name=self.server.preview.device_name).encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _stream(self, broadcaster: _Broadcaster, content_type: str, first: bytes | None = None):
+        client = broadcaster.subscribe()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Age", "0")
+        self.send_header("Cache-Control", "no-cache, private")
+        self.send_header("Pragma", "no-cache")
+        self.send_header("Content-Type", content_type)
+        self.end_headers()
+        try:
+            if first is not None:
+                self.wfile.write(first)
+            while True:
+                payload = client.get()
+                if payload is None:
+                    break
+                self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            broadcaster.unsubscribe(client)
+
+    def _send_mjpeg(self):
+        preview = self.server.preview
+        self._stream(preview.frames, f"multipart/x-mixed-replace; boundary={_BOUNDARY}",
+                     first=preview.latest_jpeg_part)
+
+    def _send_events(self):
+        preview = self.server.preview
+        self._stream(preview.events, "text/event-stream", first=preview.latest_event)
+
+
+class _PreviewHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, preview: "PreviewServer"):
+        super().__init__(address, _PreviewHandler)
+        self.preview = preview
+
+
+class PreviewServer:
+    """Optional local HTTP server with an MJPEG preview and a server-sent-events detection stream.
+
+    The capture loop only hands over references to the latest frame; resizing and JPEG encoding happen
+    once per published frame on a background thread, and only while at least one client is watching.
+    """
+    def __init__(self, device_name: str, host: str = "127.0.0.1", port: int = 8000,
+                 preview_wh: tuple[int, int] = (640, 360), fps: float = 2, quality: int = 70,
+                 max_queue: int = 2):
+
+        self.logger = logging.getLogger(__name__)
+
+        self.device_name = device_name
+        self.preview_wh = preview_wh
+        self.seconds_per_frame = 1 / fps
+        self.quality = quality
+
+        self.frames = _Broadcaster("preview", max_queue=max_queue)
+        self.events = _Broadcaster("events", max_queue=max_queue * 4)
+        self.latest_jpeg_part: bytes | None = None
+        self.latest_event: bytes | None = None
+
+        self._pending_frame: np.ndarray | None = None
+        self._frame_ready = threading.Event()
+        self._last_submit = 0.0
+        self._running = False
+
+        self._server = _PreviewHTTPServer((host, port), self)
+        self._server_thread = threading.Thread(target=self._server.serve_forever, name="preview-http",
+                                               daemon=True)
+        self._encoder_thread = threading.Thread(target=self._encode_loop, name="preview-encoder", daemon=True)
+
+        self.logger.info("Preview server listening on http://%s:%s", host, port)
+
+    def start(self):
+        self._running = True
+        self._server_thread.start()
+        self._encoder_thread.start()
+
+    def stop(self):
+        self._running = False
+        self._frame_ready.set()
+        self.frames.close()
+        self.events.close()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def submit_frame(self, frame: np.ndarray):
+        """Offer a frame for preview. Cheap enough to call on every loop iteration."""
+        if not self.frames.client_count:
+            return
+
+        now = time.monotonic()
+        if now - self._last_submit < self.seconds_per_frame:
+            return
+
+        self._last_submit = now
+        self._pending_frame = frame
+        self._frame_ready.set()
+
+    def submit_detections(self, detections, ema_per_class: dict[str, float], timestamp):
+        """Publish the latest detections and EMA state to event-stream clients."""
+        if not self.events.client_count:
+            return
+
+        record = {
+            "timestamp": timestamp.isoformat(),
+            "detections": [] if detections is None else detections_to_dicts(detections),
+            "ema": {cls_name: round(ema, 4) for cls_name, ema in ema_per_class.items()},
+        }
+        self.latest_event = f"data: {json.dumps(record, separators=(',', ':'))}\n\n".encode()
+        self.events.publish(self.latest_event)
+
+    def _encode(self, frame: np.ndarray) -> bytes | None:
+        frame = cv2.resize(frame, self.preview_wh, interpolation=cv2.INTER_AREA)
+        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        ok, jpeg = cv2.imencode(".jpg", image_rgb, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return None
+
+        jpeg = jpeg.tobytes()
+        header = (f"--{_BOUNDARY}\r\n"
+                  f"Content-Type: image/jpeg\r\n"
+                  f"Content-Length: {len(jpeg)}\r\n\r\n").encode("ascii")
+        return header + jpeg + b"\r\n"
+
+    def _encode_loop(self):
+        while self._running:
+            self._frame_ready.wait()
+            self._frame_ready.clear()
+
+            frame, self._pending_frame = self._pending_frame, None
+            if frame is None or not self._running:
+                continue
+
+            try:
+                part = self._encode(frame)
+            except (cv2.error, ValueError) as e:
+                self.logger.info("Preview encoding failed: %s", e)
+                continue
+
+            if part is not None:
+                self.latest_jpeg_part = part
+                self.frames.publish(part)
@@ -0,0 +1,214 @@
+import logging
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from ai_cam.config import CamConfig
+from ai_cam.decoder import YoloDecoder
+from ai_cam.events import EVENT_END, EVENT_START, EventStateMachine
+from ai_cam.journal import read_journal
+from ai_cam.serializers import get_serializer
+from ai_cam.tensor_capture import SEGMENT_SUFFIX, TensorSegmentReader
+from ai_cam.utils import DetectionBatch
+
+_logger = logging.getLogger(__name__)
+
+
+def find_inputs(inputs: Iterable[str]) -> list[Path]:
+    """Expand files and directories of recordings into a time ordered list of shards."""
+    shards = []
+    for path in map(Path, inputs):
+        if path.is_dir():
+            shards.extend(sorted(path.glob("*.jsonl")))
+            shards.extend(sorted(path.glob(f"*{SEGMENT_SUFFIX}")))
+        else:
+            shards.append(path)
+    return sorted(shards, key=lambda p: p.name)
+
+
+def iter_shard(path: Path, class_names: list[str]) -> Iterator[tuple[datetime, DetectionBatch]]:
+    """Read a journal shard. Detections of classes missing from `class_names` (the labels file changed since they
+    were recorded) are dropped with a warning, as the new settings could never report them."""
+    known = set(class_names)
+    unknown: dict[str, int] = {}
+    for timestamp, detections in read_journal(str(path)):
+        kept = [d for d in detections if d["class_name"] in known]
+        if len(kept) != len(detections):
+            for d in detections:
+                if d["class_name"] not in known:
+                    unknown[d["class_name"]] = unknown.get(d["class_name"], 0) + 1
+        yield timestamp, DetectionBatch.from_dicts(kept, class_names)
+
+    if unknown:
+        _logger.warning("%s: skipped detections of classes not in the labels file: %s", path.name, unknown)
+
+
+def iter_tensor_shard(path: Path, decoder: YoloDecoder) -> Iterator[tuple[datetime, DetectionBatch]]:
+    """Decode captured raw tensors with the full extract_detections path."""
+    reader = TensorSegmentReader(str(path))
+    decoder.model_wh = reader.model_wh
+    for timestamp, outputs, scaler_crop in reader:
+        yield timestamp, decoder.extract_detections(outputs, {"ScalerCrop": scaler_crop})
+
+
+def replay(frames: Iterable[tuple[datetime, DetectionBatch]], events: EventStateMachine,
+           decoder: YoloDecoder | None = None) -> tuple[list[tuple[datetime, DetectionBatch]], list[dict]]:
+    """Run frames through (optionally) the decoder filters and the event state machine."""
+    results = []
+    event_records = []
+    current = None
+    timestamp = None
+
+    for timestamp, detections in frames:
+        if decoder is not None:
+            detections = decoder.postprocess(detections)
+        results.append((timestamp, detections))
+
+        transition = events.step(detections)
+        if transition == EVENT_START:
+            current = {"start": timestamp.isoformat(), "end": None, "classes": list(events.active_classes),
+                       "peaks": {}}
+
+        if current is not None:
+            for cls_name in events.new_peaks:
+                current["peaks"][cls_name] = {
+                    "ema": round(events.peak_ema[cls_name], 4),
+                    "timestamp": timestamp.isoformat(),
+                    "detections": detections.to_dicts()
+                }
+
+        if transition == EVENT_END:
+            current["end"] = timestamp.isoformat()
+            event_records.append(current)
+            current = None
+            events.reset_event()
+
+    if current is not None:
+        # Event still open at the end of the shard
+        current["end"] = timestamp.isoformat()
+        current["truncated"] = True
+        event_records.append(current)
+
+    return results, event_records
+
+
+def _count_classes(frames: list[tuple[datetime, DetectionBatch]]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for _, detections in frames:
+        for class_name in detections.names:
+            counts[class_name] = counts.get(class_name, 0) + 1
+    return counts
+
+
+def _decoder(config: CamConfig) -> YoloDecoder:
+    return YoloDecoder(labels_path=config.labels, valid_classes_path=config.valid_classes,
+                       confidence=config.confidence, iou_threshold=config.iou_threshold,
+                       class_confidence=config.class_confidence, zones=config.zones)
+
+
+def _event_machine(config: CamConfig) -> EventStateMachine:
+    return EventStateMachine(config.ema_alpha, config.event_activate, config.event_deactivate)
+
+
+def reprocess_shard(path: str, config: dict, original_config: dict, output_dir: str) -> dict:
+    """Replay one journal or tensor shard with the original and the new settings. Runs in a worker process."""
+    config = CamConfig.model_validate(config)
+    original_config = CamConfig.model_validate(original_config)
+
+    decoder = _decoder(config)
+
+    if path.endswith(SEGMENT_SUFFIX):
+        # Raw tensors: decode from scratch with both the original and the new settings
+        original_frames = list(iter_tensor_shard(Path(path), _decoder(original_config)))
+        _, original_events = replay(original_frames, _event_machine(original_config))
+        new_frames, new_events = replay(iter_tensor_shard(Path(path), decoder), _event_machine(config))
+    else:
+        # Journals already hold decoded detections, so only the filters can be re-applied
+        original_frames = list(iter_shard(Path(path), decoder.class_names))
+        _, original_events = replay(original_frames, _event_machine(original_config))
+        new_frames, new_events = replay(original_frames, _event_machine(config), decoder=decoder)
+
+    serializer = get_serializer("auto")
+    journal_dir = os.path.join(output_dir, "journal")
+    os.makedirs(journal_dir, exist_ok=True)
+    with open(os.path.join(journal_dir, f"{Path(path).stem}.jsonl"), "wb") as f:
+        for timestamp, detections in new_frames:
+            record = {"timestamp": timestamp.isoformat(), "detections": detections.to_dicts()}
+            f.write(serializer.dumps(record) + b"\n")
+
+    frames_changed = sum(
+        1 for (_, old), (_, new) in zip(original_frames, new_frames, strict=True)
+        if len(old) != len(new) or old.to_dicts() != new.to_dicts()
+    )
+
+    return {
+        "shard": str(path),
+        "frames": len(original_frames),
+        "frames_changed": frames_changed,
+        "original_detections": _count_classes(original_frames),
+        "new_detections": _count_classes(new_frames),
+        "original_events": original_events,
+        "new_events": new_events,
+    }
+
+
+def _overlaps(a: dict, b: dict) -> bool:
+    return a["start"] <= b["end"] and b["start"] <= a["end"] and bool(set(a["classes"]) & set(b["classes"]))
+
+
+def diff_results(shard_results: list[dict]) -> dict:
+    """Summarise how the new settings changed detections and events compared to the original."""
+    original_events = [e for r in shard_results for e in r["original_events"]]
+    new_events = [e for r in shard_results for e in r["new_events"]]
+
+    detections: dict[str, dict[str, int]] = {}
+    for r in shard_results:
+        for key, counts in (("original", r["original_detections"]), ("new", r["new_detections"])):
+            for class_name, n in counts.items():
+                detections.setdefault(class_name, {"original": 0, "new": 0})[key] += n
+
+    events: dict[str, dict[str, int]] = {}
+    for key, event_list in (("original", original_events), ("new", new_events)):
+        for event in event_list:
+            for class_name in event["classes"]:
+                events.setdefault(class_name, {"original": 0, "new": 0})[key] += 1
+
+    return {
+        "frames": sum(r["frames"] for r in shard_results),
+        "frames_changed": sum(r["frames_changed"] for r in shard_results),
+        "detections": detections,
+        "events": events,
+        "events_added": [e for e in new_events if not any(_overlaps(e, o) for o in original_events)],
+        "events_removed": [e for e in original_events if not any(_overlaps(e, n) for n in new_events)],
+    }
+
+
+def reprocess(inputs: Iterable[str], config: CamConfig, original_config: CamConfig, output_dir: str,
+              workers: int | None = None) -> dict:
+    """Replay recorded shards across a process pool and write the new results plus a diff to output_dir."""
+    shards = find_inputs(inputs)
+    if not shards:
+        raise ValueError("no recordings found to reprocess")
+
+    os.makedirs(output_dir, exist_ok=True)
+    _logger.info("Reprocessing %s shards", len(shards))
+
+    config_dict = config.model_dump()
+    original_dict = original_config.model_dump()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(reprocess_shard, str(shard), config_dict, original_dict, output_dir)
+                   for shard in shards]
+        shard_results = [future.result() for future in futures]
+
+    serializer = get_serializer("json")
+    new_events = [e for r in shard_results for e in r["new_events"]]
+    with open(os.path.join(output_dir, "events.json"), "wb") as f:
+        f.write(serializer.dumps(new_events))
+
+    diff = diff_results(shard_results)
+    with open(os.path.join(output_dir, "diff.json"), "wb") as f:
+        f.write(serializer.dumps(diff))
+
+    return diff
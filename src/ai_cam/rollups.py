@@ -0,0 +1,172 @@
+import json
+import logging
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+ROLLUP_SUFFIX = ".rollup"
+MAX_CLASSES = 64
+METRICS = ("events", "detections", "dwell_secs")
+ROLLUP_DTYPE = np.dtype([("events", "<u4"), ("detections", "<u4"), ("dwell_secs", "<f4")])
+
+
+class _Day:
+    """One day of hourly per-class counters: a (24, MAX_CLASSES) memory-mapped array plus its class index."""
+    def __init__(self, path: Path):
+        self.path = path
+        self.index_path = path.with_suffix(".json")
+        self.classes: list[str] = json.loads(self.index_path.read_text()) if self.index_path.exists() else []
+        self.columns = {name: i for i, name in enumerate(self.classes)}
+
+        mode = "r+" if path.exists() else "w+"
+        self.array = np.memmap(path, dtype=ROLLUP_DTYPE, mode=mode, shape=(24, MAX_CLASSES))
+
+    def column(self, class_name: str) -> int | None:
+        column = self.columns.get(class_name)
+        if column is None and len(self.classes) < MAX_CLASSES:
+            column = self.columns[class_name] = len(self.classes)
+            self.classes.append(class_name)
+            self.index_path.write_text(json.dumps(self.classes))
+        return column
+
+    def close(self):
+        self.array.flush()
+        del self.array
+
+
+def split_hours(start: datetime, end: datetime) -> Iterator[tuple[datetime, float]]:
+    """Yield (start of hour, seconds) for each clock hour the span from start to end covers."""
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    while hour < end:
+        next_hour = hour + timedelta(hours=1)
+        yield hour, (min(end, next_hour) - max(start, hour)).total_seconds()
+        hour = next_hour
+
+
+class RollupStore:
+    """Hourly event counts, detections and dwell time per class, updated from event summary records.
+
+    Each day is a small fixed size file in `<output>/stats` (24 hours x 64 classes x 12 bytes), so a day of
+    activity syncs as a few kilobytes instead of every detection file. Events and detections are counted in the hour
+    a class was first seen; its dwell time is split across the hours it spans. A day is only handed to the sync
+    tracker once it is over, and the current day's file is reopened and added to after a restart.
+    """
+    def __init__(self, data_output: str, device_name: str):
+        self.logger = logging.getLogger(__name__)
+
+        self.stats_path = Path(data_output) / "stats"
+        self.stats_path.mkdir(parents=True, exist_ok=True)
+        self.device_name = device_name
+
+        # Optional ai_cam.sync.SyncTracker notified of every completed day
+        self.sync_tracker = None
+
+        self._day: _Day | None = None
+        self._day_date: date | None = None
+
+    def _open(self, day: date) -> _Day:
+        if self._day_date != day:
+            self._close_day()
+            self._day = _Day(self.stats_path / f"{self.device_name}_{day:%Y%m%d}{ROLLUP_SUFFIX}")
+            self._day_date = day
+            self.track_completed_days()
+        return self._day
+
+    def _cell(self, when: datetime, class_name: str) -> tuple[_Day, int] | None:
+        day = self._open(when.date())
+        column = day.column(class_name)
+        if column is None:
+            self.logger.warning("Rollup for %s is full, not counting '%s'", when.date(), class_name)
+            return None
+        return day, column
+
+    def record_event(self, record: dict):
+        """Add an event summary record (see ai_cam.event_summary)."""
+        for class_name, stats in record["classes"].items():
+            first_seen = datetime.fromisoformat(stats["first_seen"])
+            last_seen = datetime.fromisoformat(stats["last_seen"])
+
+            cell = self._cell(first_seen, class_name)
+            if cell is None:
+                continue
+            day, column = cell
+            day.array["events"][first_seen.hour, column] += 1
+            day.array["detections"][first_seen.hour, column] += stats["detections"]
+
+            for hour, secs in split_hours(first_seen, last_seen):
+                cell = self._cell(hour, class_name)
+                if cell is not None:
+                    day, column = cell
+                    day.array["dwell_secs"][hour.hour, column] += secs
+
+        if self._day is not None:
+            self._day.array.flush()
+
+    def track_completed_days(self):
+        """Hand every finished day not yet known to the sync tracker over to it.
+
+        Days are only tracked once they are over, so a partial day is never uploaded (and, with deletion after upload,
+        removed locally) only to be overwritten by a later upload under the same name.
+        """
+        if self.sync_tracker is None:
+            return
+        today = f"{datetime.now().astimezone():%Y%m%d}"
+        for path in sorted(self.stats_path.glob(f"{self.device_name}_*{ROLLUP_SUFFIX}")):
+            if path.stem.rpartition("_")[2] >= today or path == getattr(self._day, "path", None):
+                continue
+            for day_path in (path, path.with_suffix(".json")):
+                if day_path.exists() and not self.sync_tracker.is_tracked(str(day_path)):
+                    self.sync_tracker.track(str(day_path))
+
+    def _close_day(self):
+        if self._day is None:
+            return
+        self._day.close()
+        self._day = None
+        self._day_date = None
+
+    def close(self):
+        self._close_day()
+        self.track_completed_days()
+
+
+def read_rollup(path: str) -> tuple[list[str], np.ndarray]:
+    """Return the class names and the (24, n_classes) counters of a rollup file."""
+    path = Path(path)
+    index_path = path.with_suffix(".json")
+    classes = json.loads(index_path.read_text()) if index_path.exists() else []
+    array = np.fromfile(path, dtype=ROLLUP_DTYPE).reshape(24, MAX_CLASSES)
+    return classes, array[:, :len(classes)]
+
+
+def iter_rollups(stats_dir: str, start: date | None = None, end: date | None = None,
+                 hourly: bool = False) -> Iterator[dict]:
+    """Yield one row per device, day (and hour) and class with any activity, oldest first."""
+    for path in sorted(Path(stats_dir).glob(f"*{ROLLUP_SUFFIX}")):
+        device_name, _, day_str = path.stem.rpartition("_")
+        day = datetime.strptime(day_str, "%Y%m%d").date()
+        if (start and day < start) or (end and day > end):
+            continue
+
+        classes, array = read_rollup(str(path))
+        if hourly:
+            blocks = [(hour, array[hour]) for hour in range(24)]
+        else:
+            daily = np.zeros(len(classes), dtype=[(m, "<f8") for m in METRICS])
+            for metric in METRICS:
+                daily[metric] = array[metric].sum(axis=0)
+            blocks = [(None, daily)]
+
+        for hour, counters in blocks:
+            for class_name, cell in zip(classes, counters, strict=True):
+                # Hours an event carried on into have dwell time but no events
+                if not cell["events"] and not cell["dwell_secs"]:
+                    continue
+                row = {"device": device_name, "date": day.isoformat()}
+                if hour is not None:
+                    row["hour"] = hour
+                row.update(class_name=class_name, events=int(cell["events"]), detections=int(cell["detections"]),
+                           dwell_secs=round(float(cell["dwell_secs"]), 1))
+                yield row
@@ -0,0 +1,79 @@
+import logging
+import math
+from datetime import UTC, date, datetime, time, timedelta
+
+from ai_cam.config import SUN_TIME_SPEC, ScheduleProfile
+
+
+def sun_times(day: date, latitude: float, longitude: float) -> tuple[datetime | None, datetime | None]:
+    """Approximate sunrise and sunset (local time) with the NOAA solar equations, no network needed.
+
+    Returns (None, None) when the sun does not rise or set on that day (polar night / midnight sun).
+    Accurate to within a couple of minutes, which is plenty for duty cycling.
+    """
+    gamma = 2 * math.pi / 365 * (day.timetuple().tm_yday - 1)
+    eq_time = 229.18 * (0.000075 + 0.001868 * math.cos(gamma) - 0.032077 * math.sin(gamma)
+                        - 0.014615 * math.cos(2 * gamma) - 0.040849 * math.sin(2 * gamma))
+    decl = (0.006918 - 0.399912 * math.cos(gamma) + 0.070257 * math.sin(gamma)
+            - 0.006758 * math.cos(2 * gamma) + 0.000907 * math.sin(2 * gamma)
+            - 0.002697 * math.cos(3 * gamma) + 0.00148 * math.sin(3 * gamma))
+
+    lat = math.radians(latitude)
+    cos_ha = (math.cos(math.radians(90.833)) / (math.cos(lat) * math.cos(decl))
+              - math.tan(lat) * math.tan(decl))
+    if not -1 <= cos_ha <= 1:
+        return None, None
+
+    ha = math.degrees(math.acos(cos_ha))
+    midnight_utc = datetime.combine(day, time(0), tzinfo=UTC)
+    sunrise = midnight_utc + timedelta(minutes=720 - 4 * (longitude + ha) - eq_time)
+    sunset = midnight_utc + timedelta(minutes=720 - 4 * (longitude - ha) - eq_time)
+    return sunrise.astimezone(), sunset.astimezone()
+
+
+class Scheduler:
+    """Pick the active schedule profile for the current local time."""
+    def __init__(self, profiles: list[ScheduleProfile], latitude: float | None = None,
+                 longitude: float | None = None):
+        self.logger = logging.getLogger(__name__)
+
+        self.profiles = profiles
+        self.latitude = latitude
+        self.longitude = longitude
+        self._sun_cache: dict[date, tuple[datetime | None, datetime | None]] = {}
+
+    def _sun(self, day: date) -> tuple[datetime | None, datetime | None]:
+        if day not in self._sun_cache:
+            self._sun_cache = {day: sun_times(day, self.latitude, self.longitude)}
+            sunrise, sunset = self._sun_cache[day]
+            self.logger.info("Sun times for %s: sunrise %s, sunset %s", day, sunrise, sunset)
+        return self._sun_cache[day]
+
+    def resolve(self, spec: str, day: date) -> datetime | None:
+        """Turn a profile time spec into a local datetime on the given day."""
+        match = SUN_TIME_SPEC.match(spec)
+        if match is None:
+            return datetime.combine(day, time.fromisoformat(spec)).astimezone()
+
+        sunrise, sunset = self._sun(day)
+        base = sunrise if match.group(1) == "sunrise" else sunset
+        if base is None:
+            return None
+        return base + timedelta(minutes=int(match.group(2) or 0))
+
+    def _contains(self, profile: ScheduleProfile, now: datetime) -> bool:
+        start = self.resolve(profile.start, now.date())
+        end = self.resolve(profile.end, now.date())
+        if start is None or end is None:
+            return False
+        if start <= end:
+            return start <= now < end
+        # Window wraps past midnight
+        return now >= start or now < end
+
+    def active_profile(self, now: datetime | None = None) -> ScheduleProfile | None:
+        now = now or datetime.now().astimezone()
+        for profile in self.profiles:
+            if self._contains(profile, now):
+                return profile
+        return None
@@ -0,0 +1,80 @@
+import json
+import logging
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_logger = logging.getLogger(__name__)
+
+
+class Serializer:
+    name = "json"
+    extension = ".json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(Serializer):
+    name = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    name = "msgpack"
+    extension = ".msgpack"
+
+    def dumps(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+def get_serializer(name: str = "json") -> Serializer:
+    """Return a serializer by name. "auto" picks orjson when installed, falling back to stdlib json."""
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+
+    if name == "json":
+        return Serializer()
+    if name == "orjson":
+        if orjson is None:
+            _logger.warning("orjson is not installed, falling back to json")
+            return Serializer()
+        return OrjsonSerializer()
+    if name == "msgpack":
+        if msgpack is None:
+            _logger.warning("msgpack is not installed, falling back to json")
+            return Serializer()
+        return MsgpackSerializer()
+
+    raise ValueError(f"unknown serializer: {name}")
+
+
+def serializer_for_path(path: str) -> Serializer:
+    if path.endswith(MsgpackSerializer.extension):
+        return get_serializer("msgpack")
+    return get_serializer("auto")
+
+
+def load_file(path: str) -> Any:
+    """Load a JSON or msgpack file written by any of the serializers."""
+    with open(path, "rb") as f:
+        return serializer_for_path(path).loads(f.read())
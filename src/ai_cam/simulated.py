@@ -0,0 +1,152 @@
+import logging
+import math
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from ai_cam.config import SimulatedFaults
+from ai_cam.decoder import YoloDecoder
+from ai_cam.supervisor import COMPONENT_CAMERA, COMPONENT_DETECTOR
+from ai_cam.utils import DetectionBatch
+
+
+class _FaultInjector:
+    def __init__(self, faults: SimulatedFaults, component: str):
+        self.faults = faults
+        # Each component draws its own stream from the configured seed, independent of what else was created
+        seed = None if faults.seed is None else [faults.seed, zlib.crc32(component.encode())]
+        self.rng = np.random.default_rng(seed)
+
+    def roll(self, probability: float) -> bool:
+        return probability > 0 and self.rng.random() < probability
+
+
+class SimulatedCamera:
+    """Stand-in for CameraCSI producing synthetic frames, with optional fault injection.
+
+    Runs anywhere without picamera2, for exercising the capture loop and the supervisor.
+    """
+    def __init__(self, device_name: str, video_wh: tuple[int, int] = (1920, 1080), save_video: bool = False,
+                 data_output: str = ".", buffer_secs: int = 5, fps: int = 10, draw_bbox: bool = False,
+                 faults: SimulatedFaults | None = None):
+        self.logger = logging.getLogger(__name__)
+        self.logger.info("Simulated camera initialized!")
+
+        self.device_name = device_name
+        self.video_wh = video_wh
+        self.save_video = save_video
+        self.fps = fps
+        self.draw_bbox = draw_bbox
+        self.video_file_name = None
+        self.encoder_running = save_video
+        self.latest_detections = None
+
+        self.faults = _FaultInjector(faults or SimulatedFaults(), COMPONENT_CAMERA)
+        self._stalled_until = 0.0
+        self._next_frame = time.monotonic()
+        # Four channels, like Picamera2's default XBGR8888 main stream
+        self._frame = np.zeros((video_wh[1], video_wh[0], 4), dtype=np.uint8)
+        self._frame[..., 3] = 255
+        self._running = True
+
+    def get_frames(self, timeout: float | None = None):
+        if not self._running:
+            raise RuntimeError("camera is not running")
+
+        faults = self.faults.faults
+        if self.faults.roll(faults.stall):
+            self.logger.warning("Injecting capture stall")
+            self._stalled_until = time.monotonic() + faults.stall_secs
+        if self._stalled_until > time.monotonic():
+            wait = self._stalled_until - time.monotonic()
+            if timeout is not None and wait > timeout:
+                time.sleep(timeout)
+                raise TimeoutError("simulated capture timed out")
+            time.sleep(wait)
+
+        if self.faults.roll(faults.capture_error):
+            raise RuntimeError("simulated capture failure")
+
+        # Pace like a real sensor running at `fps`
+        self._next_frame = max(self._next_frame + 1 / self.fps, time.monotonic())
+        time.sleep(max(0.0, self._next_frame - time.monotonic()))
+
+        if self.faults.roll(faults.none_frame):
+            return None, {}
+
+        metadata = {"ScalerCrop": (0, 0, 4056, 3040), "SensorTimestamp": time.monotonic_ns(),
+                    "FrameDuration": int(1e6 / self.fps)}
+        return self._frame, metadata
+
+    def set_draw_bbox(self, draw_bbox: bool):
+        self.draw_bbox = draw_bbox
+
+    def update_detections(self, detections):
+        self.latest_detections = detections
+
+    def start_video_recording(self, classes_name):
+        if self.save_video:
+            timestamp = datetime.now().astimezone().strftime("%Y%m%d_%H%M%S")
+            self.video_file_name = f"{self.device_name}_{classes_name}_{timestamp}.h264"
+
+    def stop_video_recording(self):
+        pass
+
+    def pause_video_encoder(self):
+        self.encoder_running = False
+
+    def resume_video_encoder(self):
+        self.encoder_running = self.save_video
+
+    def sleep(self):
+        self._running = False
+
+    def wake(self):
+        self._running = True
+
+    def stop_camera(self):
+        self._running = False
+
+
+class _SimulatedModel:
+    camera_num = 0
+
+
+class SimulatedDetector(YoloDecoder):
+    """Stand-in for IMX500Yolo emitting synthetic YOLO tensors (a bird passing every minute or so) through the
+    normal decoding path, with optional fault injection."""
+    def __init__(self, labels_path: str, valid_classes_path: str | None, confidence: float,
+                 iou_threshold: float, class_confidence: dict[str, float] | None = None,
+                 zones: list | None = None, faults: SimulatedFaults | None = None, network_ips: int = 10):
+        faults = faults or SimulatedFaults()
+        super().__init__(labels_path=labels_path, valid_classes_path=valid_classes_path, confidence=confidence,
+                         iou_threshold=iou_threshold, class_confidence=class_confidence, zones=zones,
+                         tensor_lag_frames=faults.tensor_lag_frames)
+        self.network_ips = network_ips
+        self.yolo_model = _SimulatedModel()
+        self.last_outputs = None
+        self.faults = _FaultInjector(faults, COMPONENT_DETECTOR)
+        self._class_id = self.class_names.index("bird") if "bird" in self.class_names else 0
+
+    def _outputs(self, now: float) -> list[np.ndarray]:
+        model_w, model_h = self.model_wh
+        phase = (now % 60) / 60
+        score = max(0.0, math.sin(phase * 2 * math.pi)) * 0.9
+        cx, cy = model_w * (0.2 + 0.6 * phase), model_h * 0.5
+        boxes = np.array([[[cx - 40, cy - 30, cx + 40, cy + 30]]], dtype=np.float32)
+        return [boxes, np.array([[score]], dtype=np.float32), np.array([[self._class_id]], dtype=np.float32)]
+
+    def get_detections(self, metadata: dict) -> DetectionBatch | None:
+        faults = self.faults.faults
+        if self.faults.roll(faults.detector_error):
+            raise RuntimeError("simulated detector failure")
+        if self.faults.roll(faults.missing_tensor) or not metadata:
+            self.last_outputs = None
+            return None
+
+        # Outputs for the frame the tensor was computed from, `tensor_lag_frames` behind this one
+        lag_secs = (metadata["SensorTimestamp"] - self.tensor_timestamp(metadata)) / 1e9
+        self.last_outputs = self._outputs(time.time() - lag_secs)
+        return self.extract_detections(self.last_outputs, metadata)
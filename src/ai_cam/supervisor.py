@@ -0,0 +1,143 @@
+import logging
+import time
+from dataclasses import dataclass
+
+COMPONENT_CAMERA = "camera"
+COMPONENT_DETECTOR = "detector"
+
+# What to do about a fault, from least to most disruptive
+ACTION_RETRY = "retry"
+ACTION_REINIT_CAMERA = "reinit_camera"
+ACTION_REINIT_DETECTOR = "reinit_detector"
+
+# Errors that can clear up on their own, so the first one in a row is retried before reinitialising anything
+TRANSIENT_ERRORS = (TimeoutError, InterruptedError, BlockingIOError)
+# Errors decoding a single output tensor, skipped unless they keep happening
+TENSOR_ERRORS = (ValueError, IndexError, KeyError)
+
+
+class SupervisorGaveUp(RuntimeError):
+    """Raised once recovery has failed too many times in a row; the process should exit and be restarted."""
+
+
+@dataclass
+class Fault:
+    component: str
+    kind: str
+    action: str
+    delay_secs: float
+    error: str = ""
+
+
+class CaptureSupervisor:
+    """Watch the capture pipeline for errors and stalls and decide how to recover.
+
+    The caller reports each good frame and tensor, and any exception along with the component it came from. Faults
+    are classified into a retry or a reinitialisation of the camera or the detector (which also restarts the camera,
+    as the IMX500 streams through it), with exponential backoff between consecutive faults. Recovery time runs from
+    the first fault of a streak until the next inference result.
+    """
+    def __init__(self, frame_deadline_secs: float = 5, tensor_deadline_secs: float = 10,
+                 backoff_secs: float = 1, backoff_max_secs: float = 20, max_attempts: int = 10):
+        self.logger = logging.getLogger(__name__)
+
+        self.frame_deadline_secs = frame_deadline_secs
+        self.tensor_deadline_secs = tensor_deadline_secs
+        self.backoff_secs = backoff_secs
+        self.backoff_max_secs = backoff_max_secs
+        self.max_attempts = max_attempts
+        # Expected time between inferences; deadlines are stretched to cover a few of them at low rates
+        self.min_interval_secs = 0.0
+
+        self.fault_counts: dict[str, int] = {}
+        self.recovery_secs: list[float] = []
+        self.attempts = 0
+        self._streak_start: float | None = None
+        self._last_kind: str | None = None
+        self.reset_deadlines()
+
+    def reset_deadlines(self):
+        """Restart the stall timers, e.g. after a reinit or waking up."""
+        now = time.monotonic()
+        self._last_frame = now
+        self._last_tensor = now
+
+    @property
+    def recovering(self) -> bool:
+        return self._streak_start is not None
+
+    def frame_ok(self):
+        self._last_frame = time.monotonic()
+
+    def tensor_ok(self):
+        now = time.monotonic()
+        self._last_tensor = now
+        if self._streak_start is None:
+            return
+
+        recovery = now - self._streak_start
+        self.recovery_secs.append(recovery)
+        self.logger.warning("Capture recovered after %.2fs and %s attempt(s)", recovery, self.attempts,
+                            extra={"recovery_secs": round(recovery, 3)})
+        self._streak_start = None
+        self._last_kind = None
+        self.attempts = 0
+
+    def check_stall(self) -> Fault | None:
+        now = time.monotonic()
+        if now - self._last_frame > max(self.frame_deadline_secs, 3 * self.min_interval_secs):
+            return self._fault(COMPONENT_CAMERA, "stall", ACTION_REINIT_CAMERA,
+                               f"no frame for {now - self._last_frame:.1f}s")
+        if now - self._last_tensor > max(self.tensor_deadline_secs, 3 * self.min_interval_secs):
+            return self._fault(COMPONENT_DETECTOR, "stall", ACTION_REINIT_DETECTOR,
+                               f"no inference result for {now - self._last_tensor:.1f}s")
+        return None
+
+    def classify(self, component: str, error: BaseException) -> Fault:
+        """Turn an exception from `component` into a Fault. Re-raises errors that cannot be recovered in-process."""
+        if isinstance(error, (MemoryError, SystemExit, KeyboardInterrupt)):
+            raise error
+
+        reinit = ACTION_REINIT_DETECTOR if component == COMPONENT_DETECTOR else ACTION_REINIT_CAMERA
+        if isinstance(error, TRANSIENT_ERRORS):
+            kind = "timeout"
+        elif component == COMPONENT_DETECTOR and isinstance(error, TENSOR_ERRORS):
+            kind = "tensor"
+        elif isinstance(error, OSError):
+            kind = "io"
+        else:
+            kind = "error"
+
+        # A one-off timeout or bad tensor is retried; the same fault twice in a row gets a reinit
+        repeated = self.recovering and self._last_kind == f"{component}:{kind}"
+        action = ACTION_RETRY if kind in ("timeout", "tensor") and not repeated else reinit
+        return self._fault(component, kind, action, f"{type(error).__name__}: {error}")
+
+    def _fault(self, component: str, kind: str, action: str, error: str) -> Fault:
+        now = time.monotonic()
+        key = f"{component}:{kind}"
+        self.fault_counts[key] = self.fault_counts.get(key, 0) + 1
+        if self._streak_start is None:
+            self._streak_start = now
+        self._last_kind = key
+
+        self.attempts += 1
+        if self.attempts > self.max_attempts:
+            raise SupervisorGaveUp(f"capture did not recover after {self.max_attempts} attempts ({error})")
+
+        delay = 0.0 if action == ACTION_RETRY else min(self.backoff_secs * 2 ** (self.attempts - 1),
+                                                       self.backoff_max_secs)
+        fault = Fault(component, kind, action, delay, error)
+        self.logger.warning("%s fault (%s): %s -> %s%s [attempt %s/%s]", component, kind, error, action,
+                            f" in {delay:.1f}s" if delay else "", self.attempts, self.max_attempts,
+                            extra={"component": component, "fault": kind, "action": action})
+        return fault
+
+    def stats(self) -> dict:
+        recoveries = self.recovery_secs
+        return {
+            "faults": dict(self.fault_counts),
+            "recoveries": len(recoveries),
+            "mean_recovery_secs": round(sum(recoveries) / len(recoveries), 3) if recoveries else None,
+            "max_recovery_secs": round(max(recoveries), 3) if recoveries else None,
+        }
@@ -0,0 +1,506 @@
+import json
+import logging
+import os
+import random
+import tarfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+
+class SyncTracker:
+    """Track artifacts written by the data logger until they have been uploaded.
+
+    Every state change is appended to a small journal so the set of pending and synced files survives restarts
+    without ever walking the output directory. Journal lines are `A <size> <path>` (added),
+    `S <path>` (synced) and `D <path>` (deleted).
+    """
+    def __init__(self, data_output: str):
+        self.logger = logging.getLogger(__name__)
+
+        self.data_output = Path(data_output)
+        self.sync_dir = self.data_output / ".sync"
+        self.sync_dir.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.sync_dir / "journal.log"
+
+        self._lock = threading.Lock()
+        self.pending: OrderedDict[str, int] = OrderedDict()
+        self.synced: OrderedDict[str, int] = OrderedDict()
+        self.bundled: set[str] = set()
+        self.total_bytes = 0
+
+        self._load_journal()
+        self._compact_journal()
+        self._journal = open(self.journal_path, "a", buffering=1)  # noqa: SIM115
+
+        self.logger.info("Sync tracker: %s pending, %s synced files", len(self.pending), len(self.synced))
+
+    def _load_journal(self):
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path) as f:
+            for line in f:
+                op, _, rest = line.rstrip("\n").partition(" ")
+                if op == "A":
+                    size, _, path = rest.partition(" ")
+                    self.pending[path] = int(size)
+                elif op == "S" and rest in self.pending:
+                    self.synced[rest] = self.pending.pop(rest)
+                elif op == "D":
+                    self.pending.pop(rest, None)
+                    self.synced.pop(rest, None)
+
+        self.total_bytes = sum(self.pending.values()) + sum(self.synced.values())
+
+    def _compact_journal(self):
+        tmp_path = self.journal_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            f.writelines(f"A {size} {path}\nS {path}\n" for path, size in self.synced.items())
+            f.writelines(f"A {size} {path}\n" for path, size in self.pending.items())
+        os.replace(tmp_path, self.journal_path)
+
+    def track(self, path: str):
+        """Record a newly written artifact. Called from the write path."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+
+        rel_path = os.path.relpath(path, self.data_output)
+        with self._lock:
+            self.pending[rel_path] = size
+            self.total_bytes += size
+            self._journal.write(f"A {size} {rel_path}\n")
+
+    def is_tracked(self, path: str) -> bool:
+        """Whether an artifact is pending or synced."""
+        rel_path = os.path.relpath(path, self.data_output)
+        with self._lock:
+            return rel_path in self.pending or rel_path in self.synced
+
+    def take_pending(self, max_files: int) -> list[str]:
+        """Reserve up to max_files pending artifacts that are not already part of a bundle."""
+        with self._lock:
+            paths = []
+            for path in self.pending:
+                if len(paths) >= max_files:
+                    break
+                if path not in self.bundled:
+                    paths.append(path)
+            self.bundled.update(paths)
+            return paths
+
+    def reserve(self, paths: list[str]):
+        with self._lock:
+            self.bundled.update(paths)
+
+    def mark_synced(self, paths: list[str]):
+        with self._lock:
+            for path in paths:
+                self.bundled.discard(path)
+                if path in self.pending:
+                    self.synced[path] = self.pending.pop(path)
+                    self._journal.write(f"S {path}\n")
+
+    def mark_deleted(self, path: str):
+        with self._lock:
+            self.bundled.discard(path)
+            size = self.pending.pop(path, None)
+            if size is None:
+                size = self.synced.pop(path, 0)
+            self.total_bytes -= size
+            self._journal.write(f"D {path}\n")
+
+    def delete_synced(self, paths: list[str] | None = None, target_bytes: int | None = None) -> int:
+        """Delete synced artifacts, either the given paths or oldest-first until under target_bytes."""
+        if paths is None:
+            paths = list(self.synced)
+
+        deleted = 0
+        for path in paths:
+            if target_bytes is not None and self.total_bytes <= target_bytes:
+                break
+            if path not in self.synced:
+                continue
+            try:
+                os.remove(self.data_output / path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.warning("Could not delete synced file %s: %s", path, e)
+                continue
+            self.mark_deleted(path)
+            deleted += 1
+
+        return deleted
+
+    def close(self):
+        with self._lock:
+            if not self._journal.closed:
+                self._journal.close()
+
+
+class SyncSink(ABC):
+    """Destination for sync bundles. Uploads are chunked and resumable from `uploaded_bytes`.
+
+    `chunk_size` is the largest chunk sent at once; chunks are made smaller under a bandwidth cap, down to
+    `min_chunk_size`.
+    """
+    chunk_size = 1024 * 1024
+    min_chunk_size = 16 * 1024
+
+    @abstractmethod
+    def uploaded_bytes(self, name: str) -> int:
+        ...
+
+    @abstractmethod
+    def upload_chunk(self, name: str, offset: int, data: bytes, total: int):
+        ...
+
+    @abstractmethod
+    def complete(self, name: str, total: int):
+        ...
+
+
+class LocalDirectorySink(SyncSink):
+    """Copy bundles into a local (or network mounted) directory. Also a stand-in for testing."""
+    def __init__(self, target_dir: str, chunk_size: int = 1024 * 1024):
+        self.target_dir = Path(target_dir)
+        self.target_dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+
+    def _part_path(self, name: str) -> Path:
+        return self.target_dir / f"{name}.part"
+
+    def uploaded_bytes(self, name: str) -> int:
+        if (self.target_dir / name).exists():
+            return (self.target_dir / name).stat().st_size
+        part_path = self._part_path(name)
+        return part_path.stat().st_size if part_path.exists() else 0
+
+    def upload_chunk(self, name: str, offset: int, data: bytes, total: int):
+        with open(self._part_path(name), "r+b" if offset else "wb") as f:
+            f.seek(offset)
+            f.write(data)
+            f.truncate()
+
+    def complete(self, name: str, total: int):
+        part_path = self._part_path(name)
+        if part_path.exists():
+            os.replace(part_path, self.target_dir / name)
+
+
+class HttpSink(SyncSink):
+    """Upload bundles to an HTTP endpoint.
+
+    `HEAD <url>/<name>` must report the bytes received so far as `Content-Length` (404 when unknown),
+    each chunk is sent as `PUT <url>/<name>` with a `Content-Range` header, and the upload is finalised with
+    `POST <url>/<name>`.
+    """
+    def __init__(self, url: str, token: str | None = None, chunk_size: int = 1024 * 1024,
+                 timeout: float = 30):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+
+    def _request(self, method: str, name: str, data: bytes | None = None, headers: dict | None = None):
+        request = urllib.request.Request(f"{self.url}/{name}", data=data, method=method, headers=headers or {})
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def uploaded_bytes(self, name: str) -> int:
+        try:
+            with self._request("HEAD", name) as response:
+                return int(response.headers.get("Content-Length", 0))
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return 0
+            raise
+
+    def upload_chunk(self, name: str, offset: int, data: bytes, total: int):
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "Content-Range": f"bytes {offset}-{offset + len(data) - 1}/{total}",
+        }
+        with self._request("PUT", name, data=data, headers=headers):
+            pass
+
+    def complete(self, name: str, total: int):
+        with self._request("POST", name, data=b"", headers={"Content-Length": "0"}):
+            pass
+
+
+class S3Sink(SyncSink):
+    """Upload bundles to an S3 compatible object store with multipart uploads (requires boto3)."""
+    chunk_size = 8 * 1024 * 1024
+    # Every part but the last must be at least 5 MiB
+    min_chunk_size = 5 * 1024 * 1024
+
+    def __init__(self, target: str, endpoint_url: str | None = None):
+        import boto3
+
+        bucket, _, prefix = target.removeprefix("s3://").partition("/")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self._upload_ids: dict[str, str] = {}
+        self._parts: dict[str, list[dict]] = {}
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    def _upload_id(self, name: str) -> str | None:
+        if name in self._upload_ids:
+            return self._upload_ids[name]
+
+        response = self.client.list_multipart_uploads(Bucket=self.bucket, Prefix=self._key(name))
+        for upload in response.get("Uploads", []):
+            if upload["Key"] == self._key(name):
+                self._upload_ids[name] = upload["UploadId"]
+                return upload["UploadId"]
+        return None
+
+    def uploaded_bytes(self, name: str) -> int:
+        upload_id = self._upload_id(name)
+        if upload_id is None:
+            self._parts[name] = []
+            return 0
+
+        response = self.client.list_parts(Bucket=self.bucket, Key=self._key(name), UploadId=upload_id)
+        parts = response.get("Parts", [])
+        self._parts[name] = [{"ETag": p["ETag"], "PartNumber": p["PartNumber"]} for p in parts]
+        return sum(p["Size"] for p in parts)
+
+    def upload_chunk(self, name: str, offset: int, data: bytes, total: int):
+        upload_id = self._upload_id(name)
+        if upload_id is None:
+            upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=self._key(name))["UploadId"]
+            self._upload_ids[name] = upload_id
+
+        parts = self._parts.setdefault(name, [])
+        part_number = len(parts) + 1
+        response = self.client.upload_part(Bucket=self.bucket, Key=self._key(name), UploadId=upload_id,
+                                           PartNumber=part_number, Body=data)
+        parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def complete(self, name: str, total: int):
+        upload_id = self._upload_id(name)
+        if upload_id is None:
+            return
+        self.client.complete_multipart_upload(Bucket=self.bucket, Key=self._key(name), UploadId=upload_id,
+                                              MultipartUpload={"Parts": self._parts.pop(name, [])})
+        self._upload_ids.pop(name, None)
+
+
+def create_sink(sink_type: str, target: str, token: str | None = None,
+                endpoint_url: str | None = None) -> SyncSink:
+    if sink_type == "local":
+        return LocalDirectorySink(target)
+    if sink_type == "http":
+        return HttpSink(target, token=token)
+    if sink_type == "s3":
+        return S3Sink(target, endpoint_url=endpoint_url)
+
+    raise ValueError(f"unknown sync sink: {sink_type}")
+
+
+class _TokenBucket:
+    def __init__(self, bytes_per_sec: float, stop: threading.Event):
+        self.bytes_per_sec = bytes_per_sec
+        self.allowance = bytes_per_sec
+        self.last = time.monotonic()
+        self._stop = stop
+
+    def chunk_size(self, sink: SyncSink) -> int:
+        """Chunks of about a quarter of a second of bandwidth, so the cap holds over short periods too."""
+        if self.bytes_per_sec <= 0:
+            return sink.chunk_size
+        return int(min(sink.chunk_size, max(sink.min_chunk_size, self.bytes_per_sec / 4)))
+
+    def consume(self, n_bytes: int):
+        """Wait until `n_bytes` may be sent. Raises InterruptedError if the agent is stopped meanwhile."""
+        if self.bytes_per_sec <= 0:
+            return
+
+        now = time.monotonic()
+        self.allowance = min(self.bytes_per_sec, self.allowance + (now - self.last) * self.bytes_per_sec)
+        self.last = now
+
+        self.allowance -= n_bytes
+        if self.allowance < 0 and self._stop.wait(-self.allowance / self.bytes_per_sec):
+            raise InterruptedError("sync stopped")
+
+
+class SyncAgent:
+    """Background thread that bundles pending artifacts into compressed tarballs and uploads them."""
+    def __init__(self, tracker: SyncTracker, sink: SyncSink, device_name: str, interval_secs: float = 300,
+                 batch_files: int = 200, bandwidth_kbps: float = 0, delete_after_upload: bool = False,
+                 storage_quota_mb: float = 0, max_retries: int = 5):
+
+        self.logger = logging.getLogger(__name__)
+
+        self.tracker = tracker
+        self.sink = sink
+        self.device_name = device_name
+        self.interval_secs = interval_secs
+        self.batch_files = batch_files
+        self.delete_after_upload = delete_after_upload
+        self.quota_bytes = int(storage_quota_mb * 1024 * 1024)
+        self.max_retries = max_retries
+        self._stop = threading.Event()
+        self.bucket = _TokenBucket(bandwidth_kbps * 1024 / 8, self._stop)
+
+        self.outbox = tracker.sync_dir / "outbox"
+        self.outbox.mkdir(exist_ok=True)
+        bundles = set()
+        for manifest_path in self.outbox.glob("*.json"):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if not (self.outbox / manifest["bundle"]).exists():
+                # Crashed before the bundle was finished
+                manifest_path.unlink()
+                continue
+            self.tracker.reserve(manifest["files"])
+            bundles.add(manifest["bundle"])
+        # Bundles a crash left without a manifest; their files are still pending and will be bundled again
+        for bundle_path in self.outbox.glob("*.tar.gz*"):
+            if bundle_path.name not in bundles:
+                bundle_path.unlink()
+
+        self._thread = threading.Thread(target=self._run, name="sync-agent", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: float = 30):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                # Still inside a sink call; the thread closes the tracker itself when it gets out
+                self.logger.warning("Sync agent did not stop in time, leaving it to finish")
+                return
+        self.tracker.close()
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.sync_once()
+                except Exception as e:
+                    self.logger.warning("Sync pass failed: %s", e, exc_info=True)
+                self._stop.wait(self.interval_secs)
+        finally:
+            self.tracker.close()
+
+    def sync_once(self):
+        # Previously built bundles first so interrupted uploads resume before new work
+        for manifest_path in sorted(self.outbox.glob("*.json")):
+            if self._stop.is_set():
+                return
+            self._upload_bundle(manifest_path)
+
+        while not self._stop.is_set():
+            manifest_path = self._build_bundle()
+            if manifest_path is None:
+                break
+            if not self._upload_bundle(manifest_path):
+                break
+
+        self._enforce_quota()
+
+    def _build_bundle(self) -> Path | None:
+        paths = self.tracker.take_pending(self.batch_files)
+        if not paths:
+            return None
+
+        timestamp = datetime.now().astimezone().strftime("%Y%m%d-%H%M%S-%f")
+        name = f"{self.device_name}_{timestamp}.tar.gz"
+        bundle_path = self.outbox / name
+        tmp_path = self.outbox / f"{name}.tmp"
+
+        included = []
+        with tarfile.open(tmp_path, "w:gz") as tar:
+            for path in paths:
+                try:
+                    tar.add(self.tracker.data_output / path, arcname=path)
+                    included.append(path)
+                except FileNotFoundError:
+                    self.tracker.mark_deleted(path)
+
+        # Manifest first: a bundle without one is removed on start, a manifest without its bundle is dropped
+        manifest_path = bundle_path.with_suffix("").with_suffix(".json")
+        with open(manifest_path, "w") as f:
+            json.dump({"bundle": name, "files": included}, f)
+        os.replace(tmp_path, bundle_path)
+
+        self.logger.info("Bundled %s files into %s", len(included), name)
+        return manifest_path
+
+    def _upload_bundle(self, manifest_path: Path) -> bool:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+        name = manifest["bundle"]
+        bundle_path = self.outbox / name
+        if not bundle_path.exists():
+            manifest_path.unlink()
+            return True
+
+        for attempt in range(self.max_retries):
+            try:
+                self._upload_file(bundle_path, name)
+                break
+            except InterruptedError:
+                return False
+            except Exception as e:  # noqa: BLE001 - each sink raises its own client errors
+                delay = min(300, 2 ** attempt) * (0.5 + random.random())
+                self.logger.warning("Upload of %s failed (%s), retrying in %.1fs", name, e, delay)
+                if self._stop.wait(delay):
+                    return False
+        else:
+            return False
+
+        self.tracker.mark_synced(manifest["files"])
+        if self.delete_after_upload:
+            self.tracker.delete_synced(manifest["files"])
+
+        bundle_path.unlink()
+        manifest_path.unlink()
+        self.logger.info("Uploaded %s", name)
+        return True
+
+    def _upload_file(self, bundle_path: Path, name: str):
+        total = bundle_path.stat().st_size
+        offset = self.sink.uploaded_bytes(name)
+
+        with open(bundle_path, "rb") as f:
+            f.seek(offset)
+            chunk_size = self.bucket.chunk_size(self.sink)
+            while offset < total:
+                if self._stop.is_set():
+                    raise InterruptedError("sync stopped")
+                data = f.read(chunk_size)
+                self.bucket.consume(len(data))
+                self.sink.upload_chunk(name, offset, data, total)
+                offset += len(data)
+
+        self.sink.complete(name, total)
+
+    def _enforce_quota(self):
+        if self.quota_bytes <= 0 or self.tracker.total_bytes <= self.quota_bytes:
+            return
+
+        deleted = self.tracker.delete_synced(target_bytes=self.quota_bytes)
+        if deleted:
+            self.logger.info("Storage quota: deleted %s synced files", deleted)
+        if self.tracker.total_bytes > self.quota_bytes:
+            self.logger.warning("Storage quota exceeded by unsynced data (%.1f MB)", self.tracker.total_bytes / 1e6)
@@ -63,6 +63,7 @@ def _render_service(name: str, user: str, exec_start: str) -> str:
             f"User={user}\n"
             f"Group={user}\n"
             f"ExecStart={exec_start}\n"
+            "ExecReload=/bin/kill -HUP $MAINPID\n"
             "Restart=always\n"
             "RestartSec=10\n"
             "WatchdogSec=30\n"
@@ -117,10 +118,9 @@ def install_systemd(config_path: Path | None = None) -> None:
 
     # Start systemd services
     subprocess.run(["systemctl", "daemon-reload"], check=True)
-    for name in _SERVICES:
-        subprocess.run(["systemctl", "enable", name], check=True)
-        subprocess.run(["systemctl", "restart", name], check=True)
-        _logger.info("%s installed & started", name)
+    subprocess.run(["systemctl", "enable", *_SERVICES], check=True)
+    subprocess.run(["systemctl", "restart", *_SERVICES], check=True)
+    _logger.info("%s installed & started", ", ".join(_SERVICES))
     _logger.info("Installation complete!")
 
 
@@ -138,7 +138,12 @@ def uninstall_systemd() -> None:
 
 def restart_systemd() -> None:
     _check_run_requirements()
-    target_dir = Path("/etc/systemd/system")
-    for name in _SERVICES:
-        subprocess.run(["systemctl", "restart", name], check=True)
-    _logger.info("Restart complete!")
\ No newline at end of file
+    # One call so systemd restarts the services as a single transaction
+    subprocess.run(["systemctl", "restart", *_SERVICES], check=True)
+    _logger.info("Restart complete!")
+
+
+def reload_systemd() -> None:
+    _check_run_requirements()
+    subprocess.run(["systemctl", "reload", *_SERVICES], check=True)
+    _logger.info("Reload complete!")
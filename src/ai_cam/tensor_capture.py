@@ -0,0 +1,219 @@
+import contextlib
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+SEGMENT_SUFFIX = ".tensors"
+INDEX_SUFFIX = ".json"
+
+
+def _record_dtype(outputs: list[np.ndarray]) -> np.dtype:
+    fields = [("timestamp", "<f8"), ("sensor_timestamp", "<i8"), ("scaler_crop", "<i4", (4,))]
+    for i, output in enumerate(outputs):
+        fields.append((f"output_{i}", output.dtype.newbyteorder("<").str, output.shape))
+    return np.dtype(fields)
+
+
+class _Segment:
+    """One append-only file of fixed size records plus a JSON index describing the record layout."""
+    def __init__(self, path: Path, dtype: np.dtype, model_wh: tuple[int, int], start: float):
+        self.path = path
+        self.dtype = dtype
+        self.start = start
+        self.records = 0
+
+        index = {
+            "version": 1,
+            "model_wh": list(model_wh),
+            "record_size": dtype.itemsize,
+            "fields": [[name, dtype.fields[name][0].base.str, list(dtype.fields[name][0].shape)]
+                       for name in dtype.names],
+        }
+        with open(path.with_suffix(INDEX_SUFFIX), "w") as f:
+            json.dump(index, f)
+
+        self._file = open(path, "ab")  # noqa: SIM115
+
+    def write(self, record: np.ndarray):
+        self._file.write(record.tobytes())
+        self.records += 1
+
+    def close(self):
+        self._file.close()
+
+
+class TensorRecorder:
+    """Capture raw IMX500 output tensors to memory-mappable segment files for debugging and replay.
+
+    The capture loop only enqueues references to the tensors; packing and disk writes happen on a background
+    thread. In "ring" mode every inference is kept for `retention_mins`; in "events" mode only inferences within
+    `event_padding_secs` of an active event are written.
+    """
+    def __init__(self, data_output: str, device_name: str, model_wh: tuple[int, int], mode: str = "ring",
+                 retention_mins: float = 10, segment_secs: float = 60, event_padding_secs: float = 5,
+                 max_queue: int = 32):
+
+        self.logger = logging.getLogger(__name__)
+
+        self.tensor_path = Path(data_output) / "tensors"
+        self.tensor_path.mkdir(parents=True, exist_ok=True)
+        self.device_name = device_name
+        self.model_wh = model_wh
+        self.mode = mode
+        self.retention_secs = retention_mins * 60
+        self.segment_secs = segment_secs
+        self.event_padding_secs = event_padding_secs
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._pre_event: deque = deque()
+        self._last_event_time = float("-inf")
+        self._segment: _Segment | None = None
+        self._segments = deque(sorted(self.tensor_path.glob(f"*{SEGMENT_SUFFIX}")))
+
+        # Write cost accounting
+        self.dropped = 0
+        self.written = 0
+        self.write_secs = 0.0
+        self.max_write_secs = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="tensor-recorder", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self.logger.info("Capturing raw tensors (%s) to %s", self.mode, self.tensor_path)
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+        self.logger.info("Tensor capture: %s written, %s dropped, %.2f ms mean / %.2f ms max write",
+                         self.written, self.dropped, self.mean_write_ms, self.max_write_secs * 1000)
+
+    @property
+    def mean_write_ms(self) -> float:
+        return self.write_secs / self.written * 1000 if self.written else 0.0
+
+    def submit(self, outputs: list[np.ndarray] | None, metadata: dict, timestamp: datetime, in_event: bool):
+        """Queue one inference result. Never blocks; results are dropped if the writer falls behind."""
+        if not outputs:
+            return
+        try:
+            self._queue.put_nowait((outputs, metadata.get("ScalerCrop", (0, 0, 0, 0)),
+                                    metadata.get("SensorTimestamp", 0), timestamp.timestamp(), in_event))
+        except queue.Full:
+            self.dropped += 1
+
+    def _pack(self, outputs, scaler_crop, sensor_timestamp, timestamp) -> np.ndarray:
+        # Outputs come from get_outputs(add_batch=True), drop the batch dimension
+        outputs = [np.asarray(output)[0] for output in outputs]
+
+        record = np.zeros((), dtype=_record_dtype(outputs))
+        record["timestamp"] = timestamp
+        record["sensor_timestamp"] = sensor_timestamp
+        record["scaler_crop"] = scaler_crop
+        for i, output in enumerate(outputs):
+            record[f"output_{i}"] = output
+        return record
+
+    def _write(self, record: np.ndarray):
+        start = time.perf_counter()
+
+        timestamp = float(record["timestamp"])
+        segment = self._segment
+        if segment is None or segment.dtype != record.dtype or timestamp - segment.start >= self.segment_secs:
+            self._rotate(record.dtype, timestamp)
+        self._segment.write(record)
+
+        elapsed = time.perf_counter() - start
+        self.written += 1
+        self.write_secs += elapsed
+        self.max_write_secs = max(self.max_write_secs, elapsed)
+
+    def _rotate(self, dtype: np.dtype, timestamp: float):
+        if self._segment is not None:
+            self._segment.close()
+
+        name = datetime.fromtimestamp(timestamp).strftime("%Y%m%d-%H%M%S-%f")
+        path = self.tensor_path / f"{self.device_name}_{name}{SEGMENT_SUFFIX}"
+        self._segment = _Segment(path, dtype, self.model_wh, start=timestamp)
+        self._segments.append(path)
+
+        self._enforce_retention(timestamp)
+
+    def _enforce_retention(self, now: float):
+        while len(self._segments) > 1:
+            oldest = self._segments[0]
+            if now - oldest.stat().st_mtime < self.retention_secs:
+                break
+            self._segments.popleft()
+            for path in (oldest, oldest.with_suffix(INDEX_SUFFIX)):
+                with contextlib.suppress(FileNotFoundError):
+                    path.unlink()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            outputs, scaler_crop, sensor_timestamp, timestamp, in_event = item
+            try:
+                record = self._pack(outputs, scaler_crop, sensor_timestamp, timestamp)
+                if self.mode == "events":
+                    self._handle_event_mode(record, timestamp, in_event)
+                else:
+                    self._write(record)
+            except Exception as e:
+                self.logger.warning("Tensor capture failed: %s", e, exc_info=True)
+
+        if self._segment is not None:
+            self._segment.close()
+
+    def _handle_event_mode(self, record: np.ndarray, timestamp: float, in_event: bool):
+        if in_event:
+            self._last_event_time = timestamp
+
+        if timestamp - self._last_event_time <= self.event_padding_secs:
+            # Flush the pre-event history before the current record
+            while self._pre_event:
+                self._write(self._pre_event.popleft())
+            self._write(record)
+            return
+
+        self._pre_event.append(record)
+        while self._pre_event and timestamp - float(self._pre_event[0]["timestamp"]) > self.event_padding_secs:
+            self._pre_event.popleft()
+
+
+class TensorSegmentReader:
+    """Memory-map a captured tensor segment for offline replay."""
+    def __init__(self, path: str):
+        self.path = Path(path)
+        with open(self.path.with_suffix(INDEX_SUFFIX)) as f:
+            index = json.load(f)
+
+        self.model_wh = tuple(index["model_wh"])
+        self.dtype = np.dtype([(name, dtype, tuple(shape)) for name, dtype, shape in index["fields"]])
+        self.n_outputs = sum(1 for name in self.dtype.names if name.startswith("output_"))
+
+        # Ignore a partially written final record
+        n_records = self.path.stat().st_size // self.dtype.itemsize
+        self.records = (np.memmap(self.path, dtype=self.dtype, mode="r", shape=(n_records,))
+                        if n_records else np.zeros(0, dtype=self.dtype))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[tuple[datetime, list[np.ndarray], tuple[int, int, int, int]]]:
+        """Yield (timestamp, outputs with a batch dimension, ScalerCrop) for each captured inference."""
+        for record in self.records:
+            outputs = [record[f"output_{i}"][np.newaxis] for i in range(self.n_outputs)]
+            yield (datetime.fromtimestamp(float(record["timestamp"])).astimezone(), outputs,
+                   tuple(int(v) for v in record["scaler_crop"]))
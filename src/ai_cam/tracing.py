@@ -0,0 +1,186 @@
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from ai_cam.serializers import get_serializer
+
+# Latency hops in milliseconds, in pipeline order:
+#   capture     sensor timestamp -> get_frames returned
+#   tensor_lag  sensor timestamp of the tensor's source frame -> sensor timestamp of the frame it arrived with
+#   decode      get_frames returned -> detections decoded
+#   event       detections decoded -> event state machine stepped
+#   persist     event state machine stepped -> event images and data written
+#   total       sensor timestamp of the tensor's source frame -> last stage done
+#   peak_age    sensor timestamp of a peak frame -> peak frame written at the end of its event
+HOPS = ("capture", "tensor_lag", "decode", "event", "persist", "total", "peak_age")
+PERCENTILES = (50, 90, 99)
+
+
+def sensor_datetime(sensor_ns: int | None) -> datetime:
+    """Wall clock time of a libcamera SensorTimestamp (CLOCK_MONOTONIC nanoseconds), or now if there is none."""
+    now = datetime.now().astimezone()
+    if sensor_ns is None:
+        return now
+    return now - timedelta(microseconds=(time.monotonic_ns() - sensor_ns) / 1000)
+
+
+class FrameMatcher:
+    """Keep the last few frames by sensor timestamp, so an inference result can be paired with the frame it was
+    computed from rather than the one it arrived with."""
+    def __init__(self, size: int = 2):
+        self._frames: deque[tuple[int, object]] = deque(maxlen=max(size, 1))
+
+    def add(self, sensor_ns: int | None, frame):
+        if sensor_ns is not None:
+            self._frames.append((sensor_ns, frame))
+
+    def match(self, tensor_ns: int | None, tolerance_ns: float) -> tuple[int, object] | None:
+        """Return the (sensor_ns, frame) closest to `tensor_ns`, or None if none is within `tolerance_ns`."""
+        if tensor_ns is None or not self._frames:
+            return None
+        sensor_ns, frame = min(self._frames, key=lambda item: abs(item[0] - tensor_ns))
+        if abs(sensor_ns - tensor_ns) > tolerance_ns:
+            return None
+        return sensor_ns, frame
+
+    def clear(self):
+        self._frames.clear()
+
+
+@dataclass(slots=True)
+class FrameTrace:
+    """Monotonic nanosecond timestamps of one frame through the pipeline."""
+    sensor_ns: int | None
+    capture_ns: int
+    tensor_ns: int | None = None
+    matched: bool = False
+    decode_ns: int | None = None
+    event_ns: int | None = None
+    persist_ns: int | None = None
+    transition: str | None = None
+
+    def hops(self) -> dict[str, float]:
+        hops = {}
+        if self.sensor_ns is not None:
+            hops["capture"] = self.capture_ns - self.sensor_ns
+            if self.tensor_ns is not None:
+                hops["tensor_lag"] = self.sensor_ns - self.tensor_ns
+        if self.decode_ns is not None:
+            hops["decode"] = self.decode_ns - self.capture_ns
+            if self.event_ns is not None:
+                hops["event"] = self.event_ns - self.decode_ns
+                if self.persist_ns is not None:
+                    hops["persist"] = self.persist_ns - self.event_ns
+        start = self.tensor_ns if self.tensor_ns is not None else self.sensor_ns
+        end = self.persist_ns or self.event_ns or self.decode_ns
+        if start is not None and end is not None:
+            hops["total"] = end - start
+        return {hop: ns / 1e6 for hop, ns in hops.items()}
+
+
+class LatencyTracer:
+    """Collect per-frame traces, keep a rolling window of per-hop latencies and export a sample of the traces.
+
+    Every `sample_every`th frame and every frame that wrote an event image is appended to daily JSON-lines files in
+    `<output>/traces`. Percentiles over the last `window` frames are logged and written to
+    `<device>_latency.json` every `summary_secs`.
+    """
+    def __init__(self, data_output: str, device_name: str, sample_every: int = 100, window: int = 1000,
+                 summary_secs: float = 300):
+        self.logger = logging.getLogger(__name__)
+
+        self.traces_path = os.path.join(data_output, "traces")
+        os.makedirs(self.traces_path, exist_ok=True)
+        self.device_name = device_name
+        self.sample_every = sample_every
+        self.summary_secs = summary_secs
+        self.serializer = get_serializer("auto")
+
+        self.hops: dict[str, deque[float]] = {hop: deque(maxlen=window) for hop in HOPS}
+        self.frames = 0
+        self.unmatched = 0
+
+        self._file = None
+        self._file_day: str | None = None
+        self._next_summary = time.monotonic() + summary_secs
+
+    def finish(self, trace: FrameTrace):
+        self.frames += 1
+        if trace.tensor_ns is not None and not trace.matched:
+            self.unmatched += 1
+
+        hops = trace.hops()
+        for hop, ms in hops.items():
+            self.hops[hop].append(ms)
+
+        if trace.persist_ns is not None or self.frames % self.sample_every == 0:
+            self._export(trace, hops)
+
+        if time.monotonic() >= self._next_summary:
+            self._next_summary = time.monotonic() + self.summary_secs
+            self.write_summary()
+
+    def record_peak_age(self, sensor_ns: int | None):
+        if sensor_ns is not None:
+            self.hops["peak_age"].append((time.monotonic_ns() - sensor_ns) / 1e6)
+
+    def _export(self, trace: FrameTrace, hops: dict[str, float]):
+        timestamp = sensor_datetime(trace.sensor_ns)
+        day = timestamp.strftime("%Y%m%d")
+        if self._file is None or day != self._file_day:
+            self._close_file()
+            self._file = open(os.path.join(self.traces_path, f"{self.device_name}_{day}.jsonl"), "ab")  # noqa: SIM115
+            self._file_day = day
+
+        record = {
+            "timestamp": timestamp.isoformat(),
+            "sensor_ns": trace.sensor_ns,
+            "tensor_ns": trace.tensor_ns,
+            "matched": trace.matched,
+            "transition": trace.transition,
+            "ms": {hop: round(ms, 3) for hop, ms in hops.items()},
+        }
+        self._file.write(self.serializer.dumps(record) + b"\n")
+
+    def percentiles(self) -> dict[str, dict]:
+        summary = {}
+        for hop, values in self.hops.items():
+            if not values:
+                continue
+            array = np.fromiter(values, dtype=np.float64, count=len(values))
+            points = np.percentile(array, PERCENTILES)
+            stats = {f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, points, strict=True)}
+            stats["max"] = round(float(array.max()), 3)
+            stats["n"] = len(array)
+            summary[hop] = stats
+        return summary
+
+    def write_summary(self):
+        summary = self.percentiles()
+        if not summary:
+            return
+        hops = ", ".join(f"{hop} p50 {s['p50']} p99 {s['p99']}" for hop, s in summary.items())
+        self.logger.info("Latency ms: %s (%s/%s results without a matching frame)", hops, self.unmatched,
+                         self.frames)
+        record = {"device_name": self.device_name, "updated": datetime.now().astimezone().isoformat(),
+                  "frames": self.frames, "unmatched": self.unmatched, "hops_ms": summary}
+        path = os.path.join(self.traces_path, f"{self.device_name}_latency.json")
+        with open(path + ".tmp", "wb") as f:
+            f.write(self.serializer.dumps(record))
+        os.replace(path + ".tmp", path)
+        if self._file is not None:
+            self._file.flush()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self.write_summary()
+        self._close_file()
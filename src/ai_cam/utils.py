@@ -1,13 +1,16 @@
 from typing import Any, List, Dict, Optional, Union, Tuple
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass, asdict
 import numpy as np
 import cv2
 
+import json
 import os
+import struct
 import sys
 import platform
 
-@dataclass
+@dataclass(slots=True)
 class BoundingBox:
     xmin: float
     ymin: float
@@ -26,7 +29,7 @@ class BoundingBox:
             "ymax": self.ymax
         }
 
-@dataclass
+@dataclass(slots=True)
 class DetectionResultYOLO:
     score: float
     class_name: str
@@ -54,6 +57,119 @@ class DetectionResultYOLO:
         return result
 
 
+class DetectionBatch:
+    """
+    Struct-of-arrays container for the detections of one frame.
+    Boxes are normalised xyxy, class ids index into the shared class_names list.
+    Iterating or indexing with an int returns DetectionResultYOLO views for backward compatibility.
+    """
+    __slots__ = ("boxes", "class_ids", "class_names", "scores")
+
+    _BINARY_MAGIC = b"DBAT"
+    _BINARY_HEADER = struct.Struct("<4sI")
+
+    def __init__(self, boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray, class_names: Sequence[str]):
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        self.class_ids = np.asarray(class_ids, dtype=np.int64).reshape(-1)
+        self.class_names = class_names
+
+    @classmethod
+    def empty(cls, class_names: Sequence[str]) -> 'DetectionBatch':
+        return cls(np.empty((0, 4)), np.empty(0), np.empty(0, dtype=np.int64), class_names)
+
+    @classmethod
+    def from_results(cls, detections: list[DetectionResultYOLO], class_names: Sequence[str]) -> 'DetectionBatch':
+        if not detections:
+            return cls.empty(class_names)
+        class_index = {name: i for i, name in enumerate(class_names)}
+        return cls(
+            boxes=[d.bbox.xyxy for d in detections],
+            scores=[d.score for d in detections],
+            class_ids=[class_index[d.class_name] for d in detections],
+            class_names=class_names
+        )
+
+    @classmethod
+    def from_dicts(cls, detection_dicts: list[dict], class_names: Sequence[str]) -> 'DetectionBatch':
+        return cls.from_results([DetectionResultYOLO.from_dict(d) for d in detection_dicts], class_names)
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __iter__(self) -> Iterator[DetectionResultYOLO]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            xmin, ymin, xmax, ymax = self.boxes[index].tolist()
+            return DetectionResultYOLO(
+                score=float(self.scores[index]),
+                class_name=self.class_names[self.class_ids[index]],
+                bbox=BoundingBox(xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax)
+            )
+        return self.select(index)
+
+    def select(self, index) -> 'DetectionBatch':
+        """Return a new batch from a slice, index array or boolean mask."""
+        return DetectionBatch(self.boxes[index], self.scores[index], self.class_ids[index], self.class_names)
+
+    @property
+    def names(self) -> list[str]:
+        return [self.class_names[i] for i in self.class_ids.tolist()]
+
+    def max_score_per_class(self) -> dict[str, float]:
+        if not len(self):
+            return {}
+        unique_ids, inverse = np.unique(self.class_ids, return_inverse=True)
+        max_scores = np.zeros(len(unique_ids))
+        np.maximum.at(max_scores, inverse, self.scores)
+        return {self.class_names[i]: score for i, score in zip(unique_ids.tolist(), max_scores.tolist(), strict=True)}
+
+    def to_dicts(self) -> list[dict]:
+        scores = np.round(self.scores, 4).tolist()
+        return [
+            {
+                'score': score,
+                'class_name': class_name,
+                'bbox': {'xmin': box[0], 'ymin': box[1], 'xmax': box[2], 'ymax': box[3]}
+            }
+            for score, class_name, box in zip(scores, self.names, self.boxes.tolist(), strict=True)
+        ]
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dicts(), separators=(',', ':'))
+
+    def to_bytes(self) -> bytes:
+        """Compact binary form: header, float32 boxes, float32 scores, int16 class ids."""
+        header = self._BINARY_HEADER.pack(self._BINARY_MAGIC, len(self))
+        return (header + self.boxes.astype('<f4').tobytes() + self.scores.astype('<f4').tobytes()
+                + self.class_ids.astype('<i2').tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes, class_names: Sequence[str]) -> 'DetectionBatch':
+        magic, n = cls._BINARY_HEADER.unpack_from(data)
+        if magic != cls._BINARY_MAGIC:
+            raise ValueError("not a detection batch")
+        offset = cls._BINARY_HEADER.size
+        boxes = np.frombuffer(data, dtype='<f4', count=n * 4, offset=offset)
+        offset += n * 16
+        scores = np.frombuffer(data, dtype='<f4', count=n, offset=offset)
+        offset += n * 4
+        class_ids = np.frombuffer(data, dtype='<i2', count=n, offset=offset)
+        return cls(boxes, scores, class_ids, class_names)
+
+    def __repr__(self) -> str:
+        return f"DetectionBatch({len(self)} detections)"
+
+
+def detections_to_dicts(detections) -> list[dict]:
+    if isinstance(detections, DetectionBatch):
+        return detections.to_dicts()
+    return [detection.to_dict() for detection in detections]
+
+
 def compute_iou(box1: BoundingBox, box2: BoundingBox) -> float:
 
     # Calculate intersection coordinates
@@ -74,10 +190,39 @@ def compute_iou(box1: BoundingBox, box2: BoundingBox) -> float:
 
     return intersection / union
 
-def apply_nms(detections: List[DetectionResultYOLO], nms_threshold: float = 0.65) -> List[DetectionResultYOLO]:
+def nms_indices(boxes: np.ndarray, scores: np.ndarray, nms_threshold: float = 0.65) -> np.ndarray:
+    """Vectorised greedy NMS over xyxy boxes, returning kept indices in descending score order."""
+    order = np.argsort(-scores, kind="stable")
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+    keep = []
+    while order.size:
+        current = order[0]
+        keep.append(current)
+        rest = order[1:]
+
+        x1 = np.maximum(boxes[current, 0], boxes[rest, 0])
+        y1 = np.maximum(boxes[current, 1], boxes[rest, 1])
+        x2 = np.minimum(boxes[current, 2], boxes[rest, 2])
+        y2 = np.minimum(boxes[current, 3], boxes[rest, 3])
+        intersection = np.maximum(0, x2 - x1) * np.maximum(0, y2 - y1)
+        union = areas[current] + areas[rest] - intersection
+        iou = np.divide(intersection, union, out=np.zeros_like(intersection), where=intersection > 0)
+
+        order = rest[iou < nms_threshold]
+
+    return np.array(keep, dtype=np.int64)
+
+def apply_nms(detections: list[DetectionResultYOLO] | DetectionBatch,
+              nms_threshold: float = 0.65) -> list[DetectionResultYOLO] | DetectionBatch:
     """
     Apply Non-Maximum Suppression to filter overlapping detections.
     """
+    if isinstance(detections, DetectionBatch):
+        if not len(detections):
+            return detections
+        return detections.select(nms_indices(detections.boxes, detections.scores, nms_threshold))
+
     if not detections:
         return []
 
@@ -133,18 +278,19 @@ def find_first_usb_drive() -> Optional[str]:
     # No USB drives found
     return None
 
-def draw_detections(detections: List[DetectionResultYOLO], frame: np.ndarray) -> np.ndarray:
-    for detection in detections:
-        x0, y0, x1, y1 = detection.bbox.xyxy
+def draw_detections(detections: list[DetectionResultYOLO] | DetectionBatch, frame: np.ndarray) -> np.ndarray:
+    if isinstance(detections, DetectionBatch):
+        items = zip(detections.boxes.tolist(), detections.names, detections.scores.tolist(), strict=True)
+    else:
+        items = ((d.bbox.xyxy, d.class_name, d.score) for d in detections)
+
+    for (x0, y0, x1, y1), class_name, score in items:
 
         x0 = int(x0 * frame.shape[1])
         y0 = int(y0 * frame.shape[0])
         x1 = int(x1 * frame.shape[1])
         y1 = int(y1 * frame.shape[0])
 
-        class_name = detection.class_name
-        score = detection.score
-
         label = f"{class_name} ({score:.2f})"
 
         # Calculate text size and position
@@ -0,0 +1,10 @@
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def coco_labels() -> str:
+    return str(REPO_DIR / "models" / "coco_labels.txt")
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import numpy as np
+
+from ai_cam.classifier import SpeciesClassifier, StubBackend, crop_box
+from ai_cam.data_loggers import DataLogger
+from ai_cam.utils import BoundingBox, DetectionResultYOLO
+
+
+def _detection(class_name: str, xyxy) -> DetectionResultYOLO:
+    xmin, ymin, xmax, ymax = xyxy
+    return DetectionResultYOLO(score=0.9, class_name=class_name,
+                               bbox=BoundingBox(xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax))
+
+
+def test_crop_box_drops_padding_channel():
+    frame = np.zeros((1080, 1920, 4), dtype=np.uint8)
+    crop = crop_box(frame, (0.25, 0.25, 0.5, 0.5), padding=0)
+    assert crop.shape == (270, 480, 3)
+    assert StubBackend(3).preprocess([crop]).shape == (1, 3, 224, 224)
+
+
+def test_crop_box_rejects_tiny_boxes():
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    assert crop_box(frame, (0.5, 0.5, 0.505, 0.505), padding=0) is None
+
+
+def test_classify_event_with_stub_backend(tmp_path):
+    labels = tmp_path / "labels.txt"
+    labels.write_text("robin\nwren\nblackbird\n")
+    classifier = SpeciesClassifier(StubBackend(3), str(labels), trigger_classes=["bird"], min_score=0.3)
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (480, 640, 4), dtype=np.uint8)
+    peaks = {
+        "bird": {"frame": frame, "detections": [_detection("bird", (0.1, 0.1, 0.4, 0.4))]},
+        "cat": {"frame": frame, "detections": [_detection("cat", (0.5, 0.5, 0.9, 0.9))]},
+    }
+
+    try:
+        results = classifier.classify_event("event-1", peaks).result(timeout=10)
+        again = classifier.classify_event("event-1", peaks).result(timeout=10)
+    finally:
+        classifier.close()
+
+    # Only trigger classes are classified, and the stub is deterministic
+    assert set(results) == {"bird"}
+    assert results["bird"]["label"] in {"robin", "wren", "blackbird"}
+    assert results["bird"]["score"] >= 0.3
+    assert results["bird"]["boxes"] == 1
+    assert again == results
+
+
+def test_saved_peak_with_boxes_leaves_crop_untouched(tmp_path):
+    data_logger = DataLogger("cam", str(tmp_path), save_data=False, save_images=True, draw_bbox=True,
+                             auto_select_media=False)
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (480, 640, 4), dtype=np.uint8)
+    detections = [_detection("bird", (0.1, 0.1, 0.4, 0.4))]
+    expected = crop_box(frame.copy(), (0.1, 0.1, 0.4, 0.4))
+
+    paths = data_logger.log_results(detections, frame, datetime.now(), frame_type="event_peak_bird")
+
+    assert "image" in paths
+    np.testing.assert_array_equal(crop_box(frame, (0.1, 0.1, 0.4, 0.4)), expected)
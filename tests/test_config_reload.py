@@ -0,0 +1,89 @@
+import json
+import os
+import signal
+import time
+
+from ai_cam.config import CamConfig
+from ai_cam.config_watcher import ConfigWatcher
+
+
+def _write_config(path, **fields):
+    path.write_text(json.dumps(fields))
+
+
+def _wait_for_config(watcher: ConfigWatcher, timeout: float = 5) -> CamConfig | None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        config = watcher.poll()
+        if config is not None:
+            return config
+        time.sleep(0.02)
+    return None
+
+
+def test_watcher_picks_up_valid_changes_only(tmp_path):
+    path = tmp_path / "config.json"
+    _write_config(path, confidence=0.3)
+    watcher = ConfigWatcher(str(path), poll_secs=0.05)
+    watcher.start()
+    try:
+        assert _wait_for_config(watcher, timeout=0.3) is None
+
+        _write_config(path, confidence=0.55)
+        config = _wait_for_config(watcher)
+        assert config is not None and config.confidence == 0.55
+
+        _write_config(path, confidence=7)
+        assert _wait_for_config(watcher, timeout=0.5) is None
+    finally:
+        watcher.stop()
+
+
+def test_reload_requested_before_start_runs_first(tmp_path):
+    path = tmp_path / "config.json"
+    _write_config(path, confidence=0.4)
+    watcher = ConfigWatcher(str(path), poll_secs=60)
+    watcher.request_reload()
+    watcher.start()
+    try:
+        config = _wait_for_config(watcher)
+        assert config is not None and config.confidence == 0.4
+    finally:
+        watcher.stop()
+
+
+def test_sighup_during_startup_is_queued(tmp_path, coco_labels):
+    from ai_cam.detector_data_logger import DetectorLogger
+
+    path = tmp_path / "config.json"
+    config = CamConfig(output_dir=str(tmp_path), labels=coco_labels, capture_backend="simulated", save_stats=False)
+    path.write_text(config.model_dump_json())
+
+    previous = signal.getsignal(signal.SIGHUP)
+    try:
+        logger = DetectorLogger(config, config_path=str(path))
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert logger.config_watcher._reload.is_set()
+    finally:
+        signal.signal(signal.SIGHUP, previous)
+
+
+def test_apply_config_live_and_restart_fields(tmp_path, coco_labels):
+    from ai_cam.detector_data_logger import DetectorLogger
+
+    config = CamConfig(output_dir=str(tmp_path), labels=coco_labels, capture_backend="simulated", save_stats=False)
+    logger = DetectorLogger(config)
+    detector = logger.detector
+
+    new_config = config.model_copy(update={"confidence": 0.7, "output_dir": str(tmp_path / "elsewhere")})
+    assert logger.apply_config(new_config)
+    assert logger.config.confidence == 0.7
+    assert logger.detector.confidence == 0.7
+    assert logger.detector is detector
+    # output_dir needs a restart, so the running value is kept
+    assert logger.config.output_dir == str(tmp_path)
+
+    # A config whose detector can't be built is rolled back
+    assert not logger.apply_config(logger.config.model_copy(update={"labels": str(tmp_path / "missing.txt")}))
+    assert logger.config.labels == coco_labels
+    assert logger.detector is detector
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from ai_cam.utils import BoundingBox, DetectionBatch, DetectionResultYOLO, apply_nms, detections_to_dicts
+
+CLASS_NAMES = ["person", "bird", "cat"]
+
+
+def _random_batch(seed: int, n: int = 60) -> DetectionBatch:
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 0.8, (n, 2))
+    wh = rng.uniform(0.05, 0.2, (n, 2))
+    # Clustered boxes so plenty overlap
+    xy[n // 2:] = xy[:n - n // 2] + rng.uniform(-0.02, 0.02, (n - n // 2, 2))
+    boxes = np.hstack([xy, xy + wh])
+    scores = np.round(rng.uniform(0.3, 1, n), 4)
+    return DetectionBatch(boxes, scores, rng.integers(0, len(CLASS_NAMES), n), CLASS_NAMES)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("threshold", [0.3, 0.5, 0.65])
+def test_vectorised_nms_matches_list_nms(seed, threshold):
+    batch = _random_batch(seed)
+    kept_batch = apply_nms(batch, nms_threshold=threshold)
+    kept_list = apply_nms(list(batch), nms_threshold=threshold)
+
+    assert 0 < len(kept_batch) < len(batch)
+    assert list(kept_batch) == kept_list
+
+
+def test_nms_on_empty_detections():
+    assert len(apply_nms(DetectionBatch.empty(CLASS_NAMES))) == 0
+    assert apply_nms([]) == []
+
+
+def test_batch_matches_detection_results():
+    results = [
+        DetectionResultYOLO(score=0.9, class_name="bird", bbox=BoundingBox(0.1, 0.2, 0.3, 0.4)),
+        DetectionResultYOLO(score=0.4, class_name="cat", bbox=BoundingBox(0.5, 0.5, 0.9, 0.8)),
+        DetectionResultYOLO(score=0.7, class_name="bird", bbox=BoundingBox(0.0, 0.0, 0.2, 0.2)),
+    ]
+    batch = DetectionBatch.from_results(results, CLASS_NAMES)
+
+    assert len(batch) == 3
+    assert list(batch) == results
+    assert batch[1] == results[1]
+    assert batch.names == ["bird", "cat", "bird"]
+    assert batch.max_score_per_class() == {"bird": 0.9, "cat": 0.4}
+    assert detections_to_dicts(batch) == detections_to_dicts(results)
+    assert DetectionBatch.from_dicts(batch.to_dicts(), CLASS_NAMES).to_dicts() == batch.to_dicts()
+    assert list(batch.select(batch.scores > 0.5)) == [results[0], results[2]]
+
+
+def test_binary_round_trip():
+    batch = _random_batch(0, n=10)
+    restored = DetectionBatch.from_bytes(batch.to_bytes(), CLASS_NAMES)
+
+    np.testing.assert_allclose(restored.boxes, batch.boxes, atol=1e-6)
+    np.testing.assert_allclose(restored.scores, batch.scores, atol=1e-6)
+    np.testing.assert_array_equal(restored.class_ids, batch.class_ids)
+    assert len(DetectionBatch.from_bytes(DetectionBatch.empty(CLASS_NAMES).to_bytes(), CLASS_NAMES)) == 0
+    with pytest.raises(ValueError):
+        DetectionBatch.from_bytes(b"JUNK" + bytes(4), CLASS_NAMES)
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from ai_cam.event_summary import HISTOGRAM_BINS, TRAJECTORY_POINTS, EventAggregator
+from ai_cam.utils import DetectionBatch
+
+CLASS_NAMES = ["person", "bird", "cat"]
+START = datetime(2026, 5, 1, 6, 30, 0, 250000)
+
+
+def _batch(*detections: tuple[str, float, float]) -> DetectionBatch:
+    """Detections as (class name, score, box x offset)."""
+    boxes = [[x, 0.2, x + 0.1, 0.4] for _, _, x in detections]
+    class_ids = [CLASS_NAMES.index(name) for name, _, _ in detections]
+    return DetectionBatch(boxes, [score for _, score, _ in detections], class_ids, CLASS_NAMES)
+
+
+def test_event_summary():
+    aggregator = EventAggregator("cam1")
+    aggregator.update(_batch(("bird", 0.9, 0.0)), START)
+    assert not aggregator.active
+
+    aggregator.begin(START, ["bird"])
+    aggregator.add_start_media({"image": "start.jpg"})
+    aggregator.update(_batch(("bird", 0.55, 0.1), ("bird", 0.95, 0.3), ("cat", 0.4, 0.5)), START)
+    aggregator.update(DetectionBatch.empty(CLASS_NAMES), START + timedelta(seconds=1))
+    aggregator.update(_batch(("bird", 0.75, 0.2)), START + timedelta(seconds=2))
+    aggregator.add_peak_media("bird", {"image": "peak.jpg"})
+    aggregator.add_peak_media("cat", {})
+    aggregator.add_video(None)
+    aggregator.add_video("event.mp4")
+
+    record = aggregator.finish(START + timedelta(seconds=3), peak_ema={"bird": 0.812345})
+    assert not aggregator.active
+    assert record["event_id"] == "cam1_20260501-063000-250"
+    assert record["duration_secs"] == 3.0
+    assert record["frames"] == 3
+    assert record["trigger_classes"] == ["bird"]
+    assert record["start_media"] == {"image": "start.jpg"}
+    assert record["peaks"] == {"bird": {"image": "peak.jpg"}}
+    assert record["videos"] == ["event.mp4"]
+
+    bird = record["classes"]["bird"]
+    assert (bird["detections"], bird["frames"]) == (3, 2)
+    assert (bird["min_score"], bird["max_score"], bird["mean_score"]) == (0.55, 0.95, 0.75)
+    assert bird["peak_ema"] == 0.8123
+    assert sum(bird["score_histogram"]) == 3 and len(bird["score_histogram"]) == HISTOGRAM_BINS
+    assert bird["score_histogram"][9] == 1
+    # The best box in each frame, with its offset from the start of the event
+    assert bird["trajectory"] == [[0.0, 0.3, 0.2, 0.4, 0.4], [2.0, 0.2, 0.2, 0.3, 0.4]]
+    assert bird["last_seen"] == (START + timedelta(seconds=2)).isoformat()
+    assert "peak_ema" not in record["classes"]["cat"]
+
+
+def test_trajectory_is_decimated():
+    aggregator = EventAggregator("cam1")
+    aggregator.begin(START, ["person"])
+    for i in range(1000):
+        aggregator.update(_batch(("person", 0.8, 0.0)), START + timedelta(seconds=i / 10))
+
+    trajectory = aggregator.finish(START + timedelta(seconds=100))["classes"]["person"]["trajectory"]
+    assert len(trajectory) < TRAJECTORY_POINTS
+    offsets = np.array([point[0] for point in trajectory])
+    assert offsets[0] == 0 and offsets[-1] > 60
+    assert len(set(np.diff(offsets).round(2))) == 1
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from ai_cam.config import DetectionZone
+from ai_cam.decoder import YoloDecoder
+from ai_cam.filters import DetectionFilter, points_in_polygon, rasterise_zones
+
+CLASS_NAMES = ["person", "bird", "cat"]
+LEFT_HALF = [(0, 0), (0.5, 0), (0.5, 1), (0, 1)]
+
+
+def test_points_in_polygon():
+    triangle = [(0, 0), (1, 0), (0, 1)]
+    x = np.array([0.2, 0.8, 0.4, 0.6])
+    y = np.array([0.2, 0.8, 0.5, 0.6])
+    assert points_in_polygon(x, y, triangle).tolist() == [True, False, True, False]
+
+
+def test_rasterise_zones():
+    grid = rasterise_zones([DetectionZone(name="left", mode="include", polygon=LEFT_HALF)], grid_wh=(10, 4))
+    assert grid.shape == (4, 10)
+    assert grid[:, :5].all() and not grid[:, 5:].any()
+
+    corner = [(0, 0), (0.2, 0), (0.2, 0.5), (0, 0.5)]
+    grid = rasterise_zones([DetectionZone(name="left", mode="include", polygon=LEFT_HALF),
+                            DetectionZone(name="post", polygon=corner)], grid_wh=(10, 4))
+    assert grid.sum() == 20 - 4
+    assert not grid[:2, :2].any()
+
+    assert rasterise_zones([DetectionZone(name="post", polygon=corner)], grid_wh=(10, 4)).sum() == 40 - 4
+
+
+def test_class_thresholds(caplog):
+    detection_filter = DetectionFilter(CLASS_NAMES, 0.5, valid_classes=["person", "bird"],
+                                       class_confidence={"bird": 0.3, "dog": 0.9})
+    assert "dog" in caplog.text
+    np.testing.assert_array_equal(detection_filter.thresholds, [0.5, 0.3, np.inf])
+
+    scores = np.array([0.4, 0.4, 0.99, 0.6])
+    class_ids = np.array([0, 1, 2, 0])
+    assert detection_filter.score_mask(scores, class_ids).tolist() == [False, True, False, True]
+
+
+@pytest.mark.parametrize("zones, expected", [
+    (None, [True, True, True]),
+    ([DetectionZone(name="left", mode="include", polygon=LEFT_HALF)], [True, False, True]),
+    ([DetectionZone(name="left", polygon=LEFT_HALF)], [False, True, False]),
+])
+def test_zone_mask_uses_box_centres(zones, expected):
+    detection_filter = DetectionFilter(CLASS_NAMES, 0.5, zones=zones)
+    # The last box reaches into the right half but is centred in the left
+    boxes = np.array([[0.1, 0.1, 0.3, 0.3], [0.6, 0.2, 0.9, 0.8], [0.0, 0.4, 0.8, 0.6]])
+    assert detection_filter.zone_mask(boxes).tolist() == expected
+    assert detection_filter.mask(boxes, np.full(3, 0.9), np.zeros(3, dtype=int)).tolist() == expected
+
+
+def test_zone_validation():
+    with pytest.raises(ValueError):
+        DetectionZone(name="bad", polygon=[(0, 0), (1.5, 0), (0, 1)])
+    with pytest.raises(ValueError):
+        DetectionZone(name="line", polygon=[(0, 0), (1, 1)])
+
+
+def test_decoder_rebuilds_filter(coco_labels):
+    decoder = YoloDecoder(coco_labels, None, confidence=0.5, iou_threshold=0.5)
+    assert decoder.filter.zone_grid is None
+
+    decoder.set_thresholds(0.4, 0.6, {"person": 0.8})
+    assert decoder.filter.thresholds[decoder.class_names.index("person")] == 0.8
+    assert decoder.filter.thresholds[decoder.class_names.index("bird")] == 0.4
+
+    decoder.set_zones([DetectionZone(name="left", mode="include", polygon=LEFT_HALF)])
+    assert decoder.filter.zone_grid is not None
+    assert decoder.filter.thresholds[decoder.class_names.index("person")] == 0.8
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+import stat
+
+import pytest
+
+from ai_cam.fleet import (
+    FleetHost,
+    Inventory,
+    LocalTransport,
+    build_configs,
+    fetch_config,
+    push_config,
+    restart,
+    run_fleet,
+)
+
+
+@pytest.fixture
+def fake_uv(tmp_path, monkeypatch):
+    """A `uv` on PATH that records the ai_cam commands it was asked to run."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    uv = bin_dir / "uv"
+    uv.write_text('#!/bin/sh\necho "$@" >> "$HOME/uv.log"\n[ "$AI_CAM_FLEET_HOST" = slow ] && sleep 5\nexit 0\n')
+    uv.chmod(uv.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+@pytest.fixture
+def transport(tmp_path) -> LocalTransport:
+    return LocalTransport(str(tmp_path / "fleet"))
+
+
+def _write_remote_config(transport: LocalTransport, name: str, config: dict):
+    path = transport.root / name / "mini_ai_camera" / "config.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(config))
+    return path
+
+
+def test_inventory_defaults(tmp_path):
+    path = tmp_path / "hosts.json"
+    path.write_text(json.dumps({"defaults": {"user": "pi"},
+                                "hosts": [{"name": "a", "host": "a.local"}, {"name": "b", "host": "b", "user": "x"}]}))
+    hosts = Inventory.from_file(str(path)).hosts
+    assert [(h.name, h.user) for h in hosts] == [("a", "pi"), ("b", "x")]
+
+
+def test_push_config_merges_into_remote_config(fake_uv, transport):
+    host = FleetHost(name="cam01", host="cam01", overrides={"confidence": 0.6})
+    path = _write_remote_config(transport, "cam01", {"device_name": "cam01", "model": "/opt/models/yolo.rpk",
+                                                     "output_dir": "/data"})
+
+    async def push():
+        fetched = await fetch_config(transport, host)
+        configs, errors = build_configs(Inventory(hosts=[host]), None, {"cam01": fetched.details["config"]})
+        assert not errors
+        return await push_config(transport, host, configs["cam01"])
+
+    result = asyncio.run(push())
+    assert result.ok
+    pushed = json.loads(path.read_text())
+    assert pushed == {"device_name": "cam01", "model": "/opt/models/yolo.rpk", "output_dir": "/data",
+                      "confidence": 0.6}
+    assert "ai_cam reload" in (transport.root / "cam01" / "uv.log").read_text()
+
+
+def test_build_configs_rejects_invalid_and_missing(tmp_path):
+    hosts = [FleetHost(name="bad", host="bad", overrides={"confidence": 7}), FleetHost(name="new", host="new")]
+    configs, errors = build_configs(Inventory(hosts=hosts), None, {"bad": {}, "new": None})
+    assert not configs
+    assert "confidence" in errors["bad"]
+    assert "no config" in errors["new"]
+
+
+def test_run_fleet_bounds_parallelism_and_times_out(fake_uv, transport):
+    hosts = [FleetHost(name=name, host=name) for name in ("a", "b", "slow")]
+    for host in hosts:
+        (transport.root / host.name / "mini_ai_camera").mkdir(parents=True)
+    results = asyncio.run(run_fleet(hosts, lambda host: restart(transport, host), parallel=2, timeout_secs=1))
+
+    by_name = {r.name: r for r in results}
+    assert by_name["a"].ok and by_name["b"].ok
+    assert not by_name["slow"].ok and "timed out" in by_name["slow"].summary
+    assert by_name["slow"].elapsed_secs < 3
+
+
+def test_run_fleet_rejects_zero_parallelism(transport):
+    with pytest.raises(ValueError):
+        asyncio.run(run_fleet([], lambda host: restart(transport, host), parallel=0))
@@ -0,0 +1,72 @@
+import pytest
+
+from ai_cam.config import GovernorTier
+from ai_cam.governor import Governor, StaticTelemetry, SysfsTelemetry, Telemetry, TelemetrySource
+
+TIERS = [
+    GovernorTier(name="warm", temp_c=70, ips_scale=0.5),
+    GovernorTier(name="hot", temp_c=77, ips_scale=0.25, save_video=False),
+    GovernorTier(name="low battery", min_battery_v=3.4, ips_scale=0.1, save_video=False, save_images=False),
+]
+
+
+def _governor() -> tuple[Governor, StaticTelemetry]:
+    source = StaticTelemetry()
+    return Governor(source, TIERS, sample_secs=0, hysteresis_c=5, battery_hysteresis_v=0.2), source
+
+
+def _step(governor: Governor, source: StaticTelemetry, temperature=None, battery=None) -> str:
+    source.telemetry = Telemetry(temperature=temperature, battery_voltage=battery)
+    governor.update()
+    return governor.tier.name if governor.tier else "normal"
+
+
+def test_tiers_follow_temperature_with_hysteresis():
+    governor, source = _governor()
+    path = [_step(governor, source, temperature=t) for t in (60, 71, 78, 74, 72.5, 71.9, 66, 64.9)]
+    assert path == ["normal", "warm", "hot", "hot", "hot", "warm", "warm", "normal"]
+
+
+def test_battery_tier_and_limits():
+    governor, source = _governor()
+    assert (governor.ips_scale, governor.allow_video, governor.allow_images) == (1.0, True, True)
+
+    assert _step(governor, source, temperature=50, battery=3.3) == "low battery"
+    assert (governor.ips_scale, governor.allow_video, governor.allow_images) == (0.1, False, False)
+    # Recovering just past the threshold isn't enough
+    assert _step(governor, source, temperature=50, battery=3.5) == "low battery"
+    assert _step(governor, source, temperature=50, battery=3.7) == "normal"
+
+
+def test_update_reports_changes_and_respects_sample_interval():
+    source = StaticTelemetry(Telemetry(temperature=80))
+    governor = Governor(source, TIERS, sample_secs=3600)
+    assert governor.update()
+    source.telemetry = Telemetry(temperature=20)
+    assert not governor.update()
+    assert governor.tier.name == "hot"
+
+
+def test_failed_reads_keep_the_current_tier():
+    class FailingTelemetry(TelemetrySource):
+        def read(self) -> Telemetry:
+            raise OSError("i2c timeout")
+
+    governor = Governor(FailingTelemetry(), TIERS, sample_secs=0)
+    assert not governor.update()
+    assert governor.tier is None
+
+
+def test_sysfs_telemetry(tmp_path):
+    for i, millidegrees in enumerate((45000, 61500)):
+        zone = tmp_path / "thermal" / f"thermal_zone{i}"
+        zone.mkdir(parents=True)
+        (zone / "temp").write_text(f"{millidegrees}\n")
+    battery = tmp_path / "power" / "battery"
+    battery.mkdir(parents=True)
+    (battery / "voltage_now").write_text("3700000\n")
+
+    telemetry = SysfsTelemetry(str(tmp_path / "thermal"), "battery", str(tmp_path / "power")).read()
+    assert telemetry.temperature == 61.5
+    assert telemetry.battery_voltage == pytest.approx(3.7)
+    assert telemetry.battery_current is None
@@ -0,0 +1,74 @@
+import json
+import logging
+
+import pytest
+
+from ai_cam.logging_ import (
+    JsonFormatter,
+    KeyValueFormatter,
+    RateLimitFilter,
+    TextFormatter,
+    init_logging,
+    shutdown_logging,
+)
+
+
+def _record(msg: str = "Detected", args=(), level: int = logging.INFO, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("ai_cam.test", level, __file__, 10, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_text_formatter_appends_extra_fields():
+    record = _record(detections="bird:0.91,cat:0.40", ema={"bird": 0.5})
+    assert TextFormatter("%(message)s").format(record) == 'Detected detections=bird:0.91,cat:0.40 ema="{\'bird\': 0.5}"'
+    assert TextFormatter("%(message)s").format(_record("No extras")) == "No extras"
+
+
+def test_structured_formatters():
+    record = _record("Event %s", ("e1",), event_id="e1", duration_secs=2.5)
+    line = KeyValueFormatter().format(record)
+    assert 'msg="Event e1" event_id=e1 duration_secs=2.5' in line
+    data = json.loads(JsonFormatter().format(record))
+    assert data["msg"] == "Event e1" and data["event_id"] == "e1" and data["duration_secs"] == 2.5
+
+
+def test_rate_limit_filter_counts_suppressed_records():
+    limiter = RateLimitFilter(rate=1, burst=2)
+    records = [_record() for _ in range(5)]
+    for record in records:
+        record.created = 100.0
+    assert [limiter.filter(r) for r in records] == [True, True, False, False, False]
+
+    later = _record()
+    later.created = 101.0
+    assert limiter.filter(later)
+    assert later.suppressed == 3
+    # Errors are never limited
+    assert all(limiter.filter(_record(level=logging.ERROR)) for _ in range(5))
+
+
+def test_rate_limit_filter_samples():
+    limiter = RateLimitFilter(rate=0)
+    assert [limiter.filter(_record(sample=3)) for _ in range(7)] == [True, False, False, True, False, False, True]
+
+
+@pytest.fixture
+def ai_cam_logger():
+    logger = logging.getLogger("ai_cam")
+    root = logging.getLogger()
+    saved = logger.level, logger.propagate, logger.handlers[:], root.level, root.handlers[:]
+    yield logger
+    shutdown_logging()
+    logger.level, logger.propagate, logger.handlers[:], root.level, root.handlers[:] = saved
+
+
+def test_init_logging_writes_through_listener(ai_cam_logger, capsys):
+    init_logging(ai_cam_logger, level=logging.DEBUG, journald=False, rate_limit=0)
+    logging.getLogger("ai_cam.imx500_detector").debug("Detected", extra={"detections": "bird:0.91"})
+    logging.getLogger("ai_cam.events").info("Event %s ended", "e1")
+    shutdown_logging()
+
+    lines = capsys.readouterr().err.splitlines()
+    assert lines[0].endswith("[DEBUG] Detected detections=bird:0.91")
+    assert lines[1].endswith("[INFO] Event e1 ended")
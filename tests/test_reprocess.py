@@ -0,0 +1,58 @@
+import json
+from datetime import datetime, timedelta
+
+from ai_cam.config import CamConfig
+from ai_cam.journal import DetectionJournal
+from ai_cam.reprocess import diff_results, reprocess, reprocess_shard
+from ai_cam.utils import DetectionResultYOLO
+
+
+def _detection(class_name: str, score: float) -> DetectionResultYOLO:
+    return DetectionResultYOLO.from_dict(
+        {"score": score, "class_name": class_name, "bbox": {"xmin": 0.4, "ymin": 0.4, "xmax": 0.6, "ymax": 0.6}})
+
+
+def _record_journal(output_dir) -> str:
+    """A bird, then a cat with one unknown class detection, each followed by empty frames."""
+    journal = DetectionJournal(str(output_dir), "cam")
+    start = datetime(2024, 6, 21, 12, 0).astimezone()
+    frames = ([[_detection("bird", 0.95)]] * 30 + [[]] * 30
+              + [[_detection("cat", 0.9)]] * 29 + [[_detection("cat", 0.9), _detection("dragon", 0.9)]] + [[]] * 30)
+    for i, detections in enumerate(frames):
+        journal.log(detections, start + timedelta(seconds=i))
+    journal.close()
+    return str(next((output_dir / "journal").glob("*.jsonl")))
+
+
+def test_reprocess_shard_applies_new_thresholds(tmp_path, coco_labels):
+    shard = _record_journal(tmp_path / "recorded")
+    original = CamConfig(labels=coco_labels)
+    stricter = CamConfig(labels=coco_labels, class_confidence={"cat": 0.95})
+
+    result = reprocess_shard(shard, stricter.model_dump(), original.model_dump(), str(tmp_path / "out"))
+
+    assert result["frames"] == 120
+    assert result["frames_changed"] == 30
+    assert result["original_detections"] == {"bird": 30, "cat": 30}
+    assert result["new_detections"] == {"bird": 30}
+    assert [e["classes"] for e in result["original_events"]] == [["bird"], ["cat"]]
+    assert [e["classes"] for e in result["new_events"]] == [["bird"]]
+    assert len((tmp_path / "out" / "journal" / "cam_20240621_12.jsonl").read_text().splitlines()) == 120
+
+    diff = diff_results([result])
+    assert diff["detections"] == {"bird": {"original": 30, "new": 30}, "cat": {"original": 30, "new": 0}}
+    assert diff["events"]["cat"] == {"original": 1, "new": 0}
+    assert diff["events_added"] == []
+    assert [e["classes"] for e in diff["events_removed"]] == [["cat"]]
+
+
+def test_reprocess_writes_events_and_diff(tmp_path, coco_labels):
+    _record_journal(tmp_path / "recorded")
+    config = CamConfig(labels=coco_labels)
+
+    diff = reprocess([str(tmp_path / "recorded" / "journal")], config, config, str(tmp_path / "out"), workers=1)
+
+    assert diff["frames"] == 120 and diff["frames_changed"] == 0
+    assert not diff["events_added"] and not diff["events_removed"]
+    assert json.loads((tmp_path / "out" / "diff.json").read_text()) == diff
+    assert len(json.loads((tmp_path / "out" / "events.json").read_text())) == 2
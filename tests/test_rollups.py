@@ -0,0 +1,97 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from ai_cam.rollups import MAX_CLASSES, RollupStore, iter_rollups, read_rollup, split_hours
+
+DAY = datetime(2026, 5, 1)
+
+
+def _record(*classes: tuple[str, datetime, datetime, int]) -> dict:
+    """An event summary record with classes as (name, first seen, last seen, detections)."""
+    return {"classes": {name: {"first_seen": first.isoformat(), "last_seen": last.isoformat(), "detections": n}
+                        for name, first, last, n in classes}}
+
+
+class FakeTracker:
+    def __init__(self):
+        self.tracked = []
+
+    def is_tracked(self, path: str) -> bool:
+        return path in self.tracked
+
+    def track(self, path: str):
+        self.tracked.append(path)
+
+
+def test_split_hours():
+    start = DAY.replace(hour=9, minute=45)
+    assert list(split_hours(start, start + timedelta(minutes=90))) == [
+        (DAY.replace(hour=9), 900.0), (DAY.replace(hour=10), 3600.0), (DAY.replace(hour=11), 900.0)]
+    assert sum(secs for _, secs in split_hours(start, start)) == 0
+
+
+def test_record_and_read(tmp_path):
+    store = RollupStore(str(tmp_path), "cam1")
+    store.record_event(_record(("bird", DAY.replace(hour=9, minute=50), DAY.replace(hour=10, minute=5), 12),
+                               ("cat", DAY.replace(hour=9, minute=55), DAY.replace(hour=9, minute=56), 3)))
+    store.record_event(_record(("bird", DAY.replace(hour=9, minute=58), DAY.replace(hour=9, minute=59), 4)))
+    store.close()
+
+    # Reopening the day after a restart adds to it
+    store = RollupStore(str(tmp_path), "cam1")
+    store.record_event(_record(("bird", DAY.replace(hour=20), DAY.replace(hour=20, second=30), 2)))
+    store.close()
+
+    classes, array = read_rollup(str(tmp_path / "stats" / "cam1_20260501.rollup"))
+    assert classes == ["bird", "cat"]
+    assert array.shape == (24, 2)
+    assert array["events"][9].tolist() == [2, 1]
+    assert array["detections"][9].tolist() == [16, 3]
+    assert array["events"][10, 0] == 0
+    assert array["dwell_secs"][9, 0] == pytest.approx(660)
+    assert array["dwell_secs"][10, 0] == pytest.approx(300)
+    assert array["events"][20, 0] == 1
+
+    daily = list(iter_rollups(str(tmp_path / "stats")))
+    assert daily == [
+        {"device": "cam1", "date": "2026-05-01", "class_name": "bird", "events": 3, "detections": 18,
+         "dwell_secs": 990.0},
+        {"device": "cam1", "date": "2026-05-01", "class_name": "cat", "events": 1, "detections": 3,
+         "dwell_secs": 60.0},
+    ]
+    hourly = list(iter_rollups(str(tmp_path / "stats"), hourly=True))
+    assert [(row["hour"], row["class_name"], row["events"]) for row in hourly] == [
+        (9, "bird", 2), (9, "cat", 1), (10, "bird", 0), (20, "bird", 1)]
+    assert list(iter_rollups(str(tmp_path / "stats"), start=date(2026, 5, 2))) == []
+
+
+def test_events_over_midnight_and_full_days(tmp_path):
+    store = RollupStore(str(tmp_path), "cam1")
+    late = DAY.replace(hour=23, minute=59)
+    store.record_event(_record(("fox", late, late + timedelta(minutes=2), 5)))
+    store.record_event(_record(*((f"class{i}", DAY, DAY, 1) for i in range(MAX_CLASSES + 1))))
+    store.close()
+
+    _, next_day = read_rollup(str(tmp_path / "stats" / "cam1_20260502.rollup"))
+    assert next_day["events"][0, 0] == 0
+    assert next_day["dwell_secs"][0, 0] == pytest.approx(60)
+
+    classes, _ = read_rollup(str(tmp_path / "stats" / "cam1_20260501.rollup"))
+    assert len(classes) == MAX_CLASSES
+    assert f"class{MAX_CLASSES - 1}" not in classes
+
+
+def test_only_completed_days_are_tracked(tmp_path):
+    store = RollupStore(str(tmp_path), "cam1")
+    store.sync_tracker = tracker = FakeTracker()
+    store.record_event(_record(("bird", DAY, DAY, 1)))
+    assert tracker.tracked == []
+
+    today = datetime.now().astimezone().replace(tzinfo=None)
+    store.record_event(_record(("bird", today, today, 1)))
+    stats = tmp_path / "stats"
+    assert tracker.tracked == [str(stats / "cam1_20260501.rollup"), str(stats / "cam1_20260501.json")]
+
+    store.close()
+    assert len(tracker.tracked) == 2
@@ -0,0 +1,84 @@
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+
+from ai_cam.config import RESTART_FIELDS, CamConfig, ScheduleProfile
+from ai_cam.schedule import Scheduler, sun_times
+
+
+def _utc_minutes(moment: datetime) -> float:
+    moment = moment.astimezone(UTC)
+    return moment.hour * 60 + moment.minute + moment.second / 60
+
+
+def test_sun_times_london_midsummer():
+    sunrise, sunset = sun_times(date(2024, 6, 21), 51.5, -0.12)
+    # 03:43 and 20:21 UTC
+    assert abs(_utc_minutes(sunrise) - (3 * 60 + 43)) < 3
+    assert abs(_utc_minutes(sunset) - (20 * 60 + 21)) < 3
+
+
+def test_sun_times_polar_night():
+    assert sun_times(date(2024, 12, 21), 78.2, 15.6) == (None, None)
+
+
+def test_first_matching_profile_wins_and_windows_wrap():
+    scheduler = Scheduler([
+        ScheduleProfile(name="night", start="22:00", end="06:00", sleep=True),
+        ScheduleProfile(name="morning", start="05:00", end="09:00", overrides={"ips": 5}),
+    ])
+    day = datetime(2024, 6, 21).astimezone()
+    assert scheduler.active_profile(day.replace(hour=23)).name == "night"
+    assert scheduler.active_profile(day.replace(hour=5, minute=30)).name == "night"
+    assert scheduler.active_profile(day.replace(hour=7)).name == "morning"
+    assert scheduler.active_profile(day.replace(hour=12)) is None
+
+
+def test_sun_relative_spec_resolves_with_offset():
+    scheduler = Scheduler([], latitude=51.5, longitude=-0.12)
+    day = date(2024, 6, 21)
+    sunrise, _ = sun_times(day, 51.5, -0.12)
+    assert scheduler.resolve("sunrise-30", day) == sunrise - timedelta(minutes=30)
+
+
+def test_schedule_validation():
+    with pytest.raises(ValidationError, match="latitude and longitude"):
+        CamConfig(schedule=[ScheduleProfile(name="dawn", start="sunrise", end="09:00")])
+    with pytest.raises(ValidationError, match="only override live fields"):
+        ScheduleProfile(name="dawn", start="05:00", end="09:00", overrides={"output_dir": "elsewhere"})
+    with pytest.raises(ValidationError):
+        CamConfig(schedule=[ScheduleProfile(name="dawn", start="05:00", end="09:00", overrides={"ips": -1})])
+
+
+def test_schedule_fields_reload_without_restart(tmp_path, coco_labels):
+    from ai_cam.detector_data_logger import DetectorLogger
+
+    assert not RESTART_FIELDS & {"schedule", "latitude", "longitude", "schedule_check_secs"}
+    config = CamConfig(output_dir=str(tmp_path), labels=coco_labels, capture_backend="simulated", save_stats=False)
+    logger = DetectorLogger(config)
+    profile = ScheduleProfile(name="always", start="00:00", end="23:59", overrides={"confidence": 0.6})
+    new_config = config.model_copy(update={"schedule": [profile], "schedule_check_secs": 5})
+
+    logger._on_config_reload(new_config)
+    scheduler = logger.scheduler
+    assert scheduler is not None
+    assert logger.config.schedule == [profile]
+    assert logger.config.schedule_check_secs == 5
+
+    logger._check_schedule()
+    assert logger.profile == profile
+    assert logger.config.confidence == 0.6
+
+    # Reloading the same schedule keeps the scheduler and active profile
+    logger._on_config_reload(new_config.model_copy(update={"iou_threshold": 0.4}))
+    assert logger.scheduler is scheduler
+    assert logger.profile == profile
+    assert logger.config.confidence == 0.6 and logger.config.iou_threshold == 0.4
+
+    # A config that cannot be applied leaves the schedule alone
+    rejected = new_config.model_copy(update={"schedule": [], "labels": str(tmp_path / "missing.txt")})
+    logger._on_config_reload(rejected)
+    assert logger.scheduler is scheduler
+    assert logger.base_config is not rejected
+    assert logger.config.schedule == [profile]
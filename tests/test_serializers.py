@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+import pytest
+
+from ai_cam.data_loggers import DetectionEncoder
+from ai_cam.serializers import Serializer, get_serializer, load_file
+from ai_cam.utils import DetectionBatch
+
+RECORD = {"event_id": "cam_20240621-120000", "duration_secs": 12.5, "frames": 40, "classes": {"bird": 0.91},
+          "peaks": [{"class_name": "bird", "score": 0.9123}], "zone": None}
+
+
+def _available(name: str) -> Serializer:
+    if name != "json":
+        pytest.importorskip(name)
+    return get_serializer(name)
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgpack"])
+def test_round_trip(name):
+    serializer = _available(name)
+    assert serializer.name == name
+    assert serializer.loads(serializer.dumps(RECORD)) == RECORD
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgpack"])
+def test_load_file_picks_format_from_extension(tmp_path, name):
+    serializer = _available(name)
+    path = tmp_path / f"record{serializer.extension}"
+    path.write_bytes(serializer.dumps(RECORD))
+    assert load_file(str(path)) == RECORD
+
+
+def test_unknown_serializer():
+    with pytest.raises(ValueError):
+        get_serializer("yaml")
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgpack"])
+def test_detection_encoder_matches_dicts(name):
+    serializer = _available(name)
+    rng = np.random.default_rng(0)
+    batch = DetectionBatch(rng.uniform(0, 1, (5, 4)), rng.uniform(0, 1, 5), [1, 0, 1, 2, 1], ["person", "bird", "cat"])
+    encoder = DetectionEncoder(serializer)
+
+    data = encoder.encode(batch)
+    assert serializer.loads(data) == batch.to_dicts()
+    assert encoder.encode(list(batch)) == serializer.dumps([d.to_dict() for d in batch])
+    if name == "json":
+        # The fast path writes exactly what json.dumps would
+        assert data == json.dumps(batch.to_dicts(), separators=(",", ":")).encode()
+    assert serializer.loads(encoder.encode(DetectionBatch.empty(["bird"]))) == []
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import numpy as np
+
+from ai_cam.config import CamConfig, SimulatedFaults
+from ai_cam.simulated import SimulatedCamera, SimulatedDetector
+from ai_cam.supervisor import ACTION_REINIT_DETECTOR, ACTION_RETRY, COMPONENT_DETECTOR, CaptureSupervisor
+
+
+def test_camera_frames_have_four_channels():
+    camera = SimulatedCamera("cam", video_wh=(64, 48), fps=100)
+    frame, metadata = camera.get_frames()
+    assert frame.shape == (48, 64, 4)
+    assert "SensorTimestamp" in metadata and "FrameDuration" in metadata
+
+
+def _error_pattern(component, draws: int = 32) -> list[bool]:
+    pattern = []
+    for _ in range(draws):
+        try:
+            component()
+            pattern.append(False)
+        except RuntimeError:
+            pattern.append(True)
+    return pattern
+
+
+def test_seeded_faults_are_reproducible_per_component(coco_labels):
+    faults = SimulatedFaults(capture_error=0.5, detector_error=0.5, seed=3)
+    metadata = {"ScalerCrop": (0, 0, 4056, 3040), "SensorTimestamp": 0}
+
+    def detector_pattern():
+        detector = SimulatedDetector(coco_labels, None, 0.3, 0.5, faults=faults)
+        return _error_pattern(lambda: detector.get_detections(metadata))
+
+    def camera_pattern():
+        camera = SimulatedCamera("cam", video_wh=(64, 48), fps=1000, faults=faults)
+        return _error_pattern(camera.get_frames)
+
+    detector = detector_pattern()
+    camera = camera_pattern()
+    # Creating other components in between doesn't change a component's sequence
+    assert detector_pattern() == detector
+    assert camera_pattern() == camera
+    assert camera != detector
+
+
+def test_supervisor_escalates_repeated_detector_faults():
+    supervisor = CaptureSupervisor(backoff_secs=0.01, max_attempts=5)
+    first = supervisor.classify(COMPONENT_DETECTOR, ValueError("bad tensor"))
+    second = supervisor.classify(COMPONENT_DETECTOR, ValueError("bad tensor"))
+    assert first.action == ACTION_RETRY
+    assert second.action == ACTION_REINIT_DETECTOR
+
+    supervisor.tensor_ok()
+    assert not supervisor.recovering
+    assert supervisor.stats()["recoveries"] == 1
+
+
+def test_detector_logger_recovers_from_injected_faults(tmp_path, coco_labels):
+    from ai_cam.detector_data_logger import DetectorLogger
+
+    config = CamConfig(
+        output_dir=str(tmp_path), labels=coco_labels, capture_backend="simulated", ips=30, save_stats=False,
+        recovery_backoff_secs=0.01, recovery_max_attempts=50, frame_deadline_secs=1, tensor_deadline_secs=1,
+        simulated_faults=SimulatedFaults(capture_error=0.05, detector_error=0.05, seed=7),
+    )
+    logger = DetectorLogger(config)
+    thread = threading.Thread(target=logger.run)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline and logger.supervisor.stats()["recoveries"] < 3:
+            time.sleep(0.1)
+    finally:
+        logger._running = False
+        thread.join(timeout=10)
+
+    stats = logger.supervisor.stats()
+    assert not thread.is_alive()
+    assert stats["recoveries"] >= 3
+    assert set(stats["faults"]) <= {"camera:error", "detector:error"}
+    assert np.isfinite(stats["max_recovery_secs"])
@@ -0,0 +1,71 @@
+import os
+import time
+
+from ai_cam.sync import LocalDirectorySink, SyncAgent, SyncTracker
+
+
+def _write_files(output_dir, count: int, size: int) -> list[str]:
+    images = output_dir / "images"
+    images.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = images / f"{i}.bin"
+        path.write_bytes(os.urandom(size))
+        paths.append(str(path))
+    return paths
+
+
+def test_sync_once_uploads_and_marks_synced(tmp_path):
+    output = tmp_path / "out"
+    tracker = SyncTracker(str(output))
+    for path in _write_files(output, 5, 1000):
+        tracker.track(path)
+
+    agent = SyncAgent(tracker, LocalDirectorySink(str(tmp_path / "remote")), "cam", batch_files=2)
+    agent.sync_once()
+    agent.stop()
+
+    bundles = list((tmp_path / "remote").glob("*.tar.gz"))
+    assert len(bundles) == 3
+    assert not tracker.pending and len(tracker.synced) == 5
+    assert not list(agent.outbox.iterdir())
+
+    # The journal survives a restart
+    assert len(SyncTracker(str(output)).synced) == 5
+
+
+def test_interrupted_upload_resumes(tmp_path):
+    output = tmp_path / "out"
+    tracker = SyncTracker(str(output))
+    for path in _write_files(output, 3, 200_000):
+        tracker.track(path)
+
+    # 800 kbit/s takes several seconds for the bundle, so stopping interrupts it part way
+    agent = SyncAgent(tracker, LocalDirectorySink(str(tmp_path / "remote")), "cam", bandwidth_kbps=800)
+    agent.start()
+    time.sleep(1)
+    start = time.monotonic()
+    agent.stop()
+    assert time.monotonic() - start < 1
+    assert list((tmp_path / "remote").glob("*.part"))
+    assert len(tracker.pending) == 3
+
+    tracker = SyncTracker(str(output))
+    agent = SyncAgent(tracker, LocalDirectorySink(str(tmp_path / "remote")), "cam")
+    agent.sync_once()
+    agent.stop()
+    assert len(tracker.synced) == 3
+    assert not list((tmp_path / "remote").glob("*.part"))
+
+
+def test_orphaned_bundle_is_removed_on_start(tmp_path):
+    output = tmp_path / "out"
+    tracker = SyncTracker(str(output))
+    outbox = tracker.sync_dir / "outbox"
+    outbox.mkdir()
+    (outbox / "cam_1.tar.gz").write_bytes(b"partial")
+    (outbox / "cam_2.tar.gz.tmp").write_bytes(b"partial")
+
+    agent = SyncAgent(tracker, LocalDirectorySink(str(tmp_path / "remote")), "cam")
+    agent.stop()
+    assert not list(outbox.iterdir())
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from ai_cam.tensor_capture import SEGMENT_SUFFIX, TensorRecorder, TensorSegmentReader
+
+START = datetime(2024, 6, 21, 12, 0).astimezone()
+
+
+def _outputs(i: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(i)
+    return [rng.uniform(0, 640, (1, 10, 4)).astype(np.float32), rng.uniform(0, 1, (1, 10)).astype(np.float32),
+            np.full((1, 10), i % 80, dtype=np.float32)]
+
+
+def _record(tmp_path, frames: list[tuple[float, bool]], **kwargs) -> list[TensorSegmentReader]:
+    recorder = TensorRecorder(str(tmp_path), "cam", model_wh=(640, 640), **kwargs)
+    recorder.start()
+    for i, (secs, in_event) in enumerate(frames):
+        metadata = {"ScalerCrop": (0, 0, 4056, 3040), "SensorTimestamp": i}
+        recorder.submit(_outputs(i), metadata, START + timedelta(seconds=secs), in_event)
+    recorder.stop()
+    assert recorder.dropped == 0
+    return [TensorSegmentReader(str(path)) for path in sorted((tmp_path / "tensors").glob(f"*{SEGMENT_SUFFIX}"))]
+
+
+def test_segments_round_trip(tmp_path):
+    readers = _record(tmp_path, [(i, False) for i in range(5)], segment_secs=60)
+
+    assert len(readers) == 1
+    reader = readers[0]
+    assert reader.model_wh == (640, 640)
+    assert len(reader) == 5
+    for i, (timestamp, outputs, scaler_crop) in enumerate(reader):
+        assert timestamp == START + timedelta(seconds=i)
+        assert scaler_crop == (0, 0, 4056, 3040)
+        for written, read in zip(_outputs(i), outputs, strict=True):
+            np.testing.assert_array_equal(read, written)
+
+
+def test_segments_rotate(tmp_path):
+    readers = _record(tmp_path, [(i * 20, False) for i in range(6)], segment_secs=60)
+    assert [len(reader) for reader in readers] == [3, 3]
+
+
+def test_event_mode_keeps_padding_around_events(tmp_path):
+    # An event at 10-11s with 2s of padding either side keeps 7-13s, the padding is inclusive
+    frames = [(i, 10 <= i <= 11) for i in range(20)]
+    readers = _record(tmp_path, frames, mode="events", event_padding_secs=2)
+    kept = [timestamp for reader in readers for timestamp, _, _ in reader]
+    assert kept == [START + timedelta(seconds=i) for i in range(7, 14)]
+
+
+def test_reader_ignores_torn_final_record(tmp_path):
+    reader, = _record(tmp_path, [(i, False) for i in range(3)])
+    with open(reader.path, "ab") as f:
+        f.write(b"\0" * 10)
+    assert len(TensorSegmentReader(str(reader.path))) == 3
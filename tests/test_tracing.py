@@ -0,0 +1,45 @@
+import json
+
+from ai_cam.tracing import FrameMatcher, FrameTrace, LatencyTracer
+
+
+def test_frame_trace_hops():
+    trace = FrameTrace(sensor_ns=1_000_000, capture_ns=3_000_000, tensor_ns=0, matched=True,
+                       decode_ns=4_000_000, event_ns=4_500_000, persist_ns=6_000_000)
+    assert trace.hops() == {"capture": 2.0, "tensor_lag": 1.0, "decode": 1.0, "event": 0.5, "persist": 1.5,
+                            "total": 6.0}
+
+
+def test_frame_matcher_pairs_closest_frame():
+    matcher = FrameMatcher(size=2)
+    matcher.add(100, "a")
+    matcher.add(200, "b")
+    assert matcher.match(190, tolerance_ns=50) == (200, "b")
+    assert matcher.match(400, tolerance_ns=50) is None
+    assert matcher.match(None, tolerance_ns=50) is None
+
+
+def test_percentiles_over_window(tmp_path):
+    tracer = LatencyTracer(str(tmp_path), "cam", window=100, summary_secs=3600)
+    # Only the last 100 of these stay in the window: 1..100 ms
+    for ms in range(-49, 101):
+        tracer.hops["decode"].append(float(ms))
+
+    stats = tracer.percentiles()["decode"]
+    assert stats == {"p50": 50.5, "p90": 90.1, "p99": 99.01, "max": 100.0, "n": 100}
+    assert "capture" not in tracer.percentiles()
+
+
+def test_summary_and_sampled_traces_written(tmp_path):
+    tracer = LatencyTracer(str(tmp_path), "cam", sample_every=2, summary_secs=3600)
+    for i in range(4):
+        tracer.finish(FrameTrace(sensor_ns=None, capture_ns=i * 10, decode_ns=i * 10 + 2_000_000))
+    tracer.close()
+
+    traces = list((tmp_path / "traces").glob("cam_*.jsonl"))
+    assert len(traces) == 1
+    assert len(traces[0].read_text().splitlines()) == 2
+
+    summary = json.loads((tmp_path / "traces" / "cam_latency.json").read_text())
+    assert summary["frames"] == 4
+    assert summary["hops_ms"]["decode"]["n"] == 4